@@ -1,20 +1,93 @@
 from django.contrib import admin
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 
+from job_board.exports import (FORMATS, export_archived_jobs,
+                               export_companies, export_jobs)
 from job_board.forms import SiteConfigForm
 from job_board.models.category import Category
 from job_board.models.company import Company
 from job_board.models.country import Country
 from job_board.models.job import Job
+from job_board.models.job_archive import JobArchive
+from job_board.models.outbox_message import OutboxMessage
 from job_board.models.site_config import SiteConfig
 
 
+def export_action(fmt, export, name):
+    # Streams the selected rows, without loading them all into memory
+    def action(modeladmin, request, queryset):
+        response = StreamingHttpResponse(export(fmt, queryset),
+                                         content_type=FORMATS[fmt])
+        response['Content-Disposition'] = \
+            'attachment; filename="%s-%s.%s"' % (
+                name, timezone.now().strftime('%Y%m%d'), fmt
+            )
+        return response
+    action.__name__ = 'export_%s_%s' % (name, fmt)
+    action.short_description = 'Export selected %s as %s' % (
+                                   name, fmt.upper()
+                               )
+    return action
+
+
+def transition_action(method, verb):
+    # Runs each selected job through activate() or expire(), so that the
+    # status, counters, search index and cached pages follow
+    def action(modeladmin, request, queryset):
+        jobs = queryset.select_related('site__siteconfig', 'company')
+        count = sum(1 for job in jobs if getattr(job, method)())
+        modeladmin.message_user(request, '%s jobs %s' % (count, verb))
+    action.__name__ = '%s_jobs' % method
+    action.short_description = '%s selected jobs' % method.capitalize()
+    return action
+
+
+class CompanyAdmin(admin.ModelAdmin):
+    list_display = ('name', 'site', 'updated_at')
+    list_filter = ('site',)
+    actions = [export_action('csv', export_companies, 'companies'),
+               export_action('jsonl', export_companies, 'companies')]
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('title', 'company', 'site', 'status', 'created_at',
+                    'paid_at', 'expired_at')
+    list_filter = ('site', 'status')
+    date_hierarchy = 'created_at'
+    list_select_related = ('company', 'site')
+    # The status only changes through the actions below
+    readonly_fields = ('status', 'paid_at', 'expired_at')
+    actions = [transition_action('activate', 'activated'),
+               transition_action('expire', 'expired'),
+               export_action('csv', export_jobs, 'jobs'),
+               export_action('jsonl', export_jobs, 'jobs')]
+
+
+class JobArchiveAdmin(admin.ModelAdmin):
+    list_display = ('title', 'company', 'site', 'paid_at', 'expired_at',
+                    'archived_at')
+    list_filter = ('site',)
+    list_select_related = ('company', 'site')
+    exclude = ('texts',)
+    actions = [export_action('csv', export_archived_jobs, 'archived_jobs'),
+               export_action('jsonl', export_archived_jobs, 'archived_jobs')]
+
+
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'kind')
+
+
 class SiteConfigAdmin(admin.ModelAdmin):
     form = SiteConfigForm
 
 
 # Register your models here.
 admin.site.register(Category)
-admin.site.register(Company)
+admin.site.register(Company, CompanyAdmin)
 admin.site.register(Country)
-admin.site.register(Job)
+admin.site.register(Job, JobAdmin)
+admin.site.register(JobArchive, JobArchiveAdmin)
+admin.site.register(OutboxMessage, OutboxMessageAdmin)
 admin.site.register(SiteConfig, SiteConfigAdmin)
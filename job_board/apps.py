@@ -1,6 +1,7 @@
 from __future__ import unicode_literals
 
 from django.apps import AppConfig
+from django.db.models.signals import post_delete
 from django.db.models.signals import post_migrate
 from django.db.models.signals import post_save
 
@@ -11,10 +12,42 @@ class JobBoardConfig(AppConfig):
     def ready(self):
         from django.contrib.sites.models import Site
 
+        from job_board.models.category import Category
+        from job_board.models.company import Company
+        from job_board.models.job import Job
+        from job_board.models.job_archive import JobArchive
+        from job_board.models.site_config import SiteConfig
+        from job_board.signals import clear_site_cache_post_delete
+        from job_board.signals import clear_site_cache_post_save
         from job_board.signals import gen_site_config_post_migrate
         from job_board.signals import gen_site_config_post_save
+        from job_board.signals import purge_category_pages
+        from job_board.signals import purge_company_pages
+        from job_board.signals import purge_job_pages_post_delete
+        from job_board.signals import purge_job_pages_post_save
+        from job_board.signals import purge_site_pages
+        from job_board.signals import update_job_counters_post_delete
+        from job_board.signals import update_job_search_index_post_delete
+        from job_board.signals import update_job_search_index_post_save
 
         post_save.connect(gen_site_config_post_save, sender=Site)
+        post_save.connect(clear_site_cache_post_save, sender=Site)
+        post_save.connect(clear_site_cache_post_save, sender=SiteConfig)
+        post_delete.connect(clear_site_cache_post_delete, sender=Site)
+        post_delete.connect(clear_site_cache_post_delete, sender=SiteConfig)
+        post_save.connect(purge_job_pages_post_save, sender=Job)
+        post_delete.connect(purge_job_pages_post_delete, sender=Job)
+        post_save.connect(purge_company_pages, sender=Company)
+        post_delete.connect(purge_company_pages, sender=Company)
+        post_save.connect(purge_category_pages, sender=Category)
+        post_delete.connect(purge_category_pages, sender=Category)
+        post_save.connect(purge_site_pages, sender=Site)
+        post_save.connect(purge_site_pages, sender=SiteConfig)
+        post_save.connect(update_job_search_index_post_save, sender=Job)
+        post_delete.connect(update_job_search_index_post_delete, sender=Job)
+        post_delete.connect(update_job_counters_post_delete, sender=Job)
+        post_delete.connect(update_job_counters_post_delete,
+                            sender=JobArchive)
         # NOTE: We list sites before job_board in INSTALLED_APPS, failing to
         #       do that will result in this post_migrate signal firing before
         #       the default site has been created.
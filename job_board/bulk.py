@@ -0,0 +1,38 @@
+from job_board import counters
+from job_board.feeds import refresh as refresh_feeds
+from job_board.models.job import Job
+from job_board.page_cache import purge_jobs
+from job_board.search import get_search_backend
+from job_board.sitemaps import invalidate as invalidate_sitemaps
+
+# NOTE: Jobs changed in bulk, with bulk_create(), update() or raw SQL, skip
+#       Job.save() and the signal handlers, so whatever those would have kept
+#       up to date is updated here, once per batch: the category and company
+#       counters, the search index, the cached pages, the feeds and the
+#       sitemaps.  It should be called in the transaction changing the jobs.
+
+
+def jobs_bulk_changed(site_id, rows, old_status, new_status):
+    # rows are the (id, category_id, company_id) of jobs of the site that all
+    # went from old_status to new_status, old_status is Job.DRAFT for new
+    # jobs.  Archived jobs are still expired.
+    if not rows:
+        return
+    ids = [row[0] for row in rows]
+    category_ids = [row[1] for row in rows]
+    company_ids = [row[2] for row in rows]
+
+    counters.jobs_changed([row[1:] for row in rows], old_status, new_status)
+
+    backend = get_search_backend()
+    if new_status == Job.ACTIVE:
+        jobs = Job.objects.filter(id__in=ids) \
+                          .only('id', 'title', 'description', 'status')
+        for job in jobs:
+            backend.index(job)
+    else:
+        backend.remove_many(ids)
+
+    purge_jobs(site_id, rows)
+    refresh_feeds(site_id, category_ids, company_ids)
+    invalidate_sitemaps(site_id, ids, company_ids)
@@ -0,0 +1,53 @@
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.views.decorators.http import condition
+
+from job_board.page_cache import is_public_request, page_tags, purged_at, \
+                                 tag_versions
+from job_board.sites import get_current_site, get_site_cache_version
+
+# NOTE: Pages are validated with the versions of their page cache tags, which
+#       are replaced whenever something shown on the page changes, including
+#       jobs being expired, archived or deleted and categories or companies
+#       being renamed.  The ETag is derived from the versions and the site
+#       cache version, and Last-Modified is the time the most recent of the
+#       tags was purged, so neither goes back in time when a job disappears.
+
+
+def conditional_page(*tags, anonymous_only=True):
+    # Tags are formatted with the view's keyword arguments, as with
+    # cache_public_page()
+    def decorator(view):
+        def get_versions(request, *args, **kwargs):
+            if not hasattr(request, '_page_versions'):
+                request._page_versions = tag_versions(
+                                             get_current_site(request).id,
+                                             page_tags(tags, kwargs)
+                                         )
+            return request._page_versions
+
+        def get_last_modified(request, *args, **kwargs):
+            versions = get_versions(request, *args, **kwargs)
+            return datetime.fromtimestamp(purged_at(versions), timezone.utc)
+
+        def get_etag(request, *args, **kwargs):
+            versions = get_versions(request, *args, **kwargs)
+            return hashlib.md5(
+                       ':'.join(versions + [str(get_site_cache_version())])
+                          .encode('utf-8')
+                   ).hexdigest()
+
+        conditional_view = condition(
+                               etag_func=get_etag,
+                               last_modified_func=get_last_modified
+                           )(view)
+
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if anonymous_only and not is_public_request(request):
+                return view(request, *args, **kwargs)
+            return conditional_view(request, *args, **kwargs)
+        return inner
+    return decorator
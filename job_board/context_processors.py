@@ -1,5 +1,5 @@
-from django.contrib.sites.shortcuts import get_current_site
 from job_board.forms import SearchForm
+from job_board.sites import get_current_site
 
 
 def search_form(request):
@@ -0,0 +1,72 @@
+from collections import defaultdict
+
+from django.db.models import F
+
+from job_board.models.category import Category
+from job_board.models.company import Company
+
+# NOTE: Categories count their active jobs, and companies their active jobs
+#       and their paid jobs (active, expired or archived), so that the index
+#       pages and the API list them without counting jobs.  The counters are
+#       changed with F() expressions in the transaction changing the jobs, so
+#       concurrent changes do not overwrite each other, and the recount
+#       command repairs any drift, e.g. after jobs are changed with update().
+
+# The counters each job status adds to, for its category and its company
+CATEGORY_COUNTERS = {
+    'active': ('active_count',),
+}
+COMPANY_COUNTERS = {
+    'active': ('active_count', 'paid_count'),
+    'expired': ('paid_count',),
+}
+
+
+def add(deltas, status, category_id, company_id, sign):
+    for field in CATEGORY_COUNTERS.get(status, ()):
+        deltas[(Category, category_id)][field] += sign
+    for field in COMPANY_COUNTERS.get(status, ()):
+        deltas[(Company, company_id)][field] += sign
+
+
+def new_deltas():
+    return defaultdict(lambda: defaultdict(int))
+
+
+def updates(deltas):
+    # Groups the rows with the same changes, to be updated together
+    grouped = defaultdict(list)
+    for (model, obj_id), fields in deltas.items():
+        changes = tuple(sorted((f, d) for f, d in fields.items() if d))
+        if obj_id is not None and changes:
+            grouped[(model, changes)].append(obj_id)
+    return grouped
+
+
+def apply(deltas):
+    for (model, changes), ids in updates(deltas).items():
+        model.objects.filter(pk__in=ids).update(
+            **dict((f, F(f) + d) for f, d in changes)
+        )
+
+
+def job_deltas(old, new):
+    # old and new are the (status, category_id, company_id) of a job before
+    # and after it was saved, old is None for a new job and new is None for
+    # a deleted one
+    deltas = new_deltas()
+    if old is not None:
+        add(deltas, *old, sign=-1)
+    if new is not None:
+        add(deltas, *new, sign=1)
+    return deltas
+
+
+def jobs_changed(rows, old_status, new_status):
+    # rows are the (category_id, company_id) of jobs that all went from
+    # old_status to new_status, e.g. in a bulk update
+    deltas = new_deltas()
+    for category_id, company_id in rows:
+        add(deltas, old_status, category_id, company_id, -1)
+        add(deltas, new_status, category_id, company_id, 1)
+    apply(deltas)
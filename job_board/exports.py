@@ -0,0 +1,116 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import CharField, Value
+
+from job_board.models.job import Job
+
+# NOTE: Exports stream rows straight from values() querysets read with
+#       iterator(), so that memory use stays the same however many rows are
+#       exported: no model instances are built and no more than CHUNK_SIZE
+#       rows are held at a time (PostgreSQL reads them through a server-side
+#       cursor).  Each column maps a header to the value() columns it needs
+#       and a function building its value from a row.  Job exports chain
+#       the archived jobs after the jobs, with their status set to expired.
+
+CHUNK_SIZE = 2000
+FORMATS = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+
+def column(name):
+    return ([name], lambda row: row[name])
+
+
+JOB_COLUMNS = [
+    ('id', column('id')),
+    ('site', column('site__domain')),
+    ('title', column('title')),
+    ('company', column('company__name')),
+    ('category', column('category__name')),
+    ('country', column('country__name')),
+    ('city', column('city')),
+    ('state', column('state')),
+    ('remote', column('remote')),
+    ('email', column('email')),
+    ('status', column('status')),
+    ('created_at', column('created_at')),
+    ('paid_at', column('paid_at')),
+    ('expired_at', column('expired_at')),
+]
+
+COMPANY_COLUMNS = [
+    ('id', column('id')),
+    ('site', column('site__domain')),
+    ('name', column('name')),
+    ('url', column('url')),
+    ('twitter', column('twitter')),
+    ('country', column('country__name')),
+    ('paid_jobs', column('paid_count')),
+    ('active_jobs', column('active_count')),
+]
+
+
+def export_rows(querysets, columns, chunk_size=CHUNK_SIZE):
+    # Yields a list of values per row of each queryset, in the order of
+    # columns
+    names = set()
+    for header, (needs, build) in columns:
+        names.update(needs)
+    for queryset in querysets:
+        rows = queryset.order_by('pk').values(*sorted(names))
+        for row in rows.iterator(chunk_size=chunk_size):
+            yield [build(row) for header, (needs, build) in columns]
+
+
+def archived_rows(queryset):
+    # Archived jobs have no status column, they are all expired
+    return queryset.annotate(
+               status=Value(Job.EXPIRED, output_field=CharField())
+           )
+
+
+class Echo(object):
+    # A file-like object returning what is written, for csv.writer
+    def write(self, value):
+        return value
+
+
+def csv_lines(querysets, columns, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(Echo())
+    yield writer.writerow([header for header, _ in columns])
+    for values in export_rows(querysets, columns, chunk_size):
+        yield writer.writerow(
+            [v.isoformat() if hasattr(v, 'isoformat') else v
+             for v in values]
+        )
+
+
+def jsonl_lines(querysets, columns, chunk_size=CHUNK_SIZE):
+    headers = [header for header, _ in columns]
+    for values in export_rows(querysets, columns, chunk_size):
+        yield json.dumps(dict(zip(headers, values)),
+                         cls=DjangoJSONEncoder) + '\n'
+
+
+def export_lines(fmt, querysets, columns, chunk_size=CHUNK_SIZE):
+    if fmt == 'csv':
+        return csv_lines(querysets, columns, chunk_size)
+    return jsonl_lines(querysets, columns, chunk_size)
+
+
+def export_jobs(fmt, queryset, chunk_size=CHUNK_SIZE, archived=None):
+    # archived is an optional JobArchive queryset exported after the jobs
+    querysets = [queryset]
+    if archived is not None:
+        querysets.append(archived_rows(archived))
+    return export_lines(fmt, querysets, JOB_COLUMNS, chunk_size)
+
+
+def export_archived_jobs(fmt, queryset, chunk_size=CHUNK_SIZE):
+    return export_lines(fmt, [archived_rows(queryset)], JOB_COLUMNS,
+                        chunk_size)
+
+
+def export_companies(fmt, queryset, chunk_size=CHUNK_SIZE):
+    return export_lines(fmt, [queryset], COMPANY_COLUMNS, chunk_size)
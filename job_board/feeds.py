@@ -0,0 +1,187 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+
+from job_board.models.category import Category
+from job_board.models.company import Company
+from job_board.models.job import Job
+from job_board.metrics import record_cache
+from job_board.page_cache import get_cache
+from job_board.replicas import primary_reads
+from job_board.sites import get_site_cache_version
+
+# NOTE: Feeds are generated once per change rather than once per poll.  Each
+#       generated feed is stored in the page cache (see PAGE_CACHE_ALIAS)
+#       along with its ETag, and the views serve it from
+#       there without touching the database.  When a job that is or was
+#       listed in a feed changes, the stored feeds for its site, category and
+#       company are dropped and generated again once the change is committed.
+#       The site cache version is part of the key, so changes to a site or
+#       its configuration (name, protocol) make every feed of that site
+#       regenerate on its next request.  Feeds are always generated from
+#       the primary, so that a lagging read replica cannot store a feed
+#       missing the change it was dropped for.
+#
+#       RSS and Atom feeds are produced by the same generator from a single
+#       query, only the feedgenerator class differs.
+
+FEED_TYPES = {
+    'rss': Rss201rev2Feed,
+    'atom': Atom1Feed,
+}
+
+FEED_ITEMS = 30
+
+
+def feed_key(site_id, kind, obj_id, feed_type):
+    return 'feed:%s:%s:%s:%s:%s' % (
+               site_id, get_site_cache_version(), kind, obj_id or '', feed_type
+           )
+
+
+def feed_keys(site_id, kind, obj_id):
+    return [feed_key(site_id, kind, obj_id, feed_type)
+            for feed_type in FEED_TYPES]
+
+
+def active_jobs(site):
+    return Job.objects.select_related('company') \
+                      .filter(site=site) \
+                      .active() \
+                      .order_by('-paid_at')
+
+
+def describe(site, kind, obj_id):
+    # Returns the feed's title, description, link, URL names and jobs
+    if kind == 'site':
+        return ('%s - Jobs Feed' % site.name,
+                'The latest jobs on %s' % site.name,
+                reverse('jobs_index'),
+                ('jobs_feed', 'jobs_feed_atom', ()),
+                active_jobs(site))
+
+    if kind == 'category':
+        category = Category.objects.get(pk=obj_id, site=site)
+        return ('%s - %s Jobs Feed' % (site.name, category.name),
+                'The latest %s jobs on %s' % (category.name, site.name),
+                category.get_absolute_url(),
+                ('categories_feed', 'categories_feed_atom',
+                 (category.id, category.slug())),
+                active_jobs(site).filter(category=category))
+
+    if kind == 'company':
+        company = Company.objects.get(pk=obj_id, site=site)
+        return ('%s - %s Jobs Feed' % (site.name, company.name),
+                'The latest %s jobs on %s' % (company.name, site.name),
+                company.get_absolute_url(),
+                ('companies_feed', 'companies_feed_atom',
+                 (company.id, company.slug())),
+                active_jobs(site).filter(company=company))
+
+    raise ValueError('Unknown feed kind %r' % kind)
+
+
+def generate(site, kind, obj_id):
+    title, description, link, urls, jobs = describe(site, kind, obj_id)
+    rss_url, atom_url, args = urls
+    base = '%s://%s' % (site.siteconfig.protocol, site.domain)
+    jobs = list(jobs[:FEED_ITEMS])
+
+    feeds = {}
+    for feed_type, feed_class in FEED_TYPES.items():
+        url_name = rss_url if feed_type == 'rss' else atom_url
+        feed = feed_class(
+                   title=title,
+                   link=base + link,
+                   description=description,
+                   language=settings.LANGUAGE_CODE,
+                   feed_url=base + reverse(url_name, args=args)
+               )
+        for job in jobs:
+            job_url = base + job.get_absolute_url()
+            feed.add_item(
+                title='%s @ %s' % (job.title, job.company.name),
+                link=job_url,
+                description=job.description_html,
+                unique_id=job_url,
+                pubdate=job.paid_at,
+                updateddate=job.updated_at
+            )
+        content = feed.writeString('utf-8').encode('utf-8')
+        feeds[feed_type] = (content, hashlib.md5(content).hexdigest())
+    return feeds
+
+
+def store(site, kind, obj_id):
+    feeds = generate(site, kind, obj_id)
+    get_cache().set_many(
+        dict((feed_key(site.id, kind, obj_id, feed_type), feed)
+             for feed_type, feed in feeds.items()),
+        getattr(settings, 'FEED_CACHE_TIMEOUT', 86400)
+    )
+    return feeds
+
+
+def get_feed(site, kind, obj_id, feed_type):
+    # Returns (content, etag), raises
+    # ObjectDoesNotExist for unknown categories and companies
+    feed = get_cache().get(feed_key(site.id, kind, obj_id, feed_type))
+    record_cache('feed', feed is not None)
+    if feed is None:
+        with primary_reads():
+            feed = store(site, kind, obj_id)[feed_type]
+    return feed
+
+
+def refresh(site_id, category_ids=(), company_ids=(), site_feed=True):
+    feeds = [('category', i) for i in set(category_ids) if i is not None] + \
+            [('company', i) for i in set(company_ids) if i is not None]
+    if site_feed:
+        feeds.append(('site', None))
+
+    keys = []
+    for kind, obj_id in feeds:
+        keys.extend(feed_keys(site_id, kind, obj_id))
+    get_cache().delete_many(keys)
+
+    def regenerate():
+        site = Site.objects.select_related('siteconfig') \
+                           .filter(pk=site_id).first()
+        if site is None:
+            return
+        for kind, obj_id in feeds:
+            try:
+                store(site, kind, obj_id)
+            except ObjectDoesNotExist:
+                pass
+
+    transaction.on_commit(regenerate)
+
+
+def refresh_job(job, category_id=None, company_id=None):
+    # Only paid jobs are listed in feeds, including ones just expired
+    if job.status == job.DRAFT:
+        return
+    refresh(job.site_id,
+            [job.category_id, category_id],
+            [job.company_id, company_id])
+
+
+def refresh_company(company):
+    # The company name is part of every item title for its jobs
+    category_ids = list(
+                       company.job_set.active()
+                                      .values_list('category_id', flat=True)
+                                      .distinct()
+                   )
+    refresh(company.site_id, category_ids, [company.id],
+            site_feed=bool(category_ids))
+
+
+def refresh_category(category):
+    refresh(category.site_id, [category.id], site_feed=False)
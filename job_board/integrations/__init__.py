@@ -0,0 +1,5 @@
+# NOTE: The Twitter, Stripe and MailChimp SDKs are slow to import and take a
+#       fair amount of memory, while only the outbox worker and the payment
+#       and mailshot code ever use them.  Each is wrapped by a module of this
+#       package which imports its SDK on first use, so that web workers,
+#       migrations and other management commands do not pay for them.
@@ -0,0 +1,28 @@
+def get_client(sc):
+    # sc is the SiteConfig holding the site's MailChimp credentials
+    from mailchimp3 import MailChimp
+
+    return MailChimp(sc.mailchimp_username, sc.mailchimp_api_key)
+
+
+def subscribe(sc, email, fname):
+    # Adds email to the site's list pending confirmation, unless it is
+    # already a member
+    import requests.exceptions
+
+    client = get_client(sc)
+    try:
+        client.lists.members.get(sc.mailchimp_list_id, email)
+    except requests.exceptions.HTTPError as e:
+        if e.response.status_code != 404:
+            raise
+        client.lists.members.create(
+            sc.mailchimp_list_id,
+            {
+                'email_address': email,
+                'status': 'pending',
+                'merge_fields': {
+                    'FNAME': fname
+                },
+            }
+        )
@@ -0,0 +1,20 @@
+class CardError(Exception):
+    # The card was declined, the message can be shown to the customer
+    pass
+
+
+def charge(secret_key, token, amount, description, receipt_email):
+    # Charges amount cents in USD to the card behind the Stripe token
+    import stripe
+
+    try:
+        return stripe.Charge.create(
+            api_key=secret_key,
+            source=token,
+            amount=amount,
+            currency='usd',
+            description=description,
+            receipt_email=receipt_email
+        )
+    except stripe.error.CardError as e:
+        raise CardError(e.json_body['error']['message'])
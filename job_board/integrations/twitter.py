@@ -0,0 +1,13 @@
+def update_status(sc, status):
+    # sc is the SiteConfig holding the site's Twitter credentials
+    import tweepy
+
+    auth = tweepy.OAuthHandler(
+               sc.twitter_consumer_key,
+               sc.twitter_consumer_secret
+           )
+    auth.set_access_token(
+        sc.twitter_access_token,
+        sc.twitter_access_token_secret
+    )
+    return tweepy.API(auth).update_status(status)
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from job_board.bulk import jobs_bulk_changed
+from job_board.models.job import Job
+from job_board.models.job_archive import JobArchive
+
+# NOTE: Jobs are deleted with a single DELETE per batch rather than through
+#       the ORM, which would load them again and run the signal handlers for
+#       each one, and jobs_bulk_changed() updates the rest once per batch.
+#       Archived jobs are displayed the same way, so the pages only change
+#       in their Last-Modified date.
+
+
+class Command(BaseCommand):
+    help = 'Move jobs expired for longer than a number of days to the archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'ARCHIVE_JOBS_AFTER_DAYS', 180),
+            help='Archive jobs expired for longer than this many days'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many jobs would be archived without archiving '
+                 'them'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of jobs to archive per transaction'
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        expired_before = timezone.now() - timedelta(days=options['days'])
+
+        for site in Site.objects.all():
+            jobs = Job.objects.filter(site=site) \
+                              .filter(status=Job.EXPIRED) \
+                              .filter(expired_at__lt=expired_before)
+
+            if options['dry_run']:
+                msg = "[%s] %s jobs would be archived" % (site.name,
+                                                          jobs.count())
+                self.stdout.write(self.style.SUCCESS(msg))
+                continue
+
+            count = 0
+            while True:
+                with transaction.atomic():
+                    batch = jobs.select_for_update().order_by('id')
+                    batch = list(batch[:options['batch_size']])
+                    if not batch:
+                        break
+                    ids = [job.id for job in batch]
+                    JobArchive.objects.bulk_create(
+                        [JobArchive.from_job(job) for job in batch]
+                    )
+                    self.delete(ids)
+                    # Archived jobs are still expired
+                    jobs_bulk_changed(site.id,
+                                      [(job.id, job.category_id,
+                                        job.company_id) for job in batch],
+                                      Job.EXPIRED, Job.EXPIRED)
+                count += len(ids)
+
+            msg = "[%s] %s jobs archived" % (site.name, count)
+            self.stdout.write(self.style.SUCCESS(msg))
+
+    def delete(self, ids):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM %s WHERE id IN (%s)' % (
+                    Job._meta.db_table, ', '.join(['%s'] * len(ids))
+                ),
+                ids
+            )
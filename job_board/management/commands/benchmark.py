@@ -0,0 +1,364 @@
+import json
+import math
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from job_board import urls
+from job_board.bulk import jobs_bulk_changed
+from job_board.models.category import Category
+from job_board.models.company import Company
+from job_board.models.job import Job
+from utils.misc import convert_markdown
+
+# NOTE: The synthetic dataset is created inside a transaction which is rolled
+#       back once every route has been measured, so the benchmark can be run
+#       against a copy of any database.  Pages are cached in a private
+#       in-memory cache and the read replica is not used, since neither would
+#       see the uncommitted rows.
+
+# Routes that change data or only answer POST requests
+SKIPPED_ROUTES = set([
+    'jobs_activate', 'jobs_expire', 'charge_card', 'charge_token',
+    'subscribe',
+])
+
+QUERY_PARAMS = {
+    'jobs_search': {'query': 'developer'},
+}
+
+# Arguments of routes not taking a job, category or company
+ROUTE_KWARGS = {
+    'sitemap_section': {'section': 'jobs', 'chunk': 0},
+}
+
+BENCHMARK_CACHE = 'benchmark'
+DOMAIN = 'benchmark.invalid'
+
+# Latency differences smaller than this are timer noise
+NOISE_MS = 1.0
+
+WORDS = (
+    'scalable distributed systems team product customers platform data '
+    'services reliable remote collaborate design build ship maintain '
+    'mentor review deploy monitor improve performance api frontend backend '
+    'infrastructure testing automation growth users experience modern'
+).split()
+
+TITLES = [
+    'Software Developer', 'Backend Engineer', 'Frontend Developer',
+    'Site Reliability Engineer', 'Data Engineer', 'Product Designer',
+    'Engineering Manager', 'QA Analyst', 'DevOps Engineer',
+    'Full Stack Developer',
+]
+
+CATEGORIES = [
+    'Software Development', 'Design', 'Operations', 'Data Science',
+    'Management', 'Quality Assurance', 'Support', 'Marketing',
+]
+
+
+def sentence(rng, words=12):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def description(rng):
+    # Markdown with the headings, emphasis, lists and links job posts use
+    parts = [
+        '## About us',
+        ' '.join(sentence(rng) for _ in range(3)),
+        '## What you will do',
+        '\n'.join('* %s' % sentence(rng, 8) for _ in range(5)),
+        '## Requirements',
+        '\n'.join('%d. **%s** %s' % (i + 1, rng.choice(WORDS),
+                                     sentence(rng, 6))
+                  for i in range(4)),
+        'Read more about [our team](http://www.example.com/team) and '
+        '_apply today_.',
+    ]
+    return '\n\n'.join(parts)
+
+
+def percentile(values, p):
+    # Nearest-rank percentile
+    ordered = sorted(values)
+    return ordered[max(0, int(math.ceil(p / 100.0 * len(ordered))) - 1)]
+
+
+class QueryTimer(object):
+    def __init__(self):
+        self.count = 0
+        self.time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.time += time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = 'Seed a synthetic dataset and report the latency and queries ' \
+           'of every page'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sites', type=int, default=1)
+        parser.add_argument('--categories', type=int, default=8,
+                            help='Categories per site')
+        parser.add_argument('--companies', type=int, default=50,
+                            help='Companies per site')
+        parser.add_argument('--jobs', type=int, default=1000,
+                            help='Jobs per site')
+        parser.add_argument('--requests', type=int, default=20,
+                            help='Requests measured per route')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            metavar='FILE',
+            help='Write the report to FILE, for use as a later baseline'
+        )
+        parser.add_argument(
+            '--baseline',
+            metavar='FILE',
+            help='Compare the results with a report saved with --output'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=20.0,
+            help='Percentage by which p95 latency may exceed the baseline'
+        )
+        parser.add_argument(
+            '--fail-on-regression',
+            action='store_true',
+            help='Exit with an error if any route regressed'
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1')
+        if options['jobs'] < 1 or options['categories'] < 1 or \
+                options['companies'] < 1:
+            raise CommandError('At least one job, category and company '
+                               'per site is needed')
+
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+
+        caches = dict(settings.CACHES)
+        caches[BENCHMARK_CACHE] = {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'job_board.benchmark',
+        }
+        with transaction.atomic(), \
+                override_settings(CACHES=caches,
+                                  PAGE_CACHE_ALIAS=BENCHMARK_CACHE,
+                                  READ_REPLICA_ALIAS=None,
+                                  SITE_ID=None,
+                                  ALLOWED_HOSTS=['.' + DOMAIN]):
+            data = self.seed(random.Random(options['seed']), options)
+            routes = self.run_routes(data, options['requests'])
+            transaction.set_rollback(True)
+
+        report = {
+            'vendor': connection.vendor,
+            'dataset': dict((k, options[k]) for k in
+                            ('sites', 'categories', 'companies', 'jobs',
+                             'requests', 'seed')),
+            'routes': routes,
+        }
+        if baseline is not None:
+            report['regressions'] = self.compare(routes, baseline['routes'],
+                                                 options['threshold'])
+
+        content = json.dumps(report, indent=2, sort_keys=True)
+        self.stdout.write(content)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(content)
+
+        if report.get('regressions'):
+            for regression in report['regressions']:
+                self.stderr.write('Regression: %s' % regression)
+            if options['fail_on_regression']:
+                raise CommandError(
+                    '%s routes regressed' % len(report['regressions'])
+                )
+
+    def seed(self, rng, options):
+        user = User.objects.create_user('user@' + DOMAIN, password=None)
+        # Rendering is the expensive part of creating jobs, so a handful of
+        # descriptions are rendered once and shared
+        descriptions = []
+        for _ in range(20):
+            text = description(rng)
+            descriptions.append((text, convert_markdown(text)))
+        application_info = 'Send your resume to **jobs@example.com**'
+        application_info_html = convert_markdown(application_info)
+
+        now = timezone.now()
+        first = None
+        for s in range(options['sites']):
+            site = Site.objects.create(
+                       domain='site%s.%s' % (s, DOMAIN),
+                       name='Benchmark %s' % s
+                   )
+            categories = Category.objects.bulk_create(
+                Category(name=CATEGORIES[i % len(CATEGORIES)] +
+                         ('' if i < len(CATEGORIES) else ' %s' % i),
+                         site=site)
+                for i in range(options['categories'])
+            )
+            companies = Company.objects.bulk_create(
+                Company(name='Company %s' % i,
+                        url='http://company%s.example.com' % i,
+                        site=site, user=user)
+                for i in range(options['companies'])
+            )
+
+            jobs = []
+            for i in range(options['jobs']):
+                text, html = rng.choice(descriptions)
+                # Most jobs are active, the rest are unpaid or expired
+                state = rng.random() if i else 0
+                if state < 0.8:
+                    status = Job.ACTIVE
+                elif state < 0.9:
+                    status = Job.EXPIRED
+                else:
+                    status = Job.DRAFT
+                paid_at = None
+                expired_at = None
+                if status != Job.DRAFT:
+                    paid_at = now - timedelta(days=rng.randint(0, 29),
+                                              seconds=rng.randint(0, 86399))
+                if status == Job.EXPIRED:
+                    expired_at = now
+                remote = rng.random() < 0.3
+                jobs.append(Job(
+                    title=rng.choice(TITLES),
+                    description=text,
+                    description_html=html,
+                    application_info=application_info,
+                    application_info_html=application_info_html,
+                    email='jobs@example.com',
+                    category=rng.choice(categories),
+                    company=rng.choice(companies),
+                    site=site,
+                    user=user,
+                    remote=remote,
+                    city='' if remote else 'Toronto',
+                    state='' if remote else 'Ontario',
+                    status=status,
+                    paid_at=paid_at,
+                    expired_at=expired_at,
+                ))
+            jobs = Job.objects.bulk_create(jobs, batch_size=500)
+
+            # bulk_create() skips Job.save() and sends no signals
+            for status in Job.PAID_STATUSES:
+                jobs_bulk_changed(site.id,
+                                  [(job.id, job.category_id, job.company_id)
+                                   for job in jobs if job.status == status],
+                                  Job.DRAFT, status)
+
+            if first is None:
+                first = {
+                    'site': site,
+                    'user': user,
+                    'job': next(j for j in jobs if j.status == Job.ACTIVE),
+                    'category': categories[0],
+                    'company': companies[0],
+                }
+        return first
+
+    def route_kwargs(self, pattern, data):
+        kwargs = dict(ROUTE_KWARGS.get(pattern.name, {}))
+        groups = pattern.pattern.regex.groupindex
+        for kind in ('job', 'category', 'company'):
+            if '%s_id' % kind in groups:
+                obj = data[kind]
+                kwargs['%s_id' % kind] = obj.id
+                if 'slug' in groups:
+                    kwargs['slug'] = obj.slug()
+        return kwargs
+
+    def run_routes(self, data, requests):
+        host = data['site'].domain
+        anonymous = Client(HTTP_HOST=host)
+        authenticated = Client(HTTP_HOST=host)
+        authenticated.force_login(data['user'])
+
+        results = {'anonymous': {}, 'authenticated': {}}
+        seen = set()
+        for pattern in urls.urlpatterns:
+            name = pattern.name
+            if name in seen or name in SKIPPED_ROUTES:
+                continue
+            seen.add(name)
+            url = reverse(name, kwargs=self.route_kwargs(pattern, data))
+            params = QUERY_PARAMS.get(name, {})
+            for label, client in (('anonymous', anonymous),
+                                  ('authenticated', authenticated)):
+                results[label][name] = self.measure(client, url, params,
+                                                    requests)
+        return results
+
+    def measure(self, client, url, params, requests):
+        # The first request fills the page and feed caches and is reported
+        # on its own
+        timings = []
+        for _ in range(requests + 1):
+            timer = QueryTimer()
+            with connection.execute_wrapper(timer):
+                start = time.perf_counter()
+                response = client.get(url, params)
+                elapsed = (time.perf_counter() - start) * 1000
+            timings.append((elapsed, timer.count, timer.time * 1000))
+
+        first, timings = timings[0], timings[1:]
+        return {
+            'status': response.status_code,
+            'first_ms': round(first[0], 2),
+            'first_queries': first[1],
+            'p50_ms': round(percentile([t[0] for t in timings], 50), 2),
+            'p95_ms': round(percentile([t[0] for t in timings], 95), 2),
+            'queries': max(t[1] for t in timings),
+            'sql_ms': round(sum(t[2] for t in timings) / len(timings), 2),
+        }
+
+    def compare(self, routes, baseline, threshold):
+        regressions = []
+        for label, results in sorted(routes.items()):
+            for name, result in sorted(results.items()):
+                before = baseline.get(label, {}).get(name)
+                if before is None:
+                    continue
+                route = '%s (%s)' % (name, label)
+                for key in ('first_queries', 'queries'):
+                    if result[key] > before[key]:
+                        regressions.append('%s %s %s -> %s' % (
+                            route, key, before[key], result[key]
+                        ))
+                limit = max(before['p95_ms'] * (1 + threshold / 100.0),
+                            before['p95_ms'] + NOISE_MS)
+                if result['p95_ms'] > limit:
+                    regressions.append('%s p95_ms %s -> %s' % (
+                        route, before['p95_ms'], result['p95_ms']
+                    ))
+        return regressions
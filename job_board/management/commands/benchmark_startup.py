@@ -0,0 +1,84 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Third party SDKs which should only be imported when they are used, see
+# job_board.integrations
+SDKS = ('mailchimp3', 'requests', 'stripe', 'tweepy')
+
+# Run in a fresh interpreter, as a worker process starts.  ru_maxrss is in
+# kilobytes on Linux.
+SCRIPT = '''
+import json
+import resource
+import sys
+import time
+
+start = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter() - start
+from django.urls import get_resolver
+get_resolver().url_patterns
+urlconf = time.perf_counter() - start
+print(json.dumps({
+    'setup_seconds': setup,
+    'urlconf_seconds': urlconf,
+    'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    'modules': len(sys.modules),
+    'sdks': sorted(m for m in %r if m in sys.modules),
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Measure the time and memory taken to start Django and load ' \
+           'the URLconf in a new process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument(
+            '--output',
+            metavar='FILE',
+            help='Also write the report to FILE as JSON'
+        )
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be at least 1')
+
+        env = dict(os.environ,
+                   DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        runs = []
+        for _ in range(options['runs']):
+            result = subprocess.run(
+                         [sys.executable, '-c', SCRIPT % (SDKS,)],
+                         cwd=settings.BASE_DIR,
+                         env=env,
+                         stdout=subprocess.PIPE,
+                         stderr=subprocess.PIPE,
+                         universal_newlines=True
+                     )
+            if result.returncode != 0:
+                raise CommandError('Startup failed:\n%s' % result.stderr)
+            runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+        # Medians, as the first run also pays for a cold disk cache
+        report = dict(
+            (key, round(statistics.median(run[key] for run in runs), 4))
+            for key in ('setup_seconds', 'urlconf_seconds', 'max_rss_kb',
+                        'modules')
+        )
+        report['runs'] = options['runs']
+        report['sdks'] = runs[-1]['sdks']
+
+        content = json.dumps(report, indent=2, sort_keys=True)
+        self.stdout.write(content)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(content)
@@ -2,7 +2,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.contrib.sites.models import Site
 from django.core.exceptions import ObjectDoesNotExist
 
-from mailchimp3 import MailChimp
+from job_board.integrations import mailchimp
 
 
 class Command(BaseCommand):
@@ -24,10 +24,7 @@ class Command(BaseCommand):
             if (site.siteconfig.mailchimp_username and
                     site.siteconfig.mailchimp_api_key):
 
-                client = MailChimp(
-                             site.siteconfig.mailchimp_username,
-                             site.siteconfig.mailchimp_api_key
-                         )
+                client = mailchimp.get_client(site.siteconfig)
 
                 try:
                     lists = client.lists.all()
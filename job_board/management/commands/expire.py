@@ -2,23 +2,132 @@ from datetime import timedelta
 
 from django.core.management.base import BaseCommand
 from django.contrib.sites.models import Site
+from django.db import connection, transaction
+from django.template.loader import get_template
 from django.utils import timezone
 
+from job_board.bulk import jobs_bulk_changed
 from job_board.models.job import Job
+from job_board.outbox import enqueue_mass_mail
+
+
+BATCH_SIZE = 500
+
+
+def expired_before(site):
+    return timezone.now() - timedelta(days=site.siteconfig.expire_after)
+
+
+def jobs_to_expire(site, days_ago):
+    return Job.objects.filter(site=site) \
+                      .active() \
+                      .filter(paid_at__lt=days_ago)
+
+
+def batch_ids(site, days_ago, batch_size):
+    # The ids of the next batch of jobs to expire, explain_queries shows the
+    # plan of this query
+    ids = jobs_to_expire(site, days_ago).order_by('id') \
+                                        .values_list('id', flat=True)
+    return ids[:batch_size]
 
 
 class Command(BaseCommand):
-    help = 'Expire all jobs older than 30 days'
+    help = "Expire all jobs older than their site's expire_after days"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many jobs would be expired without expiring them'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Number of jobs to expire and notify per query'
+        )
 
     def handle(self, *args, **options):
-        for site in Site.objects.all():
-            td = timedelta(days=site.siteconfig.expire_after)
-            days_ago = timezone.now() - td
-            jobs = Job.objects.filter(site=site) \
-                              .filter(paid_at__lt=days_ago) \
-                              .filter(expired_at__isnull=True)
-            for job in jobs:
-                job.expire()
-
-            msg = "[%s] %s jobs expired" % (site.name, len(jobs))
+        template = get_template('job_board/emails/expired.txt')
+
+        for site in Site.objects.select_related('siteconfig'):
+            days_ago = expired_before(site)
+
+            if options['dry_run']:
+                count = jobs_to_expire(site, days_ago).count()
+                msg = "[%s] %s jobs would be expired" % (site.name, count)
+                self.stdout.write(self.style.SUCCESS(msg))
+                continue
+
+            count = 0
+            while True:
+                with transaction.atomic():
+                    rows = self.expire_batch(
+                               site, days_ago, options['batch_size']
+                           )
+                    if not rows:
+                        break
+                    ids = [row[0] for row in rows]
+                    jobs_bulk_changed(site.id, rows, Job.ACTIVE, Job.EXPIRED)
+                    self.notify(site, template, ids)
+                count += len(ids)
+
+            msg = "[%s] %s jobs expired" % (site.name, count)
             self.stdout.write(self.style.SUCCESS(msg))
+
+    def expire_batch(self, site, days_ago, batch_size):
+        # Returns (id, category_id, company_id) for each expired job
+        now = timezone.now()
+        ids = batch_ids(site, days_ago, batch_size)
+        if supports_update_returning():
+            adapt = connection.ops.adapt_datetimefield_value
+            sql, params = ids.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'UPDATE %s SET status = %%s, expired_at = %%s, '
+                    'updated_at = %%s '
+                    'WHERE id IN (%s) '
+                    'AND status = %%s '
+                    'RETURNING id, category_id, company_id' % (
+                        Job._meta.db_table, sql
+                    ),
+                    (Job.EXPIRED, adapt(now), adapt(now)) + tuple(params) +
+                    (Job.ACTIVE,)
+                )
+                return [tuple(row) for row in cursor.fetchall()]
+
+        ids = list(ids)
+        Job.objects.filter(id__in=ids) \
+                   .active() \
+                   .update(status=Job.EXPIRED, expired_at=now, updated_at=now)
+        # Only report jobs we expired, not ones expired concurrently
+        return list(
+                   Job.objects.filter(id__in=ids)
+                              .filter(expired_at=now)
+                              .values_list('id', 'category_id', 'company_id')
+               )
+
+    def notify(self, site, template, ids):
+        protocol = site.siteconfig.protocol
+        subject = 'Your %s job has expired' % site.name
+        datatuple = []
+        for job in Job.objects.filter(id__in=ids).only('id', 'email'):
+            # All jobs belong to this site, so avoid loading it for each one
+            job.site = site
+            context = {'job': job, 'protocol': protocol}
+            datatuple.append((
+                subject,
+                template.render(context),
+                site.siteconfig.admin_email,
+                [job.email]
+            ))
+        enqueue_mass_mail(datatuple)
+
+
+def supports_update_returning():
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor == 'sqlite':
+        return connection.Database.sqlite_version_info >= (3, 35)
+    return False
@@ -0,0 +1,165 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.sites.models import Site
+from django.db import connection, transaction
+
+from job_board.management.commands.expire import (BATCH_SIZE, batch_ids,
+                                                  expired_before)
+from job_board.models.category import Category
+from job_board.models.company import Company
+from job_board.models.job import Job
+
+
+def active_jobs(site):
+    return Job.objects.listing() \
+                      .filter(site=site) \
+                      .active()
+
+
+# The job queries behind the public pages and jobs_mine, keyed by view name.
+# Paginated listings fetch one row more than a page, see job_board.pagination
+QUERIES = [
+    ('jobs_index',
+     lambda site, ids: active_jobs(site).order_by('-paid_at')[:10]),
+    ('categories_show',
+     lambda site, ids: active_jobs(site).filter(category_id=ids['category'])
+                                        .order_by('-paid_at', '-id')[:26]),
+    ('categories_feed',
+     lambda site, ids: Job.objects.select_related('company')
+                                  .filter(site=site)
+                                  .filter(category_id=ids['category'])
+                                  .active()
+                                  .order_by('-paid_at')[:30]),
+    ('companies_show',
+     lambda site, ids: Job.objects.listing()
+                                  .filter(site=site)
+                                  .filter(company_id=ids['company'])
+                                  .paid()
+                                  .order_by('-paid_at', '-id')[:26]),
+    ('jobs_mine',
+     lambda site, ids: Job.objects.listing()
+                                  .filter(site=site)
+                                  .filter(user_id=ids['user'])
+                                  .order_by('-created_at', '-id')[:26]),
+    ('expire',
+     lambda site, ids: batch_ids(site, expired_before(site),
+                                 BATCH_SIZE)),
+]
+
+
+class Command(BaseCommand):
+    help = 'Show query plans for the job listing queries, optionally ' \
+           'compared with the plans without the job indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--site',
+            metavar='DOMAIN',
+            help='Site to explain the queries for, defaults to the first site'
+        )
+        parser.add_argument(
+            '--output',
+            metavar='FILE',
+            help='Also write the plans to FILE as JSON'
+        )
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Run the queries and report actual timings (PostgreSQL)'
+        )
+        parser.add_argument(
+            '--without-indexes',
+            action='store_true',
+            help='Also show the plans with the job indexes dropped, in a '
+                 'transaction that is rolled back'
+        )
+        parser.add_argument(
+            '--allow-locking',
+            action='store_true',
+            help='Allow --without-indexes on databases other than SQLite, '
+                 'where it locks the jobs table until the plans are done'
+        )
+
+    def handle(self, *args, **options):
+        sites = Site.objects.order_by('id')
+        if options['site']:
+            sites = sites.filter(domain=options['site'])
+        site = sites.first()
+        if site is None:
+            raise CommandError('No site found')
+
+        # Explain queries for existing rows where there are any, so that the
+        # planner sees realistic selectivity
+        job = Job.objects.filter(site=site).order_by('-id').first()
+        ids = {
+            'category': Category.objects.filter(site=site)
+                                        .values_list('id', flat=True)
+                                        .first() or 0,
+            'company': Company.objects.filter(site=site)
+                                      .values_list('id', flat=True)
+                                      .first() or 0,
+            'user': job.user_id if job else 0,
+        }
+
+        explain_options = {}
+        if options['analyze']:
+            if connection.vendor != 'postgresql':
+                raise CommandError('--analyze requires PostgreSQL')
+            explain_options = {'analyze': True, 'buffers': True}
+
+        plans = {}
+        if options['without_indexes']:
+            # NOTE: DROP INDEX locks the jobs table until the transaction is
+            #       rolled back, on PostgreSQL blocking every read and write
+            #       of jobs for as long as the plans (or, with --analyze, the
+            #       queries) take.
+            if not connection.features.can_rollback_ddl:
+                raise CommandError(
+                    'Indexes cannot be dropped in a transaction on %s' %
+                    connection.vendor
+                )
+            if connection.vendor != 'sqlite' and not options['allow_locking']:
+                raise CommandError(
+                    '--without-indexes locks the jobs table on %s, pass '
+                    '--allow-locking to run it anyway' % connection.vendor
+                )
+            self.stderr.write(self.style.WARNING(
+                'Dropping the job indexes, the jobs table is locked until '
+                'the plans without them are done'
+            ))
+            for name, plan in self.explain(site, ids, explain_options,
+                                           without_indexes=True):
+                plans[name] = {'without_indexes': plan}
+        for name, plan in self.explain(site, ids, explain_options):
+            plans.setdefault(name, {})['with_indexes'] = plan
+
+        for name, _ in QUERIES:
+            self.stdout.write(self.style.MIGRATE_HEADING('== %s ==' % name))
+            for label in ('without_indexes', 'with_indexes'):
+                if label in plans[name]:
+                    self.stdout.write('-- %s --' % label.replace('_', ' '))
+                    self.stdout.write(plans[name][label])
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'vendor': connection.vendor, 'site': site.domain,
+                           'plans': plans}, f, indent=2, sort_keys=True)
+
+    def explain(self, site, ids, explain_options, without_indexes=False):
+        plans = []
+        with transaction.atomic():
+            if without_indexes:
+                # Dropping the indexes is rolled back at the end of the block
+                with connection.cursor() as cursor:
+                    for index in Job._meta.indexes:
+                        cursor.execute(
+                            'DROP INDEX %s' %
+                            connection.ops.quote_name(index.name)
+                        )
+            for name, query in QUERIES:
+                plans.append(
+                    (name, query(site, ids).explain(**explain_options))
+                )
+            transaction.set_rollback(True)
+        return plans
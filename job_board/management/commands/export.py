@@ -0,0 +1,91 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from job_board.exports import (CHUNK_SIZE, FORMATS, export_companies,
+                               export_jobs)
+from job_board.models.company import Company
+from job_board.models.job import Job
+from job_board.models.job_archive import JobArchive
+
+
+def parse_date(value):
+    try:
+        date = datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError('Dates must be given as YYYY-MM-DD')
+    return timezone.make_aware(datetime.combine(date, time.min))
+
+
+class Command(BaseCommand):
+    help = 'Export jobs or companies as CSV or JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['jobs', 'companies'])
+        parser.add_argument('--format', choices=sorted(FORMATS),
+                            default='csv')
+        parser.add_argument('--site', metavar='DOMAIN')
+        parser.add_argument(
+            '--since',
+            metavar='YYYY-MM-DD',
+            help='Only export jobs created on or after this date'
+        )
+        parser.add_argument(
+            '--until',
+            metavar='YYYY-MM-DD',
+            help='Only export jobs created on or before this date'
+        )
+        parser.add_argument(
+            '--output',
+            metavar='FILE',
+            help='Write to FILE rather than standard output'
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def filter(self, queryset, options):
+        if options['since']:
+            queryset = queryset.filter(
+                           created_at__gte=parse_date(options['since'])
+                       )
+        if options['until']:
+            queryset = queryset.filter(
+                           created_at__lt=parse_date(options['until']) +
+                           timedelta(days=1)
+                       )
+        if options['site']:
+            try:
+                site = Site.objects.get(domain=options['site'])
+            except Site.DoesNotExist:
+                raise CommandError(
+                          'Site %s does not exist' % options['site']
+                      )
+            queryset = queryset.filter(site=site)
+        return queryset
+
+    def handle(self, *args, **options):
+        if options['kind'] == 'jobs':
+            # Archived jobs follow the jobs, so that all jobs are exported
+            lines = export_jobs(
+                        options['format'],
+                        self.filter(Job.objects.all(), options),
+                        options['chunk_size'],
+                        archived=self.filter(JobArchive.objects.all(),
+                                             options)
+                    )
+        else:
+            if options['since'] or options['until']:
+                raise CommandError('--since and --until only apply to jobs')
+            lines = export_companies(
+                        options['format'],
+                        self.filter(Company.objects.all(), options),
+                        options['chunk_size']
+                    )
+        if options['output']:
+            with open(options['output'], 'w', newline='',
+                      encoding='utf-8') as f:
+                f.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,266 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from django import forms
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from job_board.bulk import jobs_bulk_changed
+from job_board.forms import JobForm
+from job_board.models.category import Category
+from job_board.models.company import Company
+from job_board.models.country import Country
+from job_board.models.job import Job
+
+# NOTE: Companies, categories and countries are given by name and looked up
+#       in maps loaded once per import, so validating a row runs no queries.
+#       Unknown ones are created, once, when the first valid row using them is
+#       imported (a company needs a company_url to be created).  Jobs are
+#       inserted with bulk_create(), which skips Job.save() and the signal
+#       handlers, so the command renders Markdown itself and updates the
+#       rest with jobs_bulk_changed().
+
+BOOLEANS = {'1': True, 'true': True, 'yes': True,
+            '0': False, 'false': False, 'no': False, '': False}
+
+
+class LookupField(forms.Field):
+    # Resolves a name through the import's in-memory map
+    def __init__(self, kind, **kwargs):
+        super(LookupField, self).__init__(**kwargs)
+        self.kind = kind
+        self.lookup = {}
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        obj = self.lookup.get(str(value).strip().lower())
+        if obj is None:
+            raise ValidationError('Unknown %s "%s"' % (self.kind, value))
+        return obj
+
+
+class ImportJobForm(JobForm):
+    company = LookupField('company')
+    category = LookupField('category')
+    country = LookupField('country', required=False)
+
+    class Meta(JobForm.Meta):
+        # The related objects are resolved by the lookup fields above, so
+        # they are left out of model validation, which would query for them
+        fields = [f for f in JobForm.Meta.fields
+                  if f not in ('company', 'category', 'country')]
+
+    def __init__(self, *args, **kwargs):
+        lookups = kwargs.pop('lookups')
+        super(ImportJobForm, self).__init__(*args, **kwargs)
+        for name in ('company', 'category', 'country'):
+            self.fields[name].lookup = lookups[name]
+
+
+def read_csv(f):
+    reader = csv.DictReader(f)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_jsonl(f):
+    for line_num, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            raise CommandError('Line %s is not valid JSON: %s' % (line_num, e))
+        if not isinstance(row, dict):
+            raise CommandError('Line %s is not a JSON object' % line_num)
+        yield line_num, row
+
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl}
+
+
+def name_key(name):
+    return str(name or '').strip().lower()
+
+
+class Command(BaseCommand):
+    help = 'Import jobs from a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', metavar='FILE')
+        parser.add_argument('--site', metavar='DOMAIN', required=True)
+        parser.add_argument(
+            '--user',
+            metavar='USERNAME',
+            required=True,
+            help='User the jobs, and any new companies, will belong to'
+        )
+        parser.add_argument(
+            '--format',
+            choices=sorted(READERS),
+            help='Defaults to the extension of FILE'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Number of rows validated and inserted per transaction'
+        )
+        parser.add_argument(
+            '--activate',
+            action='store_true',
+            help='Make the imported jobs active, without tweeting them'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the rows without importing them'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            self.site = Site.objects.select_related('siteconfig') \
+                                    .get(domain=options['site'])
+        except Site.DoesNotExist:
+            raise CommandError('Site %s does not exist' % options['site'])
+        try:
+            self.user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError('User %s does not exist' % options['user'])
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        fmt = options['format'] or \
+            os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if fmt not in READERS:
+            raise CommandError('Unknown format, pass --format csv or jsonl')
+
+        self.lookups = {
+            'company': dict((name_key(c.name), c) for c in
+                            Company.objects.filter(site=self.site)),
+            'category': dict((name_key(c.name), c) for c in
+                             Category.objects.filter(site=self.site)),
+            'country': dict((name_key(c.name), c) for c in
+                            Country.objects.all()),
+        }
+        self.activate = options['activate']
+        self.dry_run = options['dry_run']
+
+        imported = skipped = 0
+        with open(options['path'], newline='', encoding='utf-8') as f:
+            rows = READERS[fmt](f)
+            while True:
+                chunk = list(islice(rows, options['chunk_size']))
+                if not chunk:
+                    break
+                jobs, errors = self.validate(chunk)
+                for line_num, message in errors:
+                    self.stderr.write('Line %s: %s' % (line_num, message))
+                skipped += len(errors)
+                if jobs and not self.dry_run:
+                    self.insert(jobs)
+                imported += len(jobs)
+
+        msg = '%s jobs %s, %s rows skipped' % (
+                  imported,
+                  'would be imported' if self.dry_run else 'imported',
+                  skipped
+              )
+        self.stdout.write(self.style.SUCCESS(msg))
+
+    def resolve(self, kind, row):
+        # Adds an unsaved object to the lookup map for a name not seen
+        # before, it is saved along with the first valid row using it
+        key = name_key(row.get(kind))
+        if not key or key in self.lookups[kind]:
+            return
+        name = str(row[kind]).strip()
+        if kind == 'company':
+            if not row.get('company_url'):
+                return
+            obj = Company(name=name, url=row['company_url'],
+                          twitter=row.get('company_twitter') or None,
+                          site=self.site, user=self.user)
+        elif kind == 'category':
+            obj = Category(name=name, site=self.site)
+        else:
+            obj = Country(name=name)
+        try:
+            obj.clean_fields(exclude=['site', 'user', 'country'])
+        except ValidationError as e:
+            raise ValidationError('Cannot create %s "%s": %s' % (
+                kind, name, '; '.join(
+                    '%s: %s' % (field, ' '.join(messages))
+                    for field, messages in e.message_dict.items()
+                )
+            ))
+        self.lookups[kind][key] = obj
+
+    def validate(self, chunk):
+        jobs = []
+        errors = []
+        for line_num, row in chunk:
+            data = dict((k, v) for k, v in row.items() if k is not None)
+            remote = data.get('remote', False)
+            if not isinstance(remote, bool):
+                remote = BOOLEANS.get(name_key(remote))
+                if remote is None:
+                    errors.append((line_num, 'remote: Must be true or false'))
+                    continue
+            # Jobs posted to remote-only boards are always remote
+            data['remote'] = remote or self.site.siteconfig.remote
+
+            try:
+                for kind in ('company', 'category', 'country'):
+                    self.resolve(kind, data)
+            except ValidationError as e:
+                errors.append((line_num, e.messages[0]))
+                continue
+
+            form = ImportJobForm(
+                       data,
+                       instance=Job(site=self.site, user=self.user),
+                       lookups=self.lookups
+                   )
+            if not form.is_valid():
+                errors.append((line_num, '; '.join(
+                    '%s: %s' % (field, ' '.join(messages))
+                    for field, messages in form.errors.items()
+                )))
+                continue
+
+            job = form.save(commit=False)
+            job.company = form.cleaned_data['company']
+            job.category = form.cleaned_data['category']
+            job.country = form.cleaned_data['country']
+            jobs.append(job)
+        return jobs, errors
+
+    def insert(self, jobs):
+        now = timezone.now()
+        with transaction.atomic():
+            # Companies, categories and countries created for these rows
+            for job in jobs:
+                for obj in (job.country, job.category, job.company):
+                    if obj is not None and obj.pk is None:
+                        obj.save()
+
+            for job in jobs:
+                job.render_markdown()
+                if self.activate:
+                    job.status = Job.ACTIVE
+                    job.paid_at = now
+            jobs = Job.objects.bulk_create(jobs)
+
+            if self.activate:
+                jobs_bulk_changed(self.site.id,
+                                  [(job.id, job.category_id, job.company_id)
+                                   for job in jobs],
+                                  Job.DRAFT, Job.ACTIVE)
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from job_board.models.job import Job
+from job_board.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the job search index from all active jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        jobs = Job.objects.active() \
+                          .only('title', 'description', 'status')
+
+        count = 0
+        with transaction.atomic():
+            backend.clear()
+            for job in jobs.iterator(chunk_size=options['batch_size']):
+                backend.index(job)
+                count += 1
+
+        msg = "%s jobs indexed using %s" % (count, type(backend).__name__)
+        self.stdout.write(self.style.SUCCESS(msg))
@@ -0,0 +1,70 @@
+from functools import reduce
+from operator import or_
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from job_board.models.category import Category
+from job_board.models.company import Company
+from job_board.models.job import Job
+from job_board.models.job_archive import JobArchive
+
+
+def counted(model, field, **filters):
+    # The number of rows of model pointing to the outer row
+    rows = model.objects.filter(**{field: OuterRef('pk')}) \
+                        .filter(**filters) \
+                        .order_by() \
+                        .values(field) \
+                        .annotate(count=Count('pk')) \
+                        .values('count')
+    return Coalesce(Subquery(rows), 0)
+
+
+def expected_counts():
+    # The counter columns of each model, and the counts they should hold
+    return [
+        (Category, {
+            'active_count': counted(Job, 'category', status=Job.ACTIVE),
+        }),
+        (Company, {
+            'active_count': counted(Job, 'company', status=Job.ACTIVE),
+            'paid_count': counted(Job, 'company',
+                                  status__in=Job.PAID_STATUSES) +
+            counted(JobArchive, 'company'),
+        }),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Repair the job counters of categories and companies'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many counters are wrong without repairing them'
+        )
+
+    def handle(self, *args, **options):
+        for model, counts in expected_counts():
+            with transaction.atomic():
+                expected = dict(('expected_%s' % field, count)
+                                for field, count in counts.items())
+                drifted = model.objects.alias(**expected).filter(reduce(or_, [
+                              ~Q(**{field: F('expected_%s' % field)})
+                              for field in counts
+                          ]))
+                ids = list(drifted.values_list('pk', flat=True))
+                if ids and not options['dry_run']:
+                    model.objects.filter(pk__in=ids).update(**counts)
+
+            msg = '%s %s %s' % (
+                      len(ids),
+                      model._meta.verbose_name_plural,
+                      'would be repaired' if options['dry_run'] else
+                      'repaired'
+                  )
+            self.stdout.write(self.style.SUCCESS(msg))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from job_board.models.job import Job
+
+
+class Command(BaseCommand):
+    help = 'Render the stored HTML for job descriptions and application info'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-render every job, not only those missing HTML'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        jobs = Job.objects.only('description', 'application_info') \
+                          .order_by('id')
+        if not options['all']:
+            jobs = jobs.filter(description_html='')
+
+        count = 0
+        batch = []
+        for job in jobs.iterator(chunk_size=batch_size):
+            job.render_markdown()
+            batch.append(job)
+            if len(batch) >= batch_size:
+                count += self._flush(batch)
+        count += self._flush(batch)
+
+        msg = "%s jobs rendered" % count
+        self.stdout.write(self.style.SUCCESS(msg))
+
+    def _flush(self, batch):
+        Job.objects.bulk_update(
+            batch, ['description_html', 'application_info_html']
+        )
+        count = len(batch)
+        del batch[:]
+        return count
@@ -0,0 +1,96 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from job_board import outbox
+from job_board.models.outbox_message import OutboxMessage
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued e-mails, tweets and MailChimp subscriptions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Number of messages to deliver in parallel'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=5,
+            help='Attempts before a message is marked as dead'
+        )
+        parser.add_argument(
+            '--backoff',
+            type=int,
+            default=60,
+            help='Seconds to wait before the first retry, doubled after '
+                 'every further attempt'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5,
+            help='Seconds to sleep when the outbox is empty'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no more messages are ready to be delivered'
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        max_attempts = options['max_attempts']
+        backoff = options['backoff']
+        # NOTE: Messages stuck in processing for this long are assumed to
+        #       belong to a worker that died and are picked up again.
+        stale_after = timedelta(minutes=10)
+
+        pool = None
+        if concurrency > 1:
+            pool = ThreadPoolExecutor(max_workers=concurrency)
+
+        try:
+            while True:
+                claimed = outbox.claim(concurrency * 10, stale_after)
+                if not claimed:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                if pool is None:
+                    statuses = [
+                        outbox.process(message_id, max_attempts, backoff)
+                        for message_id in claimed
+                    ]
+                else:
+                    statuses = pool.map(
+                                   self.process_in_thread,
+                                   claimed,
+                                   [max_attempts] * len(claimed),
+                                   [backoff] * len(claimed)
+                               )
+
+                for message_id, status in zip(claimed, statuses):
+                    msg = "[%s] message %s" % (status, message_id)
+                    if status == OutboxMessage.SENT:
+                        self.stdout.write(self.style.SUCCESS(msg))
+                    else:
+                        self.stdout.write(self.style.WARNING(msg))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def process_in_thread(self, message_id, max_attempts, backoff):
+        try:
+            return outbox.process(message_id, max_attempts, backoff)
+        finally:
+            # Each thread opens its own database connection
+            connections.close_all()
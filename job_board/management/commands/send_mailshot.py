@@ -1,70 +1,121 @@
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 
-from mailchimp3 import MailChimp
-
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.sites.models import Site
+from django.db import connections
 from django.template.loader import render_to_string
 from django.utils import timezone
 
-from job_board.models.category import Category
+from job_board.integrations import mailchimp
+from job_board.models.job import Job
 
 
 class Command(BaseCommand):
     help = 'Send weekly mailshot e-mail'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--site',
+            action='append',
+            dest='sites',
+            metavar='DOMAIN',
+            help='Only send the mailshot for this site, may be repeated'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Render and print each mailshot without sending it'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of sites to process in parallel'
+        )
+
     def handle(self, *args, **options):
-        for site in Site.objects.all():
-            sent = False
-            if (site.siteconfig.mailchimp_username and
-                    site.siteconfig.mailchimp_api_key and
-                    site.siteconfig.mailchimp_list_id):
-                jobs = OrderedDict()
-                td = timedelta(days=7)
-                days_ago = timezone.now() - td
-
-                for c in Category.objects.filter(site=site).order_by('name'):
-                    j = c.job_set.filter(paid_at__gt=days_ago) \
-                                 .filter(expired_at__isnull=True) \
-                                 .order_by('paid_at')
-
-                    if len(j) > 0:
-                        jobs[c.name] = j
-
-                context = {'jobs': jobs, 'site': site}
-
-                if len(jobs) > 0:
-                    client = MailChimp(
-                                 site.siteconfig.mailchimp_username,
-                                 site.siteconfig.mailchimp_api_key
-                             )
-                    subject = '[%s] *ALL* jobs posted in the last ' \
-                              '7 days' % site.name.upper()
-                    data = {
-                               'type': 'plaintext',
-                               'recipients': {
-                                   'list_id': site.siteconfig.mailchimp_list_id
-                               },
-                               'settings': {
-                                   'subject_line': subject,
-                                   'reply_to': site.siteconfig.admin_email,
-                                   'from_name': '%s Weekly Mailer' % site.name
-                               }
-                           }
-
-                    content = render_to_string(
-                                  'job_board/emails/send_mailshot.txt',
-                                  context
-                              )
-
-                    c = client.campaigns.create(data)
-                    client.campaigns.content.update(
-                        c['id'],
-                        dict(plain_text=content)
-                    )
-                    client.campaigns.actions.send(c['id'])
-                    sent = True
+        sites = Site.objects.select_related('siteconfig').order_by('domain')
+        if options['sites']:
+            sites = list(sites.filter(domain__in=options['sites']))
+            missing = set(options['sites']) - set(s.domain for s in sites)
+            if missing:
+                raise CommandError(
+                          'Site with domain name %s does not exist' %
+                          ', '.join(sorted(missing))
+                      )
+
+        self.dry_run = options['dry_run']
+        if options['workers'] > 1:
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                results = list(pool.map(self.process_in_thread, sites))
+        else:
+            results = [self.process(site) for site in sites]
 
+        for site, sent, content in results:
+            if self.dry_run and content:
+                self.stdout.write(content)
             msg = "[%s] mailshot sent: %s" % (site.name, sent)
             self.stdout.write(self.style.SUCCESS(msg))
+
+    def process_in_thread(self, site):
+        try:
+            return self.process(site)
+        finally:
+            # Each thread opens its own database connection
+            connections.close_all()
+
+    def process(self, site):
+        sc = site.siteconfig
+        if not (sc.mailchimp_username and sc.mailchimp_api_key and
+                sc.mailchimp_list_id):
+            return site, False, None
+
+        jobs = self.recent_jobs(site)
+        if len(jobs) == 0:
+            return site, False, None
+
+        context = {'jobs': jobs, 'site': site}
+        content = render_to_string(
+                      'job_board/emails/send_mailshot.txt',
+                      context
+                  )
+        if self.dry_run:
+            return site, False, content
+
+        client = mailchimp.get_client(sc)
+        subject = '[%s] *ALL* jobs posted in the last ' \
+                  '7 days' % site.name.upper()
+        data = {
+                   'type': 'plaintext',
+                   'recipients': {
+                       'list_id': sc.mailchimp_list_id
+                   },
+                   'settings': {
+                       'subject_line': subject,
+                       'reply_to': sc.admin_email,
+                       'from_name': '%s Weekly Mailer' % site.name
+                   }
+               }
+
+        c = client.campaigns.create(data)
+        client.campaigns.content.update(c['id'], dict(plain_text=content))
+        client.campaigns.actions.send(c['id'])
+        return site, True, content
+
+    def recent_jobs(self, site):
+        days_ago = timezone.now() - timedelta(days=7)
+        qs = Job.objects.select_related('category', 'company', 'country') \
+                        .filter(site=site) \
+                        .active() \
+                        .filter(paid_at__gt=days_ago) \
+                        .order_by('category__name', 'paid_at')
+
+        # Group jobs by category name, in the order the query returned them
+        jobs = OrderedDict()
+        for job in qs:
+            # Every job belongs to this site, so avoid loading it per job
+            job.site = site
+            jobs.setdefault(job.category.name, []).append(job)
+        return jobs
@@ -0,0 +1,313 @@
+import fcntl
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates
+
+# NOTE: MetricsMiddleware records, for every request, the latency, number and
+#       time of SQL queries, template render time, response size and page
+#       and feed cache hits, labelled with the URL name of the view.  They are
+#       served in the Prometheus text format by the metrics view.
+#
+#       Every metric is kept as a set of counters (histograms as cumulative
+#       buckets plus _sum and _count), so that the counters of several worker
+#       processes can simply be added up.  When METRICS_DIR is set each
+#       process writes its counters to a file of its own there at most every
+#       METRICS_FLUSH_SECONDS, and the metrics view adds up the files of all
+#       processes, folding the files of processes which have exited into a
+#       single file.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+
+METRICS = {
+    'tramcar_requests_total':
+        ('counter', 'Requests handled'),
+    'tramcar_request_duration_seconds':
+        ('histogram', 'Time taken to handle requests'),
+    'tramcar_response_size_bytes':
+        ('histogram', 'Size of non-streaming response bodies'),
+    'tramcar_db_queries_total':
+        ('counter', 'SQL queries run'),
+    'tramcar_db_query_seconds_total':
+        ('counter', 'Time spent running SQL queries'),
+    'tramcar_template_render_seconds_total':
+        ('counter', 'Time spent rendering templates'),
+    'tramcar_cache_requests_total':
+        ('counter', 'Page and feed cache lookups'),
+}
+
+_lock = threading.Lock()
+_counters = {}
+_flushed = {'at': time.monotonic()}
+_state = threading.local()
+_process = {}
+
+# Files of running processes are named after their PID and start time
+FILE_PATTERN = re.compile(r'^metrics-(\d+)-(\d+)\.json$')
+DEAD_FILE = 'metrics-exited.json'
+
+
+def inc(name, labels, value=1):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, labels, value, buckets):
+    for bound in buckets:
+        if value <= bound:
+            inc(name + '_bucket', dict(labels, le=str(bound)))
+    inc(name + '_bucket', dict(labels, le='+Inf'))
+    inc(name + '_sum', labels, value)
+    inc(name + '_count', labels)
+
+
+def record_cache(cache, hit):
+    # Called by the page and feed caches, counted against the current request
+    results = getattr(_state, 'cache', None)
+    if results is not None:
+        results.append((cache, 'hit' if hit else 'miss'))
+
+
+class QueryTimer(object):
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            _state.queries += 1
+            _state.query_time += time.perf_counter() - start
+
+
+class MetricsMiddleware(object):
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.queries = 0
+        _state.query_time = 0.0
+        _state.render_time = 0.0
+        _state.cache = []
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                timer = QueryTimer()
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                response = self.get_response(request)
+            self.record(request, response, time.perf_counter() - start)
+        finally:
+            _state.cache = None
+        flush()
+        return response
+
+    def record(self, request, response, duration):
+        match = request.resolver_match
+        view = {'view': (match.url_name or match.view_name) if match
+                else 'unresolved'}
+        inc('tramcar_requests_total',
+            dict(view, method=request.method,
+                 status=str(response.status_code)))
+        observe('tramcar_request_duration_seconds', view, duration,
+                LATENCY_BUCKETS)
+        if not response.streaming:
+            observe('tramcar_response_size_bytes', view,
+                    len(response.content), SIZE_BUCKETS)
+        inc('tramcar_db_queries_total', view, _state.queries)
+        inc('tramcar_db_query_seconds_total', view, _state.query_time)
+        inc('tramcar_template_render_seconds_total', view,
+            _state.render_time)
+        for cache, result in _state.cache:
+            inc('tramcar_cache_requests_total',
+                dict(view, cache=cache, result=result))
+
+
+class TimedTemplate(object):
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            if hasattr(_state, 'render_time'):
+                _state.render_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    # The Django template backend, timing how long templates take to render
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+def process_started(pid):
+    # When the process started, in clock ticks since boot, where /proc is
+    # available
+    try:
+        with open('/proc/%s/stat' % pid) as f:
+            # The fields after the command name, which may contain spaces,
+            # start with the third one
+            return f.read().rpartition(')')[2].split()[19]
+    except (OSError, IndexError):
+        return None
+
+
+def process_key():
+    # The PID and start time of this process, so that a process reusing the
+    # PID of a dead one gets a file of its own
+    pid = os.getpid()
+    if _process.get('pid') != pid:
+        started = process_started(pid) or str(int(time.time() * 1000))
+        _process.update(pid=pid, key='%s-%s' % (pid, started))
+    return _process['key']
+
+
+def is_running(pid, started):
+    current = process_started(pid)
+    if current is not None:
+        return current == started
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def metrics_file():
+    return os.path.join(settings.METRICS_DIR, 'metrics-%s.json' %
+                        process_key())
+
+
+def write_samples(path, samples):
+    # Written to a temporary file and renamed, so that readers never see a
+    # partly written file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(samples, f)
+    os.replace(tmp_path, path)
+
+
+def read_samples(path, totals):
+    try:
+        with open(path) as f:
+            samples = json.load(f)
+    except (OSError, ValueError):
+        return False
+    for name, labels, value in samples:
+        key = (name, tuple(tuple(label) for label in labels))
+        totals[key] = totals.get(key, 0) + value
+    return True
+
+
+def flush(force=False):
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if not directory:
+        return
+    now = time.monotonic()
+    interval = getattr(settings, 'METRICS_FLUSH_SECONDS', 5)
+    if not force and now - _flushed['at'] < interval:
+        return
+    _flushed['at'] = now
+    with _lock:
+        samples = [[name, list(labels), value]
+                   for (name, labels), value in _counters.items()]
+    write_samples(metrics_file(), samples)
+
+
+def collect_files(directory, totals):
+    # NOTE: The files of processes which are no longer running are added to
+    #       DEAD_FILE and removed, under an exclusive lock, so that the totals
+    #       keep counting up and the directory does not grow with every
+    #       restart.
+    with open(os.path.join(directory, 'metrics.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        dead_path = os.path.join(directory, DEAD_FILE)
+        dead = {}
+        read_samples(dead_path, dead)
+        dead_paths = []
+        own = 'metrics-%s.json' % process_key()
+        for filename in os.listdir(directory):
+            match = FILE_PATTERN.match(filename)
+            if match is None or filename == own:
+                continue
+            path = os.path.join(directory, filename)
+            if is_running(int(match.group(1)), match.group(2)):
+                read_samples(path, totals)
+            elif read_samples(path, dead):
+                dead_paths.append(path)
+        if dead_paths:
+            write_samples(dead_path, [[name, list(labels), value]
+                                      for (name, labels), value
+                                      in dead.items()])
+            for path in dead_paths:
+                os.remove(path)
+    for key, value in dead.items():
+        totals[key] = totals.get(key, 0) + value
+
+
+def collect():
+    # The counters of this process and, with METRICS_DIR, of every other
+    # process which has flushed its counters, including those which have
+    # since exited
+    with _lock:
+        totals = dict(_counters)
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if directory:
+        collect_files(directory, totals)
+    return totals
+
+
+def family(name):
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+            return name[:-len(suffix)]
+    return name
+
+
+def sort_key(item):
+    (name, labels), value = item
+    # Buckets are listed in increasing order of their upper bound
+    return (name, [(k, float(v)) if k == 'le' else (k, 0.0, v)
+                   for k, v in labels])
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"') \
+                .replace('\n', '\\n')
+
+
+def render_metric_text(totals):
+    families = {}
+    for item in totals.items():
+        families.setdefault(family(item[0][0]), []).append(item)
+
+    lines = []
+    for name in sorted(families):
+        kind, help_text = METRICS.get(name, ('untyped', ''))
+        lines.append('# HELP %s %s' % (name, help_text))
+        lines.append('# TYPE %s %s' % (name, kind))
+        for (sample, labels), value in sorted(families[name], key=sort_key):
+            label_text = ','.join(
+                '%s="%s"' % (k, escape_label(v)) for k, v in labels
+            )
+            if label_text:
+                sample = '%s{%s}' % (sample, label_text)
+            lines.append('%s %s' % (sample, repr(float(value))))
+    return '\n'.join(lines) + '\n'
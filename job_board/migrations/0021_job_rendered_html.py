@@ -0,0 +1,47 @@
+# Generated by Django 4.2.8 on 2026-10-18 13:17
+
+from django.db import migrations, models
+
+from utils.misc import convert_markdown
+
+
+def render_markdown(apps, schema_editor):
+    # The same as the render_markdown command, so that existing jobs have
+    # their HTML as soon as the migration is applied
+    Job = apps.get_model('job_board', 'Job')
+    jobs = Job.objects.only('description', 'application_info') \
+                      .order_by('id')
+    batch = []
+    for job in jobs.iterator(chunk_size=500):
+        job.description_html = convert_markdown(job.description)
+        job.application_info_html = convert_markdown(job.application_info)
+        batch.append(job)
+        if len(batch) >= 500:
+            Job.objects.bulk_update(
+                batch, ['description_html', 'application_info_html']
+            )
+            batch = []
+    Job.objects.bulk_update(
+        batch, ['description_html', 'application_info_html']
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_board', '0020_auto_20200314_0208'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='application_info_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='description_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(render_markdown, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE job_board_job_fts USING "
+            "fts5(title, description, tokenize='porter unicode61')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE job_board_job_search ("
+            "job_id integer PRIMARY KEY REFERENCES job_board_job (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX job_board_job_search_document "
+            "ON job_board_job_search USING GIN (document)"
+        )
+    else:
+        return
+
+    # Populate the index with jobs which are currently active
+    Job = apps.get_model('job_board', 'Job')
+    jobs = Job.objects.filter(paid_at__isnull=False, expired_at__isnull=True)
+    for job in jobs.only('title', 'description').iterator():
+        if vendor == 'sqlite':
+            schema_editor.execute(
+                "INSERT INTO job_board_job_fts (rowid, title, description) "
+                "VALUES (%s, %s, %s)",
+                (job.id, job.title, job.description)
+            )
+        else:
+            schema_editor.execute(
+                "INSERT INTO job_board_job_search (job_id, document) "
+                "VALUES (%s, setweight(to_tsvector('english', %s), 'A') || "
+                "setweight(to_tsvector('english', %s), 'B'))",
+                (job.id, job.title, job.description)
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE job_board_job_fts")
+    elif vendor == 'postgresql':
+        schema_editor.execute("DROP TABLE job_board_job_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_board', '0021_job_rendered_html'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
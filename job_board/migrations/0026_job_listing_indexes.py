@@ -0,0 +1,29 @@
+# Generated by Django 4.2.8 on 2026-10-18 13:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_board', '0025_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('expired_at__isnull', True), ('paid_at__isnull', False)), fields=['site', '-paid_at'], name='job_active_site_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('expired_at__isnull', True), ('paid_at__isnull', False)), fields=['category', '-paid_at'], name='job_active_category_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('paid_at__isnull', False)), fields=['company', '-paid_at'], name='job_paid_company_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['site', 'user', '-created_at'], name='job_site_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.8 on 2026-10-18 13:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_board', '0026_job_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_active_site_paid_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_active_category_paid_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_paid_company_paid_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_site_user_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('expired_at__isnull', True), ('paid_at__isnull', False)), fields=['site', '-paid_at', '-id'], name='job_active_site_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('expired_at__isnull', True), ('paid_at__isnull', False)), fields=['category', '-paid_at', '-id'], name='job_active_category_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('paid_at__isnull', False)), fields=['company', '-paid_at', '-id'], name='job_paid_company_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['site', 'user', '-created_at', '-id'], name='job_site_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.8 on 2026-10-18 14:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sites', '0002_alter_domain_unique'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('job_board', '0027_job_listing_indexes_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobArchive',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('title', models.CharField(max_length=50)),
+                ('location', models.CharField(blank=True, max_length=100, null=True)),
+                ('email', models.EmailField(max_length=254)),
+                ('paid_at', models.DateTimeField()),
+                ('expired_at', models.DateTimeField()),
+                ('remote', models.BooleanField(default=False)),
+                ('city', models.CharField(blank=True, max_length=50, null=True)),
+                ('state', models.CharField(blank=True, max_length=50, null=True)),
+                ('texts', models.BinaryField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='job_board.category')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='job_board.company')),
+                ('country', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='job_board.country')),
+                ('site', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='sites.site')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['company', '-paid_at', '-id'], name='jobarchive_company_paid_idx')],
+            },
+        ),
+    ]
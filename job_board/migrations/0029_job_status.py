@@ -0,0 +1,51 @@
+# Generated by Django 4.2.8 on 2026-10-18 14:37
+
+from django.db import migrations, models
+
+
+def backfill_status(apps, schema_editor):
+    Job = apps.get_model('job_board', 'Job')
+    Job.objects.filter(paid_at__isnull=False, expired_at__isnull=True) \
+               .update(status='active')
+    Job.objects.filter(paid_at__isnull=False, expired_at__isnull=False) \
+               .update(status='expired')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_board', '0028_jobarchive'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_active_site_paid_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_active_category_paid_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_paid_company_paid_idx',
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('active', 'Active'), ('expired', 'Expired')], default='draft', editable=False, max_length=10),
+        ),
+        migrations.RunPython(backfill_status, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['site', 'status', '-paid_at', '-id'], name='job_site_status_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['category', 'status', '-paid_at', '-id'], name='job_category_status_paid_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['company', '-paid_at', '-id'], name='job_company_paid_idx'),
+        ),
+    ]
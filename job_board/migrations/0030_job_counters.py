@@ -0,0 +1,65 @@
+# Generated by Django 4.2.8 on 2026-10-18 14:45
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def counted(model, field, **filters):
+    rows = model.objects.filter(**{field: OuterRef('pk')}) \
+                        .filter(**filters) \
+                        .order_by() \
+                        .values(field) \
+                        .annotate(count=Count('pk')) \
+                        .values('count')
+    return Coalesce(Subquery(rows), 0)
+
+
+def backfill_counters(apps, schema_editor):
+    Category = apps.get_model('job_board', 'Category')
+    Company = apps.get_model('job_board', 'Company')
+    Job = apps.get_model('job_board', 'Job')
+    JobArchive = apps.get_model('job_board', 'JobArchive')
+    Category.objects.update(
+        active_count=counted(Job, 'category', status='active')
+    )
+    Company.objects.update(
+        active_count=counted(Job, 'company', status='active'),
+        paid_count=counted(Job, 'company',
+                           status__in=('active', 'expired')) +
+        counted(JobArchive, 'company')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_board', '0029_job_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='active_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='active_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='company',
+            name='paid_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(condition=models.Q(('active_count__gt', 0)), fields=['site', 'name', 'id'], name='category_active_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(condition=models.Q(('paid_count__gt', 0)), fields=['site', 'name', 'id'], name='company_paid_name_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.8 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_board', '0030_job_counters'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='category',
+            name='category_active_name_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='company',
+            name='company_paid_name_idx',
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['site', 'name', 'active_count'], name='category_site_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['site', 'name', 'paid_count'], name='company_site_name_idx'),
+        ),
+    ]
@@ -1,6 +1,9 @@
-from .category import Category       # noqa: F401
-from .company import Company         # noqa: F401
-from .country import Country         # noqa: F401
-from .job import Job                 # noqa: F401
-from .site_config import SiteConfig  # noqa: F401
-from .user_token import UserToken    # noqa: F401
+from .cache_version import CacheVersion    # noqa: F401
+from .category import Category             # noqa: F401
+from .company import Company               # noqa: F401
+from .country import Country               # noqa: F401
+from .job import Job                       # noqa: F401
+from .job_archive import JobArchive        # noqa: F401
+from .outbox_message import OutboxMessage  # noqa: F401
+from .site_config import SiteConfig        # noqa: F401
+from .user_token import UserToken          # noqa: F401
@@ -0,0 +1,24 @@
+from django.db import models
+from django.db.models import F
+
+
+class CacheVersion(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def current(cls, name):
+        return cls.objects.filter(name=name) \
+                          .values_list('version', flat=True) \
+                          .first() or 0
+
+    @classmethod
+    def bump(cls, name):
+        updated = cls.objects.filter(name=name) \
+                             .update(version=F('version') + 1)
+        if not updated:
+            cls.objects.get_or_create(name=name, defaults={'version': 1})
+        return cls.current(name)
+
+    def __str__(self):
+        return "%s - %s" % (self.name, self.version)
@@ -6,18 +6,32 @@ from django.urls import reverse
 from django.utils.text import slugify
 
 
+class CategoryQuerySet(models.QuerySet):
+    def with_active_jobs(self):
+        return self.filter(active_count__gt=0).order_by('name')
+
+
 class Category(models.Model):
     name = models.CharField(max_length=30)
     site = models.ForeignKey(Site, on_delete=models.CASCADE)
+    # Maintained by job_board.counters
+    active_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = CategoryQuerySet.as_manager()
 
     class Meta:
         verbose_name_plural = "categories"
         unique_together = ("name", "site")
         ordering = ['name']
+        indexes = [
+            models.Index(
+                fields=['site', 'name', 'active_count'],
+                name='category_site_name_idx'
+            ),
+        ]
 
     def active_jobs(self):
-        return self.job_set.filter(paid_at__isnull=False) \
-                           .filter(expired_at__isnull=True)
+        return self.job_set.active()
 
     def slug(self):
         return slugify(self.name)
@@ -9,6 +9,11 @@ from django.utils.text import slugify
 from job_board.models.country import Country
 
 
+class CompanyQuerySet(models.QuerySet):
+    def with_paid_jobs(self):
+        return self.filter(paid_count__gt=0).order_by('name')
+
+
 class Company(models.Model):
     name = models.CharField(max_length=50)
     url = models.URLField(verbose_name="URL")
@@ -27,21 +32,33 @@ class Company(models.Model):
               )
     site = models.ForeignKey(Site, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by job_board.counters, paid jobs include expired and
+    # archived ones
+    active_count = models.PositiveIntegerField(default=0, editable=False)
+    paid_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = CompanyQuerySet.as_manager()
 
     class Meta:
         verbose_name_plural = "companies"
         unique_together = ("name", "site")
         ordering = ['name']
+        indexes = [
+            models.Index(
+                fields=['site', 'name', 'paid_count'],
+                name='company_site_name_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
     def active_jobs(self):
-        return self.job_set.filter(paid_at__isnull=False,
-                                   expired_at__isnull=True)
+        return self.job_set.active()
 
     def paid_jobs(self):
-        return self.job_set.filter(paid_at__isnull=False)
+        return self.job_set.paid()
 
     def slug(self):
         return slugify(self.name)
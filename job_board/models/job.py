@@ -1,8 +1,6 @@
 from __future__ import unicode_literals
 
-import tweepy
-
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
 from django.template.loader import render_to_string
@@ -11,17 +9,53 @@ from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import slugify
 
-from utils.misc import send_mail_with_helper
+from utils.misc import convert_markdown
+
+from job_board import counters
+from job_board.integrations import twitter
+from job_board.outbox import enqueue, enqueue_mail
 
 from job_board.models.category import Category
 from job_board.models.company import Company
 from job_board.models.country import Country
 
 
+class JobQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(status=Job.ACTIVE)
+
+    def paid(self):
+        # Active and expired jobs
+        return self.filter(status__in=Job.PAID_STATUSES)
+
+    def listing(self):
+        # Everything the job listing templates touch for each row
+        return self.select_related(
+                   'company', 'category', 'country', 'site__siteconfig'
+               )
+
+
 class Job(models.Model):
+    DRAFT = 'draft'
+    ACTIVE = 'active'
+    EXPIRED = 'expired'
+    STATUS_CHOICES = (
+        (DRAFT, 'Draft'),
+        (ACTIVE, 'Active'),
+        (EXPIRED, 'Expired'),
+    )
+    PAID_STATUSES = (ACTIVE, EXPIRED)
+    # The statuses each status may change to
+    TRANSITIONS = {
+        DRAFT: (ACTIVE,),
+        ACTIVE: (EXPIRED,),
+        EXPIRED: (),
+    }
+
     url = "http://daringfireball.net/projects/markdown/syntax"
     markdown = "<a href='%s'>Markdown</a>" % url
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     title = models.CharField(max_length=50)
     description = models.TextField(
                       help_text="Feel free to use %s to format "
@@ -52,6 +86,12 @@ class Job(models.Model):
                   on_delete=models.PROTECT
               )
     company = models.ForeignKey(Company, on_delete=models.PROTECT)
+    status = models.CharField(
+                 max_length=10,
+                 choices=STATUS_CHOICES,
+                 default=DRAFT,
+                 editable=False
+             )
     paid_at = models.DateTimeField(null=True, blank=True)
     expired_at = models.DateTimeField(null=True, blank=True)
     site = models.ForeignKey(Site, on_delete=models.CASCADE)
@@ -72,26 +112,125 @@ class Job(models.Model):
                 null=True,
                 default=None)
 
+    objects = JobQuerySet.as_manager()
+
+    # NOTE: The HTML versions of description and application_info are
+    #       rendered from Markdown when the job is saved, so that views and
+    #       feeds do not have to run Markdown/bleach on every request.
+    description_html = models.TextField(blank=True, editable=False)
+    application_info_html = models.TextField(blank=True, editable=False)
+
+    # NOTE: The status is kept in step with paid_at and expired_at by
+    #       activate() and expire(), and is what listings filter on, so the
+    #       listing indexes hold the status right after the site or category,
+    #       followed by the display order.  Companies list both active and
+    #       expired jobs, so their index leaves the status out and the few
+    #       drafts are skipped as it is read.  Categories and companies belong
+    #       to a single site, so their indexes skip site.  The id is included
+    #       as the tie-breaker used by keyset pagination.
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['site', 'status', '-paid_at', '-id'],
+                name='job_site_status_paid_idx'
+            ),
+            models.Index(
+                fields=['category', 'status', '-paid_at', '-id'],
+                name='job_category_status_paid_idx'
+            ),
+            models.Index(
+                fields=['company', '-paid_at', '-id'],
+                name='job_company_paid_idx'
+            ),
+            models.Index(
+                fields=['site', 'user', '-created_at', '-id'],
+                name='job_site_user_created_idx'
+            ),
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super(Job, self).__init__(*args, **kwargs)
+        self._rendered_sources = self._markdown_sources()
+        # The category and company as loaded, so that their counters and the
+        # pages listing the job under them can be updated, refreshed by save()
+        self._loaded_relations = (self.__dict__.get('category_id'),
+                                  self.__dict__.get('company_id'))
+        self._loaded_status = self.__dict__.get('status')
+
+    def _markdown_sources(self):
+        # NOTE: We read from __dict__ so that deferred fields are not loaded
+        #       from the database just to track changes.
+        return (self.__dict__.get('description'),
+                self.__dict__.get('application_info'))
+
+    def render_markdown(self):
+        self.description_html = convert_markdown(self.description)
+        self.application_info_html = convert_markdown(self.application_info)
+        self._rendered_sources = self._markdown_sources()
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        stale = self._markdown_sources() != self._rendered_sources
+        if self._state.adding or stale:
+            self.render_markdown()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {
+                    'description_html', 'application_info_html'
+                }
+        # Only activate() and expire() change the status, and only forward
+        if (not self._state.adding and self._loaded_status is not None and
+                self.status != self._loaded_status and
+                self.status not in self.TRANSITIONS[self._loaded_status]):
+            raise ValueError('A job cannot go from %s to %s' % (
+                                 self._loaded_status, self.status
+                             ))
+
+        # The category and company counters follow the status, category and
+        # company of the job, unless they were not loaded
+        old = (self._loaded_status,) + self._loaded_relations
+        if self._state.adding:
+            old = None
+        elif None in old:
+            old = (self.status, self.category_id, self.company_id)
+        deltas = counters.job_deltas(
+                     old, (self.status, self.category_id, self.company_id)
+                 )
+        if counters.updates(deltas):
+            with transaction.atomic():
+                super(Job, self).save(*args, **kwargs)
+                counters.apply(deltas)
+        else:
+            super(Job, self).save(*args, **kwargs)
+        self._loaded_status = self.status
+        self._loaded_relations = (self.category_id, self.company_id)
+
+    def can_transition(self, status):
+        return status in self.TRANSITIONS[self.status]
+
     def activate(self):
-        if self.paid_at is None:
+        if self.can_transition(self.ACTIVE):
+            self.status = self.ACTIVE
             self.paid_at = timezone.now()
-            self.save()
-            self.send_tweet()
+            with transaction.atomic():
+                self.save()
+                enqueue('tweet', job_id=self.id)
             return True
         else:
             return False
 
     def expire(self):
-        if self.paid_at is not None and self.expired_at is None:
+        if self.can_transition(self.EXPIRED):
             context = {'job': self, 'protocol': self.site.siteconfig.protocol}
+            self.status = self.EXPIRED
             self.expired_at = timezone.now()
-            self.save()
-            send_mail_with_helper(
-                'Your %s job has expired' % self.site.name,
-                render_to_string('job_board/emails/expired.txt', context),
-                self.site.siteconfig.admin_email,
-                [self.email]
-            )
+            with transaction.atomic():
+                self.save()
+                enqueue_mail(
+                    'Your %s job has expired' % self.site.name,
+                    render_to_string('job_board/emails/expired.txt', context),
+                    self.site.siteconfig.admin_email,
+                    [self.email]
+                )
             return True
         else:
             return False
@@ -110,32 +249,21 @@ class Job(models.Model):
         if (not settings.DEBUG and sc.twitter_consumer_key and
                 sc.twitter_consumer_secret and sc.twitter_access_token and
                 sc.twitter_access_token_secret):
-            auth = tweepy.OAuthHandler(
-                       sc.twitter_consumer_key,
-                       sc.twitter_consumer_secret
-                   )
-            auth.set_access_token(
-                sc.twitter_access_token,
-                sc.twitter_access_token_secret
-            )
-
-            api = tweepy.API(auth)
-
             if self.company.twitter:
-                twitter = "@%s" % self.company.twitter
+                mention = "@%s" % self.company.twitter
             else:
-                twitter = self.company.name
+                mention = self.company.name
 
             post = "[%s] %s at %s %s://%s/jobs/%s/" % (
                        self.format_country(),
                        self.title,
-                       twitter,
+                       mention,
                        sc.protocol,
                        self.site.domain,
                        self.id
                    )
 
-            api.update_status(post)
+            twitter.update_status(sc, post)
 
     def slug(self):
         return slugify('%s-%s' % (self.title, self.company.name))
@@ -0,0 +1,115 @@
+import json
+import zlib
+
+from django.db import models
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from job_board.models.category import Category
+from job_board.models.company import Company
+from job_board.models.country import Country
+from job_board.models.job import Job
+
+# NOTE: Jobs expired for longer than ARCHIVE_JOBS_AFTER_DAYS are moved here by
+#       the archive_jobs command, so that the Job table and its indexes only
+#       hold the jobs that can still be listed or edited.  Archived jobs keep
+#       their id, and so their URL, and are displayed by the same templates as
+#       jobs.  The Markdown and HTML texts, most of the size of a job, are
+#       stored zlib-compressed as a single JSON object.
+
+TEXT_FIELDS = ('description', 'application_info', 'description_html',
+               'application_info_html')
+
+
+def compress_texts(job):
+    texts = dict((name, getattr(job, name)) for name in TEXT_FIELDS)
+    return zlib.compress(json.dumps(texts).encode('utf-8'), 9)
+
+
+class JobArchiveQuerySet(models.QuerySet):
+    # Archived jobs are all paid and expired, so only listing() applies
+    def listing(self):
+        return self.select_related(
+                   'company', 'category', 'country', 'site__siteconfig'
+               )
+
+
+class JobArchive(models.Model):
+    id = models.IntegerField(primary_key=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+    title = models.CharField(max_length=50)
+    location = models.CharField(max_length=100, blank=True, null=True)
+    email = models.EmailField()
+    category = models.ForeignKey(Category, on_delete=models.PROTECT)
+    country = models.ForeignKey(
+                  Country,
+                  blank=True,
+                  null=True,
+                  on_delete=models.PROTECT
+              )
+    company = models.ForeignKey(Company, on_delete=models.PROTECT)
+    paid_at = models.DateTimeField()
+    expired_at = models.DateTimeField()
+    site = models.ForeignKey(Site, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    remote = models.BooleanField(default=False)
+    city = models.CharField(max_length=50, blank=True, null=True)
+    state = models.CharField(max_length=50, blank=True, null=True)
+    texts = models.BinaryField()
+
+    objects = JobArchiveQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['company', '-paid_at', '-id'],
+                name='jobarchive_company_paid_idx'
+            ),
+        ]
+
+    # Fields copied as they are from Job
+    COPIED_FIELDS = ('id', 'created_at', 'updated_at', 'title', 'location',
+                     'email', 'category_id', 'country_id', 'company_id',
+                     'paid_at', 'expired_at', 'site_id', 'user_id', 'remote',
+                     'city', 'state')
+
+    @classmethod
+    def from_job(cls, job):
+        archive = cls(texts=compress_texts(job))
+        for name in cls.COPIED_FIELDS:
+            setattr(archive, name, getattr(job, name))
+        return archive
+
+    @cached_property
+    def _texts(self):
+        return json.loads(zlib.decompress(bytes(self.texts)).decode('utf-8'))
+
+    @property
+    def description(self):
+        return self._texts['description']
+
+    @property
+    def application_info(self):
+        return self._texts['application_info']
+
+    @property
+    def description_html(self):
+        return self._texts['description_html']
+
+    @property
+    def application_info_html(self):
+        return self._texts['application_info_html']
+
+    # Archived jobs are always expired
+    status = Job.EXPIRED
+
+    format_country = Job.format_country
+    slug = Job.slug
+    get_absolute_url = Job.get_absolute_url
+
+    def __str__(self):
+        return self.title
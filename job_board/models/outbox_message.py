@@ -0,0 +1,38 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxMessage(models.Model):
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    SENT = 'sent'
+    DEAD = 'dead'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (PROCESSING, 'Processing'),
+        (SENT, 'Sent'),
+        (DEAD, 'Dead'),
+    )
+
+    kind = models.CharField(max_length=30)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+                 max_length=10,
+                 choices=STATUS_CHOICES,
+                 default=PENDING
+             )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['available_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+
+    def __str__(self):
+        return "%s (%s)" % (self.kind, self.status)
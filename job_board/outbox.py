@@ -0,0 +1,145 @@
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.utils import timezone
+
+from job_board.integrations import mailchimp
+from job_board.models.outbox_message import OutboxMessage
+from job_board.models.site_config import SiteConfig
+from utils.misc import send_mail_with_helper
+
+# NOTE: Calls to third parties (SMTP, Twitter, MailChimp) are not made while
+#       handling a request.  Instead, a message is written to the outbox in
+#       the same transaction as the change that triggered it, and the
+#       run_worker management command delivers it afterwards.
+#
+#       A handler may update its payload in place to record its progress,
+#       the payload is saved along with the outcome of each attempt.
+
+HANDLERS = {}
+
+
+def handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, **payload):
+    if kind not in HANDLERS:
+        raise ValueError("Unknown outbox message kind: %s" % kind)
+    return OutboxMessage.objects.create(kind=kind, payload=payload)
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    return enqueue(
+               'mail',
+               subject=subject,
+               message=message,
+               from_email=from_email,
+               recipient_list=list(recipient_list)
+           )
+
+
+def enqueue_mass_mail(datatuple):
+    # All messages are sent over a single SMTP connection, and a retry only
+    # sends the ones which failed
+    return enqueue(
+               'mass_mail',
+               datatuple=[
+                   [subject, message, from_email, list(recipient_list)]
+                   for subject, message, from_email, recipient_list
+                   in datatuple
+               ]
+           )
+
+
+def claim(limit, stale_after):
+    now = timezone.now()
+    claimable = Q(status=OutboxMessage.PENDING, available_at__lte=now) | \
+        Q(status=OutboxMessage.PROCESSING, locked_at__lt=now - stale_after)
+    candidates = OutboxMessage.objects.filter(claimable) \
+                                      .values_list('id', flat=True)[:limit]
+
+    claimed = []
+    for message_id in candidates:
+        # The conditional update makes sure only one worker gets a message
+        updated = OutboxMessage.objects.filter(claimable, id=message_id) \
+                                       .update(status=OutboxMessage.PROCESSING,
+                                               locked_at=now)
+        if updated:
+            claimed.append(message_id)
+    return claimed
+
+
+def process(message_id, max_attempts=5, backoff=60):
+    message = OutboxMessage.objects.get(id=message_id)
+    message.attempts += 1
+    try:
+        HANDLERS[message.kind](**message.payload)
+    except Exception:
+        message.last_error = traceback.format_exc()
+        if message.attempts >= max_attempts:
+            message.status = OutboxMessage.DEAD
+        else:
+            message.status = OutboxMessage.PENDING
+            delay = backoff * 2 ** (message.attempts - 1)
+            message.available_at = timezone.now() + timedelta(seconds=delay)
+    else:
+        message.status = OutboxMessage.SENT
+        message.sent_at = timezone.now()
+    message.locked_at = None
+    message.save()
+    return message.status
+
+
+@handler('mail')
+def send_mail(subject, message, from_email, recipient_list):
+    send_mail_with_helper(
+        subject,
+        message,
+        from_email,
+        recipient_list,
+        fail_silently=False
+    )
+
+
+@handler('mass_mail')
+def send_mass_mail(datatuple):
+    if settings.DEBUG:
+        return
+    failed = []
+    error = None
+    with get_connection(fail_silently=False) as connection:
+        for subject, message, from_email, recipient_list in datatuple:
+            try:
+                EmailMessage(subject, message, from_email, recipient_list,
+                             connection=connection).send()
+            except Exception as e:
+                failed.append([subject, message, from_email, recipient_list])
+                error = e
+    # Only the messages which were not delivered are left in the payload
+    datatuple[:] = failed
+    if error is not None:
+        raise error
+
+
+@handler('tweet')
+def send_tweet(job_id):
+    # NOTE: Imported here as job_board.models.job imports this module
+    from job_board.models.job import Job
+
+    job = Job.objects.select_related(
+              'company', 'country', 'site__siteconfig'
+          ).get(pk=job_id)
+    job.send_tweet()
+
+
+@handler('mailchimp_subscribe')
+def mailchimp_subscribe(site_id, email, fname):
+    sc = SiteConfig.objects.get(site_id=site_id)
+    mailchimp.subscribe(sc, email, fname)
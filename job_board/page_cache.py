@@ -0,0 +1,199 @@
+import hashlib
+import re
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+from job_board.metrics import record_cache
+from job_board.replicas import using_replica
+from job_board.sites import get_current_site
+
+# NOTE: Pages rendered for anonymous users are cached per site.  Every page is
+#       tagged (e.g. "index", "category:3", "job:42"), and each tag has a
+#       version stored in the cache which is part of the page's key.  Purging
+#       a tag gives it a new version, so every page carrying that tag is
+#       re-rendered on its next request while all other pages stay cached.
+#
+#       With the default local-memory cache backend, every worker process has
+#       its own page cache and purges only reach the process that made the
+#       change.  Configure a shared cache backend (memcached, Redis, etc.)
+#       in CACHES when running more than one process.
+#
+#       Pages rendered from a read replica shortly after one of their tags was
+#       purged are not cached, as the replica may not have caught up with the
+#       change yet (see READ_REPLICA_LAG).
+
+CSRF_INPUT = re.compile(
+                 rb'(name="csrfmiddlewaretoken" value=")[^"]+(")'
+             )
+CSRF_PLACEHOLDER = b'\\1__csrf_token__\\2'
+
+
+def get_cache():
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+def tag_key(site_id, tag):
+    return 'page_tag:%s:%s' % (site_id, tag)
+
+
+def new_version():
+    # Versions record when the tag was purged
+    return '%s-%d' % (uuid.uuid4().hex, time.time())
+
+
+def purged_at(versions):
+    # When the most recently purged of the tags was purged
+    return max(int(v.partition('-')[2] or 0) for v in versions)
+
+
+def purged_recently(versions, seconds):
+    return time.time() - purged_at(versions) < seconds
+
+
+def page_tags(tags, kwargs):
+    # Every page carries the site tag
+    return ['site'] + [tag % kwargs for tag in tags]
+
+
+def tag_versions(site_id, tags):
+    cache = get_cache()
+    keys = [tag_key(site_id, tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = dict((k, new_version()) for k in keys if k not in versions)
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[k] for k in keys]
+
+
+def purge(site_id, tags):
+    def set_versions():
+        get_cache().set_many(
+            dict((tag_key(site_id, tag), new_version()) for tag in tags),
+            None
+        )
+
+    set_versions()
+    # NOTE: A request made before the change is committed could cache a page
+    #       with the old content, so we purge again once it is committed.
+    if connection.in_atomic_block:
+        transaction.on_commit(set_versions)
+
+
+def page_key(request, site_id, versions):
+    url = '%s%s' % (request.get_host(), request.get_full_path())
+    return 'page:%s:%s:%s' % (
+               site_id,
+               hashlib.md5(url.encode('utf-8')).hexdigest(),
+               hashlib.md5(':'.join(versions).encode('utf-8')).hexdigest()
+           )
+
+
+def is_public_request(request):
+    # Pages include the logged in user's details and any pending messages, so
+    # only anonymous requests without messages share a rendered page.
+    return (not request.user.is_authenticated and
+            not len(messages.get_messages(request)))
+
+
+def cache_public_page(*tags):
+    # Tags are formatted with the view's keyword arguments, for example
+    # 'job:%(job_id)s'
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD') or
+                    not is_public_request(request)):
+                return view(request, *args, **kwargs)
+
+            site_id = get_current_site(request).id
+            versions = tag_versions(site_id, page_tags(tags, kwargs))
+            key = page_key(request, site_id, versions)
+            cache = get_cache()
+
+            cached = cache.get(key)
+            record_cache('page', cached is not None)
+            if cached is not None:
+                return from_cache(request, cached)
+
+            response = view(request, *args, **kwargs)
+            lag = getattr(settings, 'READ_REPLICA_LAG', 5)
+            if using_replica() and purged_recently(versions, lag):
+                return response
+            if (response.status_code in (200, 301) and
+                    not response.streaming and not response.cookies):
+                cache.set(
+                    key,
+                    to_cache(response),
+                    getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+                )
+            return response
+        return inner
+    return decorator
+
+
+def to_cache(response):
+    # The CSRF token differs for every visitor, so it is swapped for a
+    # placeholder and filled back in when the page is served.
+    content = CSRF_INPUT.sub(CSRF_PLACEHOLDER, response.content)
+    return (response.status_code, list(response.items()), content)
+
+
+def from_cache(request, cached):
+    status, headers, content = cached
+    if b'__csrf_token__' in content:
+        content = content.replace(
+                      b'__csrf_token__', get_token(request).encode('ascii')
+                  )
+    response = HttpResponse(content, status=status)
+    for header, value in headers:
+        response[header] = value
+    return response
+
+
+def purge_job(job, category_id=None, company_id=None):
+    tags = ['index',
+            'job:%s' % job.id,
+            'category:%s' % job.category_id,
+            'company:%s' % job.company_id]
+    # The job may have been moved from another category or company
+    if category_id is not None and category_id != job.category_id:
+        tags.append('category:%s' % category_id)
+    if company_id is not None and company_id != job.company_id:
+        tags.append('company:%s' % company_id)
+    purge(job.site_id, tags)
+
+
+def purge_jobs(site_id, jobs):
+    tags = set(['index'])
+    for job_id, category_id, company_id in jobs:
+        tags.add('job:%s' % job_id)
+        tags.add('category:%s' % category_id)
+        tags.add('company:%s' % company_id)
+    purge(site_id, sorted(tags))
+
+
+def purge_company(company):
+    # Company names are shown next to each of its jobs
+    jobs = company.job_set.values_list('id', 'category_id', 'company_id')
+    purge_jobs(company.site_id, jobs)
+    purge(company.site_id, ['company:%s' % company.id])
+
+
+def purge_category(category):
+    # Category names are shown next to each of its jobs
+    jobs = category.job_set.values_list('id', 'category_id', 'company_id')
+    purge_jobs(category.site_id, jobs)
+    purge(category.site_id, ['category:%s' % category.id])
+
+
+def purge_site(site_id):
+    purge(site_id, ['site'])
@@ -0,0 +1,187 @@
+import collections.abc
+from functools import cmp_to_key, reduce
+from operator import or_
+
+from django.core import signing
+from django.db.models import Q
+
+# NOTE: Listings are paginated on the values of their ordering columns rather
+#       than with LIMIT/OFFSET, so that every page costs the same index range
+#       scan no matter how deep it is, and no COUNT(*) is needed.  The
+#       primary key is added to the ordering to break ties.  Ordering columns
+#       must not be NULL.
+#
+#       The position of a page is passed around as a signed token in the
+#       "after" or "before" query parameter, an invalid or tampered token
+#       gives the first page.
+#
+#       Several querysets with the same ordering, such as jobs and archived
+#       jobs, can be paginated as one: each page reads a page worth of rows
+#       from each of them and keeps the first ones in order.
+
+SALT = 'job_board.pagination'
+
+
+class KeysetPaginator(object):
+    def __init__(self, queryset, per_page):
+        ordering = list(queryset.query.order_by or
+                        queryset.model._meta.ordering)
+        if not all(isinstance(field, str) for field in ordering):
+            raise ValueError('Keyset pagination needs field name ordering')
+        names = [field.lstrip('-') for field in ordering]
+        if 'pk' not in names and queryset.model._meta.pk.name not in names:
+            desc = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append('-pk' if desc else 'pk')
+        self.queryset = queryset
+        self.ordering = ordering
+        self.per_page = per_page
+
+    def page(self, after=None, before=None):
+        after = self.decode(after)
+        before = self.decode(before) if after is None else None
+
+        if before is not None:
+            objects = self.fetch(self.keyset_filter(before, True),
+                                 self.reverse_ordering())
+            has_previous = len(objects) > self.per_page
+            objects = objects[:self.per_page]
+            objects.reverse()
+            return KeysetPage(objects, self, has_previous, True)
+
+        keyset_filter = None
+        if after is not None:
+            keyset_filter = self.keyset_filter(after, False)
+        objects = self.fetch(keyset_filter, self.ordering)
+        has_next = len(objects) > self.per_page
+        return KeysetPage(objects[:self.per_page], self, after is not None,
+                          has_next)
+
+    def fetch(self, keyset_filter, ordering):
+        # Up to one more row than fits on a page, to tell if there are more
+        qs = self.queryset.order_by(*ordering)
+        if keyset_filter is not None:
+            qs = qs.filter(keyset_filter)
+        return list(qs[:self.per_page + 1])
+
+    def get_page(self, request):
+        return self.page(request.GET.get('after'), request.GET.get('before'))
+
+    def reverse_ordering(self):
+        return [f[1:] if f.startswith('-') else '-' + f
+                for f in self.ordering]
+
+    def keyset_filter(self, values, reverse):
+        # Rows sorting after (or, in reverse, before) the given values:
+        # (a > x) OR (a = x AND b > y) OR ...
+        conditions = []
+        for i, field in enumerate(self.ordering):
+            desc = field.startswith('-') != reverse
+            lookup = '%s__%s' % (field.lstrip('-'), 'lt' if desc else 'gt')
+            equal = dict((f.lstrip('-'), v)
+                         for f, v in zip(self.ordering[:i], values))
+            conditions.append(Q(**equal) & Q(**{lookup: values[i]}))
+
+        # Repeating the bound on the first column lets the database use an
+        # index range scan
+        first = self.ordering[0]
+        desc = first.startswith('-') != reverse
+        lookup = '%s__%s' % (first.lstrip('-'), 'lte' if desc else 'gte')
+        return Q(**{lookup: values[0]}) & reduce(or_, conditions)
+
+    def raw_values(self, obj):
+        # obj is a model instance, or a dict for querysets using values()
+        values = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            if isinstance(obj, dict):
+                if name == 'pk':
+                    name = self.queryset.model._meta.pk.attname
+                value = obj[name]
+            else:
+                value = obj
+                for attr in name.split('__'):
+                    value = getattr(value, attr)
+            values.append(value)
+        return values
+
+    def values(self, obj):
+        return [value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in self.raw_values(obj)]
+
+    def encode(self, obj):
+        return signing.dumps(self.values(obj), salt=SALT)
+
+    def decode(self, token):
+        if not token:
+            return None
+        try:
+            values = signing.loads(token, salt=SALT)
+        except signing.BadSignature:
+            return None
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            return None
+        return values
+
+
+class MergedKeysetPaginator(KeysetPaginator):
+    def __init__(self, querysets, per_page):
+        super(MergedKeysetPaginator, self).__init__(querysets[0], per_page)
+        self.querysets = querysets
+
+    def fetch(self, keyset_filter, ordering):
+        objects = []
+        for queryset in self.querysets:
+            qs = queryset.order_by(*ordering)
+            if keyset_filter is not None:
+                qs = qs.filter(keyset_filter)
+            objects.extend(qs[:self.per_page + 1])
+
+        def compare(a, b):
+            for field, x, y in zip(ordering, self.raw_values(a),
+                                   self.raw_values(b)):
+                if x != y:
+                    order = 1 if x > y else -1
+                    return -order if field.startswith('-') else order
+            return 0
+
+        objects.sort(key=cmp_to_key(compare))
+        return objects[:self.per_page + 1]
+
+
+class KeysetPage(collections.abc.Sequence):
+    def __init__(self, object_list, paginator, has_previous, has_next):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return '<Page of %s objects>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    def next_token(self):
+        return self.paginator.encode(self.object_list[-1])
+
+    def previous_token(self):
+        return self.paginator.encode(self.object_list[0])
+
+
+def paginate(request, queryset, per_page=25):
+    # queryset may be a list of querysets to paginate as one
+    if isinstance(queryset, (list, tuple)):
+        return MergedKeysetPaginator(queryset, per_page).get_page(request)
+    return KeysetPaginator(queryset, per_page).get_page(request)
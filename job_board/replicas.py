@@ -0,0 +1,103 @@
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# NOTE: Read-only views decorated with replica_reads run their queries
+#       against the READ_REPLICA_ALIAS database (default "replica") when it
+#       is configured in DATABASES, all other views and every write use the
+#       default database.
+#
+#       Replicas lag behind the primary, so a visitor who has just written
+#       something (posted or edited a job, say) must not be sent to the
+#       replica straight away.  The router notes any write made while
+#       handling a request, and ReplicaMiddleware then sets a short-lived
+#       cookie which pins that visitor's reads to the primary for
+#       READ_REPLICA_PIN_SECONDS.
+#
+#       Content stored in a cache until its next change (feeds, sitemaps) is
+#       generated inside primary_reads(), as a replica that has not caught
+#       up with the change would have it cached with the old rows.
+
+PIN_COOKIE = 'pin_primary'
+
+_state = threading.local()
+
+
+def get_replica_alias():
+    alias = getattr(settings, 'READ_REPLICA_ALIAS', 'replica')
+    if alias in connections.settings:
+        return alias
+    return None
+
+
+def using_replica():
+    return getattr(_state, 'use_replica', False)
+
+
+@contextmanager
+def primary_reads():
+    # Reads made inside the block use the default database
+    use_replica = using_replica()
+    _state.use_replica = False
+    try:
+        yield
+    finally:
+        _state.use_replica = use_replica
+
+
+def is_pinned(request):
+    return PIN_COOKIE in request.COOKIES
+
+
+class ReplicaRouter(object):
+    def db_for_read(self, model, **hints):
+        if using_replica():
+            return get_replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = (DEFAULT_DB_ALIAS, get_replica_alias())
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+def replica_reads(view):
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD') or is_pinned(request) or
+                get_replica_alias() is None):
+            return view(request, *args, **kwargs)
+
+        _state.use_replica = True
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _state.use_replica = False
+    return inner
+
+
+class ReplicaMiddleware(object):
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.use_replica = False
+        _state.wrote = False
+        response = self.get_response(request)
+        if _state.wrote and get_replica_alias() is not None:
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=getattr(settings, 'READ_REPLICA_PIN_SECONDS', 10),
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
@@ -0,0 +1,170 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+# NOTE: Only active (paid and unexpired) jobs are kept in the search index,
+#       jobs are added or removed by the post_save/post_delete handlers in
+#       job_board.signals as they move through their lifecycle.
+
+
+# Fallback used on databases without a dedicated backend
+class SearchBackend(object):
+    def search(self, jobs, query):
+        return jobs.filter(
+                   Q(title__icontains=query) | Q(description__icontains=query)
+               ).order_by('-paid_at')
+
+    def index(self, job):
+        pass
+
+    def remove(self, job_id):
+        pass
+
+    def remove_many(self, job_ids):
+        for job_id in job_ids:
+            self.remove(job_id)
+
+    def clear(self):
+        pass
+
+    def update(self, job):
+        if job.status == job.ACTIVE:
+            self.index(job)
+        else:
+            self.remove(job.id)
+
+
+class SqliteSearchBackend(SearchBackend):
+    table = 'job_board_job_fts'
+
+    def _match(self, query):
+        # Every word becomes a quoted prefix term so that FTS5 query syntax
+        # in user input is treated as text
+        terms = re.findall(r'\w+', query)
+        return ' '.join('"%s"*' % t for t in terms)
+
+    def search(self, jobs, query):
+        match = self._match(query)
+        if not match:
+            return jobs.none()
+        # NOTE: The FTS table is joined once, so that MATCH runs a single
+        #       time, and its rank column is then read like any other column
+        #       for ordering and keyset pagination.  bm25() returns lower
+        #       values for better matches, titles are weighted ten times
+        #       higher than descriptions.
+        jobs = jobs.extra(
+                   tables=[self.table],
+                   where=['%s MATCH %%s' % self.table,
+                          '%s.rank MATCH %%s' % self.table,
+                          '%s.rowid = job_board_job.id' % self.table],
+                   params=[match, 'bm25(10.0, 1.0)']
+               )
+        rank = RawSQL('%s.rank' % self.table, ())
+        return jobs.annotate(search_rank=rank) \
+                   .order_by('search_rank', '-paid_at')
+
+    def index(self, job):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM %s WHERE rowid = %%s' % self.table, (job.id,)
+            )
+            cursor.execute(
+                'INSERT INTO %s (rowid, title, description) '
+                'VALUES (%%s, %%s, %%s)' % self.table,
+                (job.id, job.title, job.description)
+            )
+
+    def remove(self, job_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM %s WHERE rowid = %%s' % self.table, (job_id,)
+            )
+
+    def remove_many(self, job_ids):
+        if not job_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM %s WHERE rowid IN (%s)' % (
+                    self.table, ', '.join(['%s'] * len(job_ids))
+                ),
+                list(job_ids)
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s' % self.table)
+
+
+class PostgresSearchBackend(SearchBackend):
+    table = 'job_board_job_search'
+    config = 'english'
+
+    def search(self, jobs, query):
+        # As with SQLite, the search table is joined once rather than
+        # looked up for every job
+        jobs = jobs.extra(
+                   tables=[self.table],
+                   where=['%s.job_id = job_board_job.id' % self.table,
+                          '%s.document @@ plainto_tsquery(%%s, %%s)' % (
+                              self.table,
+                          )],
+                   params=[self.config, query]
+               )
+        rank = RawSQL(
+                   'ts_rank(%s.document, plainto_tsquery(%%s, %%s))' % (
+                       self.table,
+                   ),
+                   (self.config, query)
+               )
+        return jobs.annotate(search_rank=rank) \
+                   .order_by('-search_rank', '-paid_at')
+
+    def index(self, job):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO %s (job_id, document) VALUES (%%s, '
+                'setweight(to_tsvector(%%s, %%s), \'A\') || '
+                'setweight(to_tsvector(%%s, %%s), \'B\')) '
+                'ON CONFLICT (job_id) DO UPDATE '
+                'SET document = EXCLUDED.document' % self.table,
+                (job.id, self.config, job.title, self.config, job.description)
+            )
+
+    def remove(self, job_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM %s WHERE job_id = %%s' % self.table, (job_id,)
+            )
+
+    def remove_many(self, job_ids):
+        if not job_ids:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM %s WHERE job_id = ANY(%%s)' % self.table,
+                (list(job_ids),)
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s' % self.table)
+
+
+BACKENDS = {
+    'sqlite': SqliteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    # NOTE: JOB_SEARCH_BACKEND may be set to the dotted path of a backend
+    #       class, otherwise we pick one based on the database in use.
+    path = getattr(settings, 'JOB_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    return BACKENDS.get(connection.vendor, SearchBackend)()
@@ -3,7 +3,15 @@ from __future__ import unicode_literals
 from django.core.exceptions import ObjectDoesNotExist
 from django.contrib.sites.models import Site
 
+from job_board import counters
 from job_board.models.site_config import SiteConfig
+from job_board.feeds import refresh_category, refresh_company, refresh_job
+from job_board.page_cache import (purge_category, purge_company, purge_job,
+                                  purge_site)
+from job_board.search import get_search_backend
+from job_board.sitemaps import (invalidate_category, invalidate_company,
+                                invalidate_job)
+from job_board.sites import clear_site_cache
 
 
 def gen_site_config_post_save(sender, **kwargs):
@@ -28,3 +36,64 @@ def gen_site_config_post_migrate(plan, **kwargs):
                 admin_email='admin@example.com',
                 remote=False
             )
+
+
+def update_job_search_index_post_save(sender, **kwargs):
+    if not kwargs.get('raw', False):
+        get_search_backend().update(kwargs.get('instance'))
+
+
+def update_job_search_index_post_delete(sender, **kwargs):
+    get_search_backend().remove(kwargs.get('instance').id)
+
+
+def update_job_counters_post_delete(sender, **kwargs):
+    # Also connected for JobArchive, whose status is always expired
+    job = kwargs.get('instance')
+    counters.apply(counters.job_deltas(
+        (job.status, job.category_id, job.company_id), None
+    ))
+
+
+def clear_site_cache_post_save(sender, **kwargs):
+    clear_site_cache()
+
+
+def clear_site_cache_post_delete(sender, **kwargs):
+    clear_site_cache()
+
+
+def purge_job_pages_post_save(sender, **kwargs):
+    job = kwargs.get('instance')
+    if not kwargs.get('raw', False):
+        purge_job(job, *job._loaded_relations)
+        refresh_job(job, *job._loaded_relations)
+        invalidate_job(job, *job._loaded_relations)
+
+
+def purge_job_pages_post_delete(sender, **kwargs):
+    purge_job(kwargs.get('instance'))
+    refresh_job(kwargs.get('instance'))
+    invalidate_job(kwargs.get('instance'))
+
+
+def purge_company_pages(sender, **kwargs):
+    if not kwargs.get('raw', False):
+        purge_company(kwargs.get('instance'))
+        refresh_company(kwargs.get('instance'))
+        invalidate_company(kwargs.get('instance'))
+
+
+def purge_category_pages(sender, **kwargs):
+    if not kwargs.get('raw', False):
+        purge_category(kwargs.get('instance'))
+        refresh_category(kwargs.get('instance'))
+        invalidate_category(kwargs.get('instance'))
+
+
+def purge_site_pages(sender, **kwargs):
+    instance = kwargs.get('instance')
+    if isinstance(instance, SiteConfig):
+        purge_site(instance.site_id)
+    else:
+        purge_site(instance.id)
@@ -0,0 +1,206 @@
+import hashlib
+from itertools import chain
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Max, Q
+from django.db.models.functions import Floor
+from django.urls import reverse
+
+from job_board.metrics import record_cache
+from job_board.models.category import Category
+from job_board.models.company import Company
+from job_board.models.job import Job
+from job_board.models.job_archive import JobArchive
+from job_board.page_cache import get_cache
+from job_board.replicas import primary_reads
+from job_board.sites import get_site_cache_version
+
+# NOTE: sitemap.xml is a sitemap index pointing to child sitemaps for the
+#       static pages and for each chunk of jobs (paid, including expired and
+#       archived), companies (with paid jobs) and categories.  Rows are
+#       assigned to chunks by id (id // SITEMAP_CHUNK_SIZE), so a row always
+#       stays in the same chunk and a change to a job only invalidates the
+#       chunks holding it, its company and its category, plus the index.
+#
+#       Generated sitemaps are stored in the page cache and regenerated on
+#       their next request after being invalidated, reading rows with
+#       iterator() so that memory use does not depend on the chunk size.  As
+#       with feeds, the site cache version is part of the key and sitemaps
+#       are generated from the primary rather than a read replica.  Chunks
+#       without any rows are stored too, as (None, None), and served as 404s.
+
+NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+SECTIONS = ('pages', 'jobs', 'companies', 'categories')
+PAGES = ('jobs_index', 'categories_index', 'companies_index')
+
+
+def chunk_size():
+    return getattr(settings, 'SITEMAP_CHUNK_SIZE', 5000)
+
+
+def sitemap_key(site_id, section, chunk=None):
+    return 'sitemap:%s:%s:%s:%s' % (
+               site_id, get_site_cache_version(), section,
+               '' if chunk is None else chunk
+           )
+
+
+def site_jobs(site):
+    return Job.objects.filter(site=site).paid()
+
+
+def site_archived_jobs(site):
+    return JobArchive.objects.filter(site=site)
+
+
+def site_companies(site):
+    return Company.objects.filter(site=site).filter(
+               Q(id__in=site_jobs(site).values('company_id')) |
+               Q(id__in=site_archived_jobs(site).values('company_id'))
+           )
+
+
+def site_categories(site):
+    return Category.objects.filter(site=site)
+
+
+QUERYSETS = {
+    'jobs': (site_jobs, site_archived_jobs),
+    'companies': (site_companies,),
+    'categories': (site_categories,),
+}
+
+
+def chunk_rows(site, section, chunk):
+    # (url, lastmod) of every row in the chunk
+    size = chunk_size()
+    for queryset in QUERYSETS[section]:
+        rows = queryset(site).filter(id__gte=chunk * size,
+                                     id__lt=(chunk + 1) * size) \
+                             .order_by('id')
+        if section == 'jobs':
+            # get_absolute_url() needs the company name for the slug
+            rows = rows.select_related('company') \
+                       .only('id', 'title', 'updated_at', 'company__name')
+        elif section == 'companies':
+            rows = rows.only('id', 'name', 'updated_at')
+        for obj in rows.iterator(chunk_size=1000):
+            yield obj.get_absolute_url(), getattr(obj, 'updated_at', None)
+
+
+def chunks(site, section):
+    # (chunk, lastmod) of the chunks holding at least one row, with an
+    # aggregate query per table
+    found = {}
+    for queryset in QUERYSETS[section]:
+        rows = queryset(site).annotate(chunk=Floor(F('id') / chunk_size())) \
+                             .values('chunk') \
+                             .order_by('chunk')
+        if section == 'categories':
+            rows = rows.distinct()
+        else:
+            rows = rows.annotate(lastmod=Max('updated_at'))
+        for row in rows:
+            values = [v for v in (found.get(int(row['chunk'])),
+                                  row.get('lastmod')) if v is not None]
+            found[int(row['chunk'])] = max(values) if values else None
+    return sorted(found.items())
+
+
+def lastmod(value):
+    return '<lastmod>%s</lastmod>' % value.isoformat() if value else ''
+
+
+def urlset(base, rows):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="%s">\n' % NAMESPACE
+    for url, modified in rows:
+        yield '<url><loc>%s</loc>%s</url>\n' % (escape(base + url),
+                                                lastmod(modified))
+    yield '</urlset>\n'
+
+
+def generate_index(site, base):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<sitemapindex xmlns="%s">\n' % NAMESPACE
+    yield '<sitemap><loc>%s</loc></sitemap>\n' % escape(
+        base + reverse('sitemap_section', args=('pages', 0))
+    )
+    for section in SECTIONS[1:]:
+        for chunk, modified in chunks(site, section):
+            yield '<sitemap><loc>%s</loc>%s</sitemap>\n' % (
+                escape(base + reverse('sitemap_section',
+                                      args=(section, chunk))),
+                lastmod(modified)
+            )
+    yield '</sitemapindex>\n'
+
+
+def generate(site, section=None, chunk=None):
+    base = '%s://%s' % (site.siteconfig.protocol, site.domain)
+    if section is None:
+        lines = generate_index(site, base)
+    elif section == 'pages':
+        lines = urlset(base, [(reverse(name), None) for name in PAGES])
+    else:
+        rows = chunk_rows(site, section, chunk)
+        first = next(rows, None)
+        if first is None:
+            return None, None
+        lines = urlset(base, chain([first], rows))
+    content = ''.join(lines).encode('utf-8')
+    return content, hashlib.md5(content).hexdigest()
+
+
+def get_sitemap(site, section=None, chunk=None):
+    # Returns (content, etag), the index when section is None, or
+    # (None, None) for a chunk without rows
+    key = sitemap_key(site.id, section, chunk)
+    sitemap = get_cache().get(key)
+    record_cache('sitemap', sitemap is not None)
+    if sitemap is None:
+        with primary_reads():
+            sitemap = generate(site, section, chunk)
+        get_cache().set(
+            key, sitemap, getattr(settings, 'SITEMAP_CACHE_TIMEOUT', 86400)
+        )
+    return sitemap
+
+
+def invalidate(site_id, job_ids=(), company_ids=(), category_ids=()):
+    size = chunk_size()
+    keys = [sitemap_key(site_id, None)]
+    for section, ids in (('jobs', job_ids), ('companies', company_ids),
+                         ('categories', category_ids)):
+        for chunk in set(i // size for i in ids if i is not None):
+            keys.append(sitemap_key(site_id, section, chunk))
+
+    def delete():
+        get_cache().delete_many(keys)
+
+    delete()
+    # NOTE: A request made before the change is committed could store a
+    #       sitemap with the old rows, so we invalidate again once committed.
+    if connection.in_atomic_block:
+        transaction.on_commit(delete)
+
+
+def invalidate_job(job, category_id=None, company_id=None):
+    # Draft jobs are not listed
+    if job.status == job.DRAFT:
+        return
+    invalidate(job.site_id, [job.id], [job.company_id, company_id],
+               [job.category_id, category_id])
+
+
+def invalidate_company(company):
+    # The company name is part of the URL of each of its jobs
+    job_ids = list(company.job_set.paid().values_list('id', flat=True))
+    job_ids += company.jobarchive_set.values_list('id', flat=True)
+    invalidate(company.site_id, job_ids, [company.id])
+
+
+def invalidate_category(category):
+    invalidate(category.site_id, category_ids=[category.id])
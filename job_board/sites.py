@@ -0,0 +1,71 @@
+import time
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.http.request import split_domain_port
+
+from job_board.models.cache_version import CacheVersion
+
+# NOTE: Sites are cached per process along with their SiteConfig.  Saving a
+#       Site or SiteConfig bumps the "sites" CacheVersion row, and every
+#       process compares its copy of that version with the database at most
+#       once every SITE_CACHE_TIMEOUT seconds, dropping its cache whenever
+#       another process has changed it.
+VERSION_NAME = 'sites'
+
+_sites = {}
+_state = {'version': None, 'checked_at': 0}
+
+
+def _check_version():
+    timeout = getattr(settings, 'SITE_CACHE_TIMEOUT', 5)
+    now = time.monotonic()
+    if (_state['version'] is not None and
+            now - _state['checked_at'] < timeout):
+        return
+    version = CacheVersion.current(VERSION_NAME)
+    if version != _state['version']:
+        _clear()
+    _state['version'] = version
+    _state['checked_at'] = now
+
+
+def _clear():
+    _sites.clear()
+    Site.objects.clear_cache()
+
+
+def _get_site(**kwargs):
+    return Site.objects.select_related('siteconfig').get(**kwargs)
+
+
+def get_current_site(request):
+    _check_version()
+    site_id = getattr(settings, 'SITE_ID', '')
+    if site_id:
+        if site_id not in _sites:
+            _sites[site_id] = _get_site(pk=site_id)
+        return _sites[site_id]
+
+    host = request.get_host()
+    if host not in _sites:
+        try:
+            _sites[host] = _get_site(domain__iexact=host)
+        except Site.DoesNotExist:
+            # Fallback to looking up site after stripping port from the host
+            domain, port = split_domain_port(host)
+            if domain not in _sites:
+                _sites[domain] = _get_site(domain__iexact=domain)
+            _sites[host] = _sites[domain]
+    return _sites[host]
+
+
+def get_site_cache_version():
+    _check_version()
+    return _state['version']
+
+
+def clear_site_cache():
+    _clear()
+    _state['version'] = CacheVersion.bump(VERSION_NAME)
+    _state['checked_at'] = time.monotonic()
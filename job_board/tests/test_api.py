@@ -0,0 +1,146 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from job_board.models.category import Category
+from job_board.models.company import Company
+from job_board.models.country import Country
+from job_board.models.job import Job
+
+
+@override_settings(SITE_ID=1)
+class ApiTests(TestCase):
+    def setUp(self):
+        user = User(username='owner')
+        user.set_password('password')
+        user.full_clean()
+        user.save()
+        self.country = Country(name='Canada')
+        self.country.full_clean()
+        self.country.save()
+        self.company = Company(name='Tramcar', url='http://www.tramcar.org',
+                               site_id=1, user_id=user.id)
+        self.company.full_clean()
+        self.company.save()
+        self.other_company = Company(name='Other', url='http://other.org',
+                                     site_id=1, user_id=user.id)
+        self.other_company.full_clean()
+        self.other_company.save()
+        self.category = Category(name='Software Development', site_id=1)
+        self.category.full_clean()
+        self.category.save()
+        self.jobs = []
+        for i in range(5):
+            job = Job(title='Developer %s' % i,
+                      description='Test description',
+                      application_info='test', category_id=self.category.id,
+                      company_id=self.company.id, site_id=1,
+                      user_id=user.id, city='Toronto', state='Ontario',
+                      email='dev%s@tramcar.org' % i,
+                      country_id=self.country.id if i == 0 else None,
+                      remote=i % 2 == 1)
+            job.full_clean()
+            job.save()
+            job.activate()
+            self.jobs.append(job)
+        # Unpaid jobs are never listed
+        Job.objects.create(title='Unpaid', description='Test description',
+                           application_info='test',
+                           category_id=self.category.id,
+                           company_id=self.other_company.id, site_id=1,
+                           user_id=user.id, email='unpaid@tramcar.org')
+
+    def get(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        return response, response.json()
+
+    def titles(self, data):
+        return sorted(job['title'] for job in data['data'])
+
+    def test_jobs(self):
+        response, data = self.get('api_jobs')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(len(data['data']), 5)
+        job = data['data'][0]
+        self.assertEqual(job['title'], 'Developer 4')
+        self.assertEqual(job['company'], 'Tramcar')
+        self.assertEqual(job['category'], 'Software Development')
+        self.assertTrue(
+            job['link'].endswith(self.jobs[4].get_absolute_url())
+        )
+        self.assertIsNone(data['next'])
+
+    def test_jobs_filters(self):
+        _, data = self.get('api_jobs', remote='true')
+        self.assertEqual(self.titles(data), ['Developer 1', 'Developer 3'])
+        _, data = self.get('api_jobs', country=self.country.id)
+        self.assertEqual(self.titles(data), ['Developer 0'])
+        _, data = self.get('api_jobs', company=self.other_company.id)
+        self.assertEqual(data['data'], [])
+
+    def test_invalid_filter(self):
+        response, data = self.get('api_jobs', category='software')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('category', data['error'])
+
+    def test_field_selection(self):
+        _, data = self.get('api_jobs', fields='id,title')
+        self.assertEqual(set(data['data'][0]), set(['id', 'title']))
+
+    def test_unknown_field(self):
+        response, data = self.get('api_jobs', fields='id,email')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', data['error'])
+
+    def test_cursor_pagination(self):
+        _, first = self.get('api_jobs', limit=3, fields='title')
+        self.assertEqual(len(first['data']), 3)
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(second['data']), 2)
+        self.assertIsNone(second['next'])
+        self.assertEqual(
+            self.titles(first) + self.titles(second),
+            ['Developer 2', 'Developer 3', 'Developer 4',
+             'Developer 0', 'Developer 1']
+        )
+        previous = self.client.get(second['previous']).json()
+        self.assertEqual(previous['data'], first['data'])
+
+    def test_etag(self):
+        response = self.client.get(reverse('api_jobs'))
+        response = self.client.get(
+                       reverse('api_jobs'),
+                       HTTP_IF_NONE_MATCH=response['ETag']
+                   )
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_when_job_expires(self):
+        response = self.client.get(reverse('api_jobs'))
+        self.jobs[0].expire()
+        response = self.client.get(
+                       reverse('api_jobs'),
+                       HTTP_IF_NONE_MATCH=response['ETag']
+                   )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['data']), 4)
+
+    def test_categories(self):
+        _, data = self.get('api_categories')
+        self.assertEqual(
+            data['data'],
+            [{'id': self.category.id,
+              'name': 'Software Development',
+              'active_jobs': 5,
+              'link': 'http://testserver%s' %
+                      self.category.get_absolute_url()}]
+        )
+
+    def test_companies(self):
+        _, data = self.get('api_companies', fields='name,active_jobs')
+        self.assertEqual(data['data'],
+                         [{'name': 'Tramcar', 'active_jobs': 5}])
+
+    def test_post_not_allowed(self):
+        response = self.client.post(reverse('api_jobs'))
+        self.assertEqual(response.status_code, 405)
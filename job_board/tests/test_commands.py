@@ -0,0 +1,519 @@
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from job_board.feeds import feed_keys, store
+from job_board.management.commands.expire import (BATCH_SIZE, batch_ids,
+                                                  expired_before)
+from job_board.models.category import Category
+from job_board.models.company import Company
+from job_board.models.country import Country
+from job_board.models.job import Job
+from job_board.models.job_archive import JobArchive
+from job_board.models.outbox_message import OutboxMessage
+from job_board.page_cache import get_cache
+
+
+class ExpireCommandTests(TestCase):
+    def setUp(self):
+        user = User(username='admin')
+        user.set_password('password')
+        user.full_clean()
+        user.save()
+        company = Company(name='Tramcar', url='http://www.tramcar.org',
+                          site_id=1, user_id=user.id)
+        company.full_clean()
+        company.save()
+        category = Category(name='Software Development', site_id=1)
+        category.full_clean()
+        category.save()
+        self.jobs = []
+        for i in range(5):
+            job = Job(title='Software Developer %s' % i,
+                      description='Test description',
+                      application_info='test', category_id=category.id,
+                      company_id=company.id, site_id=1, user_id=user.id,
+                      city='Toronto', state='Ontario',
+                      email='dev%s@tramcar.org' % i)
+            job.full_clean()
+            job.save()
+            job.activate()
+            self.jobs.append(job)
+        # The last job was posted recently and should not be expired
+        Job.objects.exclude(id=self.jobs[-1].id) \
+                   .update(paid_at=timezone.now() - timedelta(days=31))
+
+    def call_command(self, *args):
+        out = StringIO()
+        call_command('expire', *args, stdout=out)
+        return out.getvalue()
+
+    def test_expire_expires_overdue_jobs(self):
+        out = self.call_command('--batch-size', '3')
+        self.assertIn('4 jobs expired', out)
+        self.assertEqual(
+            Job.objects.filter(expired_at__isnull=False).count(), 4
+        )
+        self.assertIsNone(
+            Job.objects.get(id=self.jobs[-1].id).expired_at
+        )
+        self.assertLess(
+            Job.objects.get(id=self.jobs[0].id).expired_at, timezone.now()
+        )
+        company = Company.objects.get()
+        self.assertEqual(company.active_count, 1)
+        self.assertEqual(company.paid_count, 5)
+        self.assertEqual(Category.objects.get().active_count, 1)
+
+    def test_expire_sends_notifications(self):
+        self.call_command('--batch-size', '3')
+        call_command('run_worker', '--once', '--concurrency', '1',
+                     stdout=StringIO())
+        self.assertEqual(
+            sorted(m.to[0] for m in mail.outbox),
+            ['dev%s@tramcar.org' % i for i in range(4)]
+        )
+
+    def test_expire_dry_run_does_not_expire(self):
+        out = self.call_command('--dry-run')
+        self.assertIn('4 jobs would be expired', out)
+        self.assertEqual(
+            Job.objects.filter(expired_at__isnull=False).count(), 0
+        )
+
+
+@override_settings(SITE_ID=1)
+class ArchiveJobsCommandTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('admin', 'admin@tramcar.org',
+                                        'password')
+        self.company = Company.objects.create(name='Tramcar',
+                                              url='http://www.tramcar.org',
+                                              site_id=1, user=user)
+        category = Category.objects.create(name='Software Development',
+                                           site_id=1)
+        self.jobs = []
+        for i in range(4):
+            job = Job.objects.create(title='Software Developer %s' % i,
+                                     description='*Test* description %s' % i,
+                                     application_info='test',
+                                     category=category, company=self.company,
+                                     site_id=1, user=user,
+                                     email='dev%s@tramcar.org' % i)
+            job.activate()
+            self.jobs.append(job)
+        for job in self.jobs[:3]:
+            job.expire()
+        # The third job expired recently, the last one is still active
+        Job.objects.filter(id__in=[j.id for j in self.jobs[:2]]) \
+                   .update(expired_at=timezone.now() - timedelta(days=200))
+
+    def call_command(self, *args):
+        out = StringIO()
+        call_command('archive_jobs', *args, stdout=out)
+        return out.getvalue()
+
+    def test_archive_moves_old_expired_jobs(self):
+        out = self.call_command('--batch-size', '1')
+        self.assertIn('2 jobs archived', out)
+        archived = [j.id for j in self.jobs[:2]]
+        self.assertFalse(Job.objects.filter(id__in=archived).exists())
+        self.assertEqual(
+            sorted(JobArchive.objects.values_list('id', flat=True)), archived
+        )
+        self.assertEqual(Job.objects.count(), 2)
+        # Archived jobs are still counted as paid
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.paid_count, 4)
+
+        archive = JobArchive.objects.get(id=self.jobs[0].id)
+        self.assertEqual(archive.title, 'Software Developer 0')
+        self.assertEqual(archive.paid_at, self.jobs[0].paid_at)
+        self.assertEqual(archive.description, '*Test* description 0')
+        self.assertEqual(archive.description_html,
+                         self.jobs[0].description_html)
+
+    def test_deleting_archived_job_updates_counters(self):
+        self.call_command()
+        JobArchive.objects.get(id=self.jobs[0].id).delete()
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.paid_count, 3)
+        self.assertEqual(self.company.active_count, 1)
+
+    def test_archive_refreshes_feeds(self):
+        site = Site.objects.get(id=1)
+        store(site, 'company', self.company.id)
+        keys = feed_keys(1, 'company', self.company.id)
+        self.call_command()
+        self.assertEqual(get_cache().get_many(keys), {})
+
+    def test_archive_days(self):
+        out = self.call_command('--days', '0')
+        self.assertIn('3 jobs archived', out)
+        self.assertTrue(Job.objects.filter(id=self.jobs[3].id).exists())
+
+    def test_archive_dry_run_does_not_archive(self):
+        out = self.call_command('--dry-run')
+        self.assertIn('2 jobs would be archived', out)
+        self.assertEqual(JobArchive.objects.count(), 0)
+
+    def test_archived_jobs_are_still_shown(self):
+        self.call_command()
+        job = self.jobs[0]
+        response = self.client.get(job.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<em>Test</em> description 0')
+        self.assertContains(response, 'This job has expired')
+
+        response = self.client.get(self.company.get_absolute_url())
+        self.assertEqual(
+            [j.title for j in response.context['jobs']],
+            ['Software Developer %s' % i for i in (3, 2, 1, 0)]
+        )
+
+    def test_archived_jobs_cannot_be_edited_or_expired(self):
+        self.call_command()
+        job = self.jobs[0]
+        self.client.login(username='admin', password='password')
+        response = self.client.get(job.get_absolute_url())
+        self.assertContains(response, 'Archived')
+        self.assertNotContains(response, reverse('jobs_edit', args=(job.id,)))
+        self.assertFalse(hasattr(JobArchive.objects, 'active'))
+        self.assertFalse(hasattr(JobArchive.objects, 'paid'))
+
+
+class RecountCommandTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('admin', 'admin@tramcar.org',
+                                        'password')
+        self.company = Company.objects.create(name='Tramcar',
+                                              url='http://www.tramcar.org',
+                                              site_id=1, user=user)
+        self.category = Category.objects.create(name='Software Development',
+                                                site_id=1)
+        for i in range(3):
+            job = Job.objects.create(title='Software Developer %s' % i,
+                                     description='Test description',
+                                     application_info='test',
+                                     category=self.category,
+                                     company=self.company, site_id=1,
+                                     user=user,
+                                     email='dev%s@tramcar.org' % i)
+            job.activate()
+        job.expire()
+        # Drift the counters, as an update() of the jobs would
+        Company.objects.update(active_count=0, paid_count=7)
+        Category.objects.update(active_count=5)
+
+    def call_command(self, *args):
+        out = StringIO()
+        call_command('recount', *args, stdout=out)
+        return out.getvalue()
+
+    def test_recount_repairs_counters(self):
+        out = self.call_command()
+        self.assertIn('1 categories repaired', out)
+        self.assertIn('1 companies repaired', out)
+        self.company.refresh_from_db()
+        self.category.refresh_from_db()
+        self.assertEqual(self.company.active_count, 2)
+        self.assertEqual(self.company.paid_count, 3)
+        self.assertEqual(self.category.active_count, 2)
+
+        out = self.call_command()
+        self.assertIn('0 categories repaired', out)
+        self.assertIn('0 companies repaired', out)
+
+    def test_recount_dry_run_does_not_repair(self):
+        out = self.call_command('--dry-run')
+        self.assertIn('1 companies would be repaired', out)
+        self.company.refresh_from_db()
+        self.assertEqual(self.company.paid_count, 7)
+
+
+class SendMailshotCommandTests(TestCase):
+    def setUp(self):
+        user = User(username='admin')
+        user.set_password('password')
+        user.full_clean()
+        user.save()
+        company = Company(name='Tramcar', url='http://www.tramcar.org',
+                          site_id=1, user_id=user.id)
+        company.full_clean()
+        company.save()
+        self.categories = []
+        for name in ('Software Development', 'Design'):
+            category = Category(name=name, site_id=1)
+            category.full_clean()
+            category.save()
+            self.categories.append(category)
+        for i, category in enumerate(self.categories * 2):
+            job = Job(title='Job %s' % i,
+                      description='Test description',
+                      application_info='test', category_id=category.id,
+                      company_id=company.id, site_id=1, user_id=user.id,
+                      city='Toronto', state='Ontario',
+                      email='admin@tramcar.org')
+            job.full_clean()
+            job.save()
+            job.activate()
+        self.site = Site.objects.get(id=1)
+        self.site.siteconfig.mailchimp_username = 'tramcar'
+        self.site.siteconfig.mailchimp_api_key = 'key'
+        self.site.siteconfig.mailchimp_list_id = 'list'
+        self.site.siteconfig.save()
+
+    def call_command(self, *args):
+        out = StringIO()
+        call_command('send_mailshot', '--workers', '1', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_renders_jobs_grouped_by_category(self):
+        out = self.call_command('--dry-run', '--site', self.site.domain)
+        self.assertIn('mailshot sent: False', out)
+        design = out.index('DESIGN')
+        development = out.index('SOFTWARE DEVELOPMENT')
+        self.assertLess(design, development)
+        self.assertLess(design, out.index('Job 1 @ Tramcar'))
+        self.assertLess(development, out.index('Job 2 @ Tramcar'))
+
+    def test_dry_run_uses_single_job_query_per_site(self):
+        with self.assertNumQueries(2):
+            self.call_command('--dry-run', '--site', self.site.domain)
+
+    def test_unknown_site_raises_error(self):
+        with self.assertRaises(CommandError):
+            self.call_command('--site', 'unknown.example.com')
+
+
+class ExplainQueriesCommandTests(TestCase):
+    def setUp(self):
+        user = User(username='admin')
+        user.set_password('password')
+        user.full_clean()
+        user.save()
+        company = Company(name='Tramcar', url='http://www.tramcar.org',
+                          site_id=1, user_id=user.id)
+        company.full_clean()
+        company.save()
+        category = Category(name='Software Development', site_id=1)
+        category.full_clean()
+        category.save()
+        job = Job(title='Software Developer',
+                  description='Test description',
+                  application_info='test', category_id=category.id,
+                  company_id=company.id, site_id=1, user_id=user.id,
+                  city='Toronto', state='Ontario', email='dev@tramcar.org')
+        job.full_clean()
+        job.save()
+        job.activate()
+
+    def test_plans_use_job_indexes(self):
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        for index in Job._meta.indexes:
+            self.assertIn(index.name, out.getvalue())
+
+    def test_output_records_plans_with_and_without_indexes(self):
+        with tempfile.NamedTemporaryFile(mode='r', suffix='.json') as f:
+            call_command('explain_queries', '--output', f.name,
+                         '--without-indexes', stdout=StringIO(),
+                         stderr=StringIO())
+            plans = json.load(f)['plans']
+        self.assertNotIn('job_site_status_paid_idx',
+                         plans['jobs_index']['without_indexes'])
+        self.assertIn('job_site_status_paid_idx',
+                      plans['jobs_index']['with_indexes'])
+        # The dropped indexes are restored afterwards
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        self.assertIn('job_site_status_paid_idx', out.getvalue())
+        self.assertNotIn('without indexes', out.getvalue())
+
+    def test_plans_include_the_expire_query(self):
+        with tempfile.NamedTemporaryFile(mode='r', suffix='.json') as f:
+            call_command('explain_queries', '--output', f.name,
+                         stdout=StringIO())
+            plans = json.load(f)['plans']
+        site = Site.objects.get(id=1)
+        self.assertEqual(
+            plans['expire']['with_indexes'],
+            batch_ids(site, expired_before(site), BATCH_SIZE).explain()
+        )
+
+    def test_without_indexes_warns_about_locking(self):
+        err = StringIO()
+        call_command('explain_queries', '--without-indexes',
+                     stdout=StringIO(), stderr=err)
+        self.assertIn('jobs table is locked', err.getvalue())
+
+
+class BenchmarkCommandTests(TestCase):
+    def benchmark(self, *args):
+        with tempfile.NamedTemporaryFile(mode='r', suffix='.json') as f:
+            call_command('benchmark', '--jobs', '20', '--companies', '3',
+                         '--categories', '2', '--requests', '2',
+                         '--output', f.name, *args,
+                         stdout=StringIO(), stderr=StringIO())
+            return json.load(f)
+
+    def test_reports_every_route(self):
+        routes = self.benchmark()['routes']
+        self.assertEqual(routes['anonymous']['jobs_index']['status'], 200)
+        self.assertEqual(routes['anonymous']['jobs_mine']['status'], 302)
+        self.assertEqual(routes['authenticated']['jobs_mine']['status'], 200)
+        self.assertEqual(routes['anonymous']['jobs_show_slug']['status'],
+                         200)
+        self.assertNotIn('jobs_expire', routes['anonymous'])
+        result = routes['anonymous']['categories_show_slug']
+        for key in ('p50_ms', 'p95_ms', 'queries', 'sql_ms', 'first_ms',
+                    'first_queries'):
+            self.assertIn(key, result)
+        self.assertGreater(result['first_queries'], 0)
+
+    def test_data_is_rolled_back(self):
+        self.benchmark()
+        self.assertEqual(Job.objects.count(), 0)
+        self.assertFalse(
+            Site.objects.filter(domain__endswith='benchmark.invalid').exists()
+        )
+
+    def test_baseline_comparison(self):
+        report = self.benchmark()
+        result = report['routes']['authenticated']['jobs_index']
+        result['queries'] -= 1
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json') as f:
+            json.dump(report, f)
+            f.flush()
+            compared = self.benchmark('--baseline', f.name)
+            self.assertIn('jobs_index (authenticated) queries',
+                          ' '.join(compared['regressions']))
+            with self.assertRaises(CommandError):
+                self.benchmark('--baseline', f.name, '--fail-on-regression')
+
+
+class BenchmarkStartupCommandTests(TestCase):
+    def test_sdks_are_not_imported_at_startup(self):
+        out = StringIO()
+        call_command('benchmark_startup', '--runs', '1', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['sdks'], [])
+        self.assertGreater(report['max_rss_kb'], 0)
+        self.assertGreater(report['urlconf_seconds'], 0)
+
+
+class ImportJobsCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='password')
+        self.company = Company.objects.create(name='Tramcar',
+                                              url='http://www.tramcar.org',
+                                              site_id=1, user=self.user)
+        self.category = Category.objects.create(name='Software Development',
+                                                site_id=1)
+        Country.objects.create(name='Canada')
+
+    def write(self, suffix, content):
+        f = tempfile.NamedTemporaryFile(mode='w', suffix=suffix)
+        f.write(content)
+        f.flush()
+        self.addCleanup(f.close)
+        return f.name
+
+    def import_jobs(self, path, *args):
+        out = StringIO()
+        err = StringIO()
+        call_command('import_jobs', path, '--site', 'example.com',
+                     '--user', 'owner', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def csv_file(self, rows=1):
+        lines = ['title,description,application_info,email,company,'
+                 'company_url,category,country,city,state,remote']
+        for i in range(rows):
+            lines.append('Developer %s,We are **hiring**,Apply online,'
+                         'jobs@tramcar.org,tramcar,,Software Development,'
+                         'canada,Toronto,Ontario,no' % i)
+        return self.write('.csv', '\n'.join(lines) + '\n')
+
+    def test_imports_csv(self):
+        out, err = self.import_jobs(self.csv_file(2))
+        self.assertIn('2 jobs imported, 0 rows skipped', out)
+        job = Job.objects.get(title='Developer 0')
+        self.assertEqual(job.company, self.company)
+        self.assertEqual(job.category, self.category)
+        self.assertEqual(job.country.name, 'Canada')
+        self.assertIn('<strong>hiring</strong>', job.description_html)
+        self.assertIsNone(job.paid_at)
+
+    def test_imports_jsonl_creating_related_objects(self):
+        rows = [
+            {'title': 'Designer', 'description': 'Design things',
+             'application_info': 'Apply', 'email': 'jobs@acme.org',
+             'company': 'Acme', 'company_url': 'http://acme.org',
+             'category': 'Design', 'remote': True},
+            {'title': 'Illustrator', 'description': 'Draw things',
+             'application_info': 'Apply', 'email': 'jobs@acme.org',
+             'company': 'ACME', 'category': 'design', 'remote': True},
+        ]
+        path = self.write('.jsonl',
+                          '\n'.join(json.dumps(row) for row in rows))
+        out, err = self.import_jobs(path)
+        self.assertIn('2 jobs imported', out)
+        company = Company.objects.get(name='Acme')
+        self.assertEqual(company.job_set.count(), 2)
+        self.assertEqual(Category.objects.filter(name='Design').count(), 1)
+
+    def test_invalid_rows_are_skipped(self):
+        path = self.write(
+            '.csv',
+            'title,description,application_info,email,company,category,'
+            'remote\n'
+            'Developer,Desc,Apply,jobs@tramcar.org,Tramcar,'
+            'Software Development,yes\n'
+            ',Desc,Apply,not-an-email,Tramcar,Software Development,yes\n'
+            'Developer,Desc,Apply,jobs@tramcar.org,Unknown Inc,'
+            'Software Development,yes\n'
+            'Developer,Desc,Apply,jobs@tramcar.org,Tramcar,'
+            'Software Development,no\n'
+        )
+        out, err = self.import_jobs(path)
+        self.assertIn('1 jobs imported, 3 rows skipped', out)
+        self.assertIn('Line 3: title: This field is required.', err)
+        self.assertIn('email: Enter a valid email address.', err)
+        self.assertIn('Line 4: company: Unknown company "Unknown Inc"', err)
+        self.assertIn('Line 5: city: City is required', err)
+        self.assertFalse(Company.objects.filter(name='Unknown Inc').exists())
+
+    @override_settings(SITE_ID=1)
+    def test_activate_does_not_tweet(self):
+        out, err = self.import_jobs(self.csv_file(3), '--activate')
+        self.assertEqual(
+            Job.objects.filter(paid_at__isnull=False).count(), 3
+        )
+        self.assertFalse(OutboxMessage.objects.filter(kind='tweet').exists())
+        response = self.client.get('/jobs/search/', {'query': 'Developer'})
+        self.assertContains(response, 'Developer 2')
+
+    def test_dry_run_does_not_import(self):
+        out, err = self.import_jobs(self.csv_file(2), '--dry-run')
+        self.assertIn('2 jobs would be imported', out)
+        self.assertEqual(Job.objects.count(), 0)
+
+    def test_validation_queries_do_not_grow_with_rows(self):
+        def count(rows):
+            path = self.csv_file(rows)
+            with CaptureQueriesContext(connection) as queries:
+                self.import_jobs(path, '--chunk-size', '100')
+            return len(queries)
+        self.assertEqual(count(2), count(20))
@@ -0,0 +1,179 @@
+import csv
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from job_board.models.category import Category
+from job_board.models.company import Company
+from job_board.models.job import Job
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@a.org',
+                                                  'password')
+        self.other_site = Site.objects.create(domain='other.org',
+                                              name='Other')
+        self.company = Company.objects.create(name='Tramcar',
+                                              url='http://www.tramcar.org',
+                                              site_id=1, user=self.user)
+        self.idle_company = Company.objects.create(name='Idle',
+                                                   url='http://idle.org',
+                                                   site_id=1, user=self.user)
+        category = Category.objects.create(name='Software Development',
+                                           site_id=1)
+        other_category = Category.objects.create(name='Design',
+                                                 site=self.other_site)
+        other_company = Company.objects.create(name='Other',
+                                               url='http://other.org',
+                                               site=self.other_site,
+                                               user=self.user)
+        self.jobs = []
+        for i, status in enumerate(['draft', 'active', 'expired']):
+            job = Job.objects.create(title='Developer %s' % i,
+                                     description='Test description',
+                                     application_info='test',
+                                     category=category,
+                                     company=self.company, site_id=1,
+                                     user=self.user, remote=True,
+                                     email='dev@tramcar.org')
+            if status != 'draft':
+                job.activate()
+            if status == 'expired':
+                job.expire()
+            self.jobs.append(job)
+        Job.objects.create(title='Designer', description='Test description',
+                           application_info='test',
+                           category=other_category, company=other_company,
+                           site=self.other_site, user=self.user,
+                           remote=True, email='dev@other.org')
+
+    def export(self, *args):
+        out = StringIO()
+        call_command('export', *args, stdout=out)
+        return out.getvalue()
+
+    def test_jobs_csv(self):
+        rows = list(csv.DictReader(StringIO(self.export('jobs'))))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual([r['status'] for r in rows[:3]],
+                         ['draft', 'active', 'expired'])
+        self.assertEqual(rows[0]['company'], 'Tramcar')
+        self.assertEqual(rows[0]['category'], 'Software Development')
+        self.assertEqual(rows[3]['site'], 'other.org')
+
+    def test_jobs_jsonl_filtered_by_site(self):
+        lines = self.export('jobs', '--format', 'jsonl',
+                            '--site', 'example.com').splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([r['title'] for r in rows],
+                         ['Developer 0', 'Developer 1', 'Developer 2'])
+        self.assertIsNone(rows[0]['paid_at'])
+        self.assertIsNotNone(rows[1]['paid_at'])
+
+    def test_jobs_filtered_by_date(self):
+        Job.objects.filter(id=self.jobs[0].id).update(
+            created_at=timezone.now() - timedelta(days=10)
+        )
+        since = (timezone.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        rows = list(csv.DictReader(
+                   StringIO(self.export('jobs', '--since', since))
+               ))
+        self.assertEqual(len(rows), 3)
+        self.assertNotIn('Developer 0', [r['title'] for r in rows])
+        until = (timezone.now() - timedelta(days=2)).strftime('%Y-%m-%d')
+        rows = list(csv.DictReader(
+                   StringIO(self.export('jobs', '--until', until))
+               ))
+        self.assertEqual([r['title'] for r in rows], ['Developer 0'])
+
+    def test_invalid_date(self):
+        with self.assertRaises(CommandError):
+            self.export('jobs', '--since', 'yesterday')
+
+    def test_companies_include_those_without_jobs(self):
+        rows = list(csv.DictReader(
+                   StringIO(self.export('companies', '--site', 'example.com'))
+               ))
+        counts = dict((r['name'], (r['paid_jobs'], r['active_jobs']))
+                      for r in rows)
+        self.assertEqual(counts, {'Tramcar': ('2', '1'), 'Idle': ('0', '0')})
+
+    def test_rows_are_read_with_a_query_per_table(self):
+        # One query for the jobs and one for the archived jobs
+        def count():
+            with CaptureQueriesContext(connection) as queries:
+                self.export('jobs', '--chunk-size', '2')
+            return len(queries)
+        self.assertEqual(count(), 2)
+        for job in self.jobs:
+            job.pk = None
+            job.save()
+        self.assertEqual(count(), 2)
+
+    def test_archived_jobs_are_exported_as_expired(self):
+        call_command('archive_jobs', '--days', '0', stdout=StringIO())
+        self.assertFalse(Job.objects.filter(id=self.jobs[2].id).exists())
+        rows = list(csv.DictReader(StringIO(self.export('jobs'))))
+        self.assertEqual(len(rows), 4)
+        archived = [r for r in rows if r['title'] == 'Developer 2']
+        self.assertEqual(len(archived), 1)
+        self.assertEqual(archived[0]['status'], 'expired')
+        self.assertEqual(archived[0]['company'], 'Tramcar')
+        lines = self.export('jobs', '--format', 'jsonl',
+                            '--site', 'example.com').splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([r['title'] for r in rows],
+                         ['Developer 0', 'Developer 1', 'Developer 2'])
+        self.assertEqual(rows[2]['status'], 'expired')
+        self.assertEqual(rows[2]['category'], 'Software Development')
+        self.assertIsNotNone(rows[2]['expired_at'])
+
+    def test_admin_action_streams_selected_jobs(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+                       reverse('admin:job_board_job_changelist'),
+                       {'action': 'export_jobs_csv',
+                        '_selected_action': [self.jobs[0].id,
+                                             self.jobs[1].id]}
+                   )
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment; filename="jobs-',
+                      response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode('utf-8')
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual([r['title'] for r in rows],
+                         ['Developer 0', 'Developer 1'])
+
+    def test_admin_action_streams_companies_as_jsonl(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+                       reverse('admin:job_board_company_changelist'),
+                       {'action': 'export_companies_jsonl',
+                        '_selected_action': [self.company.id]}
+                   )
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertEqual(json.loads(content)['name'], 'Tramcar')
+
+    def test_admin_action_streams_archived_jobs(self):
+        call_command('archive_jobs', '--days', '0', stdout=StringIO())
+        self.client.force_login(self.user)
+        response = self.client.post(
+                       reverse('admin:job_board_jobarchive_changelist'),
+                       {'action': 'export_archived_jobs_csv',
+                        '_selected_action': [self.jobs[2].id]}
+                   )
+        content = b''.join(response.streaming_content).decode('utf-8')
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual([(r['title'], r['status']) for r in rows],
+                         [('Developer 2', 'expired')])
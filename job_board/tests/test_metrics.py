@@ -0,0 +1,160 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from job_board.metrics import flush, process_key, process_started, \
+                              render_metric_text
+
+
+@override_settings(SITE_ID=1)
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.staff = User(username='staff', is_staff=True)
+        self.staff.set_password('password')
+        self.staff.save()
+
+    def metrics(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('metrics'))
+        self.client.logout()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        return response.content.decode('utf-8')
+
+    def value(self, text, sample):
+        # Counters are shared by every test in the process, so tests compare
+        # values before and after a request
+        for line in text.splitlines():
+            if line.startswith(sample + ' '):
+                return float(line.split(' ')[-1])
+        return 0.0
+
+    def test_records_requests_per_view(self):
+        sample = 'tramcar_requests_total' \
+                 '{method="GET",status="200",view="jobs_index"}'
+        before = self.value(self.metrics(), sample)
+        self.client.get(reverse('jobs_index'))
+        text = self.metrics()
+        self.assertEqual(self.value(text, sample), before + 1)
+        self.assertIn('# TYPE tramcar_request_duration_seconds histogram',
+                      text)
+        self.assertIn('tramcar_request_duration_seconds_bucket'
+                      '{le="+Inf",view="jobs_index"}', text)
+        self.assertGreater(
+            self.value(text, 'tramcar_db_queries_total{view="jobs_index"}'),
+            0
+        )
+        self.assertGreater(
+            self.value(
+                text,
+                'tramcar_template_render_seconds_total{view="jobs_index"}'
+            ),
+            0
+        )
+        self.assertGreater(
+            self.value(
+                text,
+                'tramcar_response_size_bytes_sum{view="jobs_index"}'
+            ),
+            0
+        )
+
+    def test_records_page_cache_hits_and_misses(self):
+        hit = 'tramcar_cache_requests_total' \
+              '{cache="page",result="hit",view="categories_index"}'
+        miss = 'tramcar_cache_requests_total' \
+               '{cache="page",result="miss",view="categories_index"}'
+        text = self.metrics()
+        hits, misses = self.value(text, hit), self.value(text, miss)
+        self.client.get(reverse('categories_index'))
+        self.client.get(reverse('categories_index'))
+        text = self.metrics()
+        self.assertEqual(self.value(text, miss), misses + 1)
+        self.assertEqual(self.value(text, hit), hits + 1)
+
+    def test_anonymous_users_are_denied(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_non_staff_users_are_denied(self):
+        User.objects.create_user('user', password='password')
+        self.client.login(username='user', password='password')
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_ALLOWED_IPS=['127.0.0.1'])
+    def test_allowed_ips_are_served(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+
+    def write_samples(self, directory, filename, value):
+        with open(os.path.join(directory, filename), 'w') as f:
+            json.dump([['tramcar_db_queries_total',
+                        [['view', 'jobs_index']], value]], f)
+
+    def test_metrics_of_other_processes_are_added(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        sample = 'tramcar_db_queries_total{view="jobs_index"}'
+        parent = os.getppid()
+        with override_settings(METRICS_DIR=directory):
+            before = self.value(self.metrics(), sample)
+            self.write_samples(directory, 'metrics-%s-%s.json' % (
+                                   parent, process_started(parent)
+                               ), 5)
+            self.assertEqual(self.value(self.metrics(), sample), before + 5)
+
+            # This process's own file is not counted twice
+            flush(force=True)
+            own = 'metrics-%s.json' % process_key()
+            self.assertIn(own, os.listdir(directory))
+            self.assertEqual(self.value(self.metrics(), sample), before + 5)
+
+    def test_metrics_of_exited_processes_are_kept_once(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        sample = 'tramcar_db_queries_total{view="jobs_index"}'
+        # A process which had the same PID as this one, and has exited
+        dead = 'metrics-%s-1.json' % os.getpid()
+        with override_settings(METRICS_DIR=directory):
+            before = self.value(self.metrics(), sample)
+            self.write_samples(directory, dead, 3)
+            self.assertEqual(self.value(self.metrics(), sample), before + 3)
+            self.assertNotIn(dead, os.listdir(directory))
+            self.write_samples(directory, dead, 4)
+            self.assertEqual(self.value(self.metrics(), sample), before + 7)
+            self.assertEqual(self.value(self.metrics(), sample), before + 7)
+
+
+class RenderMetricTextTests(TestCase):
+    def test_buckets_are_ordered_by_bound(self):
+        text = render_metric_text({
+            ('tramcar_request_duration_seconds_bucket',
+             (('le', '+Inf'), ('view', 'a'))): 2,
+            ('tramcar_request_duration_seconds_bucket',
+             (('le', '10'), ('view', 'a'))): 2,
+            ('tramcar_request_duration_seconds_bucket',
+             (('le', '2.5'), ('view', 'a'))): 1,
+        })
+        self.assertEqual(text.splitlines()[2:], [
+            'tramcar_request_duration_seconds_bucket{le="2.5",view="a"} 1.0',
+            'tramcar_request_duration_seconds_bucket{le="10",view="a"} 2.0',
+            'tramcar_request_duration_seconds_bucket{le="+Inf",view="a"} 2.0',
+        ])
+
+    def test_label_values_are_escaped(self):
+        text = render_metric_text({
+            ('tramcar_requests_total', (('view', 'a"b'),)): 1,
+        })
+        self.assertIn('tramcar_requests_total{view="a\\"b"} 1.0', text)
+
+    def test_label_newlines_and_backslashes_are_escaped(self):
+        text = render_metric_text({
+            ('tramcar_requests_total', (('view', 'a\\b\nc'),)): 1,
+        })
+        self.assertIn('tramcar_requests_total{view="a\\\\b\\nc"} 1.0', text)
@@ -1,12 +1,14 @@
 from django.contrib.auth.models import User
 from django.contrib.sites.models import Site
 from django.conf import settings
+from django.db.models.signals import post_save
 from django.test import TestCase
 
 from job_board.models.category import Category
 from job_board.models.company import Company
 from job_board.models.job import Job
 from job_board.models.user_token import UserToken
+from job_board.signals import purge_job_pages_post_save
 
 # NOTE: This seems counter-intuitive as we do not set a SITE_ID in settings.py,
 #       however if we do not do this then the tests fail since the requests
@@ -92,6 +94,70 @@ class CompanyMethodTests(TestCase):
         job.activate()
         self.assertEqual(len(self.company.paid_jobs()), 1)
 
+    def test_with_paid_jobs(self):
+        job = Job(title='Software Developer',
+                  description='Test description',
+                  application_info='test', category_id=self.category.id,
+                  company_id=self.company.id, site_id=1, user_id=self.user.id,
+                  city='Toronto', state='Ontario',
+                  email='admin@tramcar.org')
+        job.full_clean()
+        job.save()
+        self.assertQuerysetEqual(Company.objects.with_paid_jobs(), [])
+        job.activate()
+        job.expire()
+        company = Company.objects.with_paid_jobs().get()
+        self.assertEqual(company.paid_count, 1)
+        self.assertEqual(company.active_count, 0)
+
+    def test_category_with_active_jobs(self):
+        job = Job(title='Software Developer',
+                  description='Test description',
+                  application_info='test', category_id=self.category.id,
+                  company_id=self.company.id, site_id=1, user_id=self.user.id,
+                  city='Toronto', state='Ontario',
+                  email='admin@tramcar.org')
+        job.full_clean()
+        job.save()
+        self.assertQuerysetEqual(Category.objects.with_active_jobs(), [])
+        job.activate()
+        category = Category.objects.with_active_jobs().get()
+        self.assertEqual(category.active_count, 1)
+        job.expire()
+        self.assertQuerysetEqual(Category.objects.with_active_jobs(), [])
+
+    def test_counters_follow_category_and_delete(self):
+        job = Job(title='Software Developer',
+                  description='Test description',
+                  application_info='test', category_id=self.category.id,
+                  company_id=self.company.id, site_id=1, user_id=self.user.id,
+                  city='Toronto', state='Ontario',
+                  email='admin@tramcar.org')
+        job.full_clean()
+        job.save()
+        job.activate()
+        other = Category(name='Sales', site_id=1)
+        other.full_clean()
+        other.save()
+        # Saving again does not count the job twice, whichever receivers run
+        post_save.disconnect(purge_job_pages_post_save, sender=Job)
+        try:
+            job.category = other
+            job.save()
+            job.save()
+        finally:
+            post_save.connect(purge_job_pages_post_save, sender=Job)
+        self.category.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.category.active_count, 0)
+        self.assertEqual(other.active_count, 1)
+        job.delete()
+        other.refresh_from_db()
+        self.company.refresh_from_db()
+        self.assertEqual(other.active_count, 0)
+        self.assertEqual(self.company.active_count, 0)
+        self.assertEqual(self.company.paid_count, 0)
+
 
 class JobMethodTests(TestCase):
     def setUp(self):
@@ -147,6 +213,46 @@ class JobMethodTests(TestCase):
         self.assertFalse(job.expire())
         self.assertIsNone(job.expired_at)
 
+    def test_status_follows_activate_and_expire(self):
+        job = Job.objects.get(title='Software Developer')
+        self.assertEqual(job.status, Job.DRAFT)
+        job.activate()
+        self.assertEqual(Job.objects.get(id=job.id).status, Job.ACTIVE)
+        job.expire()
+        self.assertEqual(Job.objects.get(id=job.id).status, Job.EXPIRED)
+
+    def test_save_refuses_status_going_backwards(self):
+        job = Job.objects.get(title='Software Developer')
+        job.activate()
+        job.status = Job.DRAFT
+        with self.assertRaises(ValueError):
+            job.save()
+        job = Job.objects.get(id=job.id)
+        job.status = Job.EXPIRED
+        job.save()
+        self.assertEqual(Job.objects.get(id=job.id).status, Job.EXPIRED)
+
+    def test_save_renders_markdown(self):
+        job = Job.objects.get(title='Software Developer')
+        self.assertEqual(job.description_html, '<p>Test description</p>')
+        self.assertEqual(job.application_info_html, '<p>test</p>')
+
+    def test_save_rerenders_markdown_when_text_changes(self):
+        job = Job.objects.get(title='Software Developer')
+        job.description = '__Updated__ description'
+        job.save()
+        job.refresh_from_db()
+        self.assertEqual(
+            job.description_html,
+            '<p><strong>Updated</strong> description</p>'
+        )
+
+    def test_save_sanitizes_rendered_markdown(self):
+        job = Job.objects.get(title='Software Developer')
+        job.description = '<script>alert(1)</script>'
+        job.save()
+        self.assertNotIn('<script>', job.description_html)
+
 
 class UserTokenMethodTests(TestCase):
     def setUp(self):
@@ -0,0 +1,99 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+
+from job_board import outbox
+from job_board.models.category import Category
+from job_board.models.company import Company
+from job_board.models.job import Job
+from job_board.models.outbox_message import OutboxMessage
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        user = User(username='admin')
+        user.set_password('password')
+        user.full_clean()
+        user.save()
+        company = Company(name='Tramcar', url='http://www.tramcar.org',
+                          site_id=1, user_id=user.id)
+        company.full_clean()
+        company.save()
+        category = Category(name='Software Development', site_id=1)
+        category.full_clean()
+        category.save()
+        self.job = Job(title='Software Developer',
+                       description='Test description',
+                       application_info='test', category_id=category.id,
+                       company_id=company.id, site_id=1, user_id=user.id,
+                       city='Toronto', state='Ontario',
+                       email='admin@tramcar.org')
+        self.job.full_clean()
+        self.job.save()
+
+    def run_worker(self, *args):
+        call_command('run_worker', '--once', '--concurrency', '1', *args,
+                     stdout=StringIO())
+
+    def test_activate_queues_tweet(self):
+        self.job.activate()
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.kind, 'tweet')
+        self.assertEqual(message.payload, {'job_id': self.job.id})
+
+    def test_expire_queues_mail_instead_of_sending(self):
+        self.job.activate()
+        self.job.expire()
+        self.assertEqual(len(mail.outbox), 0)
+        message = OutboxMessage.objects.get(kind='mail')
+        self.assertEqual(message.payload['recipient_list'], [self.job.email])
+
+    def test_worker_delivers_queued_messages(self):
+        self.job.activate()
+        self.job.expire()
+        self.run_worker()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(
+            OutboxMessage.objects.exclude(status=OutboxMessage.SENT).count(),
+            0
+        )
+
+    def test_worker_retries_and_then_marks_failing_messages_dead(self):
+        def fail(**kwargs):
+            raise RuntimeError('Service unavailable')
+
+        outbox.HANDLERS['failing'] = fail
+        self.addCleanup(outbox.HANDLERS.pop, 'failing')
+        message = outbox.enqueue('failing')
+
+        self.run_worker('--max-attempts', '3', '--backoff', '0')
+
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.DEAD)
+        self.assertEqual(message.attempts, 3)
+        self.assertIn('Service unavailable', message.last_error)
+
+    def test_mass_mail_retries_only_undelivered_messages(self):
+        # A newline in the subject makes that one message fail
+        message = outbox.enqueue_mass_mail([
+            ('Expired', 'Body', 'admin@tramcar.org', ['a@tramcar.org']),
+            ('Bad\nsubject', 'Body', 'admin@tramcar.org', ['b@tramcar.org']),
+            ('Expired', 'Body', 'admin@tramcar.org', ['c@tramcar.org']),
+        ])
+
+        self.run_worker('--max-attempts', '3', '--backoff', '0')
+
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox),
+                         ['a@tramcar.org', 'c@tramcar.org'])
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboxMessage.DEAD)
+        self.assertEqual(message.attempts, 3)
+        self.assertEqual([m[3] for m in message.payload['datatuple']],
+                         [['b@tramcar.org']])
+
+    def test_enqueue_rejects_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            outbox.enqueue('unknown')
@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from job_board.models.category import Category
+from job_board.models.company import Company
+from job_board.models.job import Job
+from job_board.models.job_archive import JobArchive
+from job_board.pagination import KeysetPaginator, MergedKeysetPaginator
+from job_board.search import get_search_backend
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        user = User(username='owner')
+        user.set_password('password')
+        user.full_clean()
+        user.save()
+        company = Company(name='Tramcar', url='http://www.tramcar.org',
+                          site_id=1, user_id=user.id)
+        company.full_clean()
+        company.save()
+        category = Category(name='Software Development', site_id=1)
+        category.full_clean()
+        category.save()
+        for i in range(7):
+            job = Job(title='Job %s' % i,
+                      description='Test description',
+                      application_info='test', category_id=category.id,
+                      company_id=company.id, site_id=1, user_id=user.id,
+                      city='Toronto', state='Ontario',
+                      email='dev%s@tramcar.org' % i)
+            job.full_clean()
+            job.save()
+        # Several jobs paid at the same time are ordered by id
+        now = timezone.now()
+        Job.objects.update(paid_at=now)
+        Job.objects.filter(title='Job 6').update(
+            paid_at=now + timedelta(days=1)
+        )
+        self.paginator = KeysetPaginator(
+                             Job.objects.order_by('-paid_at'), 3
+                         )
+        self.expected = ['Job 6', 'Job 5', 'Job 4', 'Job 3', 'Job 2',
+                         'Job 1', 'Job 0']
+
+    def titles(self, page):
+        return [job.title for job in page]
+
+    def test_ordering_is_completed_with_primary_key(self):
+        self.assertEqual(self.paginator.ordering, ['-paid_at', '-pk'])
+
+    def test_pages_follow_next_tokens(self):
+        titles = []
+        page = self.paginator.page()
+        self.assertFalse(page.has_previous())
+        while True:
+            titles.extend(self.titles(page))
+            if not page.has_next():
+                break
+            page = self.paginator.page(after=page.next_token())
+            self.assertTrue(page.has_previous())
+        self.assertEqual(titles, self.expected)
+
+    def test_previous_token_returns_previous_page(self):
+        first = self.paginator.page()
+        second = self.paginator.page(after=first.next_token())
+        page = self.paginator.page(before=second.previous_token())
+        self.assertEqual(self.titles(page), self.titles(first))
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+
+    def test_invalid_token_returns_first_page(self):
+        page = self.paginator.page(after='not-a-token')
+        self.assertEqual(self.titles(page), self.expected[:3])
+
+    def test_page_does_not_count_rows(self):
+        with self.assertNumQueries(1):
+            self.paginator.page()
+
+    def test_search_results_rank_is_computed_once(self):
+        backend = get_search_backend()
+        for job in Job.objects.all():
+            backend.index(job)
+        paginator = KeysetPaginator(backend.search(Job.objects.all(), 'job'),
+                                    3)
+        titles = []
+        page = paginator.page()
+        while True:
+            titles.extend(self.titles(page))
+            if not page.has_next():
+                break
+            with CaptureQueriesContext(connection) as queries:
+                page = paginator.page(after=page.next_token())
+            # The keyset filter reads the rank of the joined search table
+            # rather than ranking every row again
+            if connection.vendor == 'sqlite':
+                self.assertEqual(queries[0]['sql'].count('bm25'), 1)
+        self.assertEqual(sorted(titles), sorted(self.expected))
+
+    def test_merged_querysets_are_paginated_as_one(self):
+        # Archive every other job, they are listed among the other jobs
+        archived = Job.objects.filter(title__in=['Job 5', 'Job 3', 'Job 1'])
+        archived.update(expired_at=timezone.now())
+        JobArchive.objects.bulk_create(
+            [JobArchive.from_job(job) for job in archived]
+        )
+        archived.delete()
+        paginator = MergedKeysetPaginator(
+                        [Job.objects.order_by('-paid_at'),
+                         JobArchive.objects.order_by('-paid_at')], 3
+                    )
+        titles = []
+        page = paginator.page()
+        while True:
+            titles.extend(self.titles(page))
+            if not page.has_next():
+                break
+            page = paginator.page(after=page.next_token())
+        self.assertEqual(titles, self.expected)
+        page = paginator.page(before=page.previous_token())
+        self.assertEqual(self.titles(page), ['Job 3', 'Job 2', 'Job 1'])
@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+
+from django.contrib.sites.models import Site
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from job_board.feeds import get_feed
+from job_board.models.category import Category
+from job_board.page_cache import get_cache
+from job_board.replicas import (PIN_COOKIE, ReplicaMiddleware,
+                                primary_reads, replica_reads)
+from job_board.sitemaps import get_sitemap
+
+
+@replica_reads
+def category_names(request):
+    names = Category.objects.order_by('name').values_list('name', flat=True)
+    return HttpResponse(','.join(names))
+
+
+@replica_reads
+def primary_category_names(request):
+    with primary_reads():
+        return category_names.__wrapped__(request)
+
+
+def cached(get):
+    # A view serving what get() returns for the site read from the primary
+    site = Site.objects.select_related('siteconfig').get(pk=1)
+
+    @replica_reads
+    def view(request):
+        content, etag = get(site)
+        return HttpResponse(content)
+    return view
+
+
+@replica_reads
+def add_category(request):
+    Category.objects.create(name='Added', site_id=1)
+    return HttpResponse('ok')
+
+
+class ReplicaRoutingTests(TestCase):
+    # The replica is a second SQLite file which, unlike a real replica, does
+    # not receive the primary's writes, so we can tell where reads went.
+
+    @classmethod
+    def setUpClass(cls):
+        super(ReplicaRoutingTests, cls).setUpClass()
+        cls.tmpdir = tempfile.mkdtemp()
+        connections.settings['replica'] = connections.configure_settings({
+            'default': connections.settings['default'],
+            'replica': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': os.path.join(cls.tmpdir, 'replica.sqlite3'),
+            },
+        })['replica']
+        call_command('migrate', database='replica', verbosity=0)
+        Category.objects.using('replica').create(name='Replica', site_id=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections.settings['replica']
+        del connections['replica']
+        shutil.rmtree(cls.tmpdir)
+        super(ReplicaRoutingTests, cls).tearDownClass()
+
+    def setUp(self):
+        Category.objects.create(name='Primary', site_id=1)
+        self.factory = RequestFactory()
+        self.middleware = ReplicaMiddleware(category_names)
+
+    def test_get_reads_from_replica(self):
+        response = self.middleware(self.factory.get('/'))
+        self.assertEqual(response.content, b'Replica')
+
+    def test_post_reads_from_primary(self):
+        response = self.middleware(self.factory.post('/'))
+        self.assertEqual(response.content, b'Primary')
+
+    def test_pinned_request_reads_from_primary(self):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        response = self.middleware(request)
+        self.assertEqual(response.content, b'Primary')
+
+    def test_reads_outside_decorated_views_use_primary(self):
+        self.middleware(self.factory.get('/'))
+        self.assertEqual(
+            list(Category.objects.values_list('name', flat=True)),
+            ['Primary']
+        )
+
+    def test_writes_go_to_primary_and_pin_reads(self):
+        response = ReplicaMiddleware(add_category)(self.factory.get('/'))
+        self.assertTrue(Category.objects.filter(name='Added').exists())
+        self.assertFalse(
+            Category.objects.using('replica').filter(name='Added').exists()
+        )
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_reads_do_not_pin(self):
+        response = self.middleware(self.factory.get('/'))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_primary_reads_inside_decorated_views(self):
+        response = ReplicaMiddleware(primary_category_names)(
+                       self.factory.get('/')
+                   )
+        self.assertEqual(response.content, b'Primary')
+
+    def test_cached_sitemaps_and_feeds_are_generated_from_primary(self):
+        # A lagging replica would store them without the latest changes
+        get_cache().clear()
+        sitemap = cached(lambda site: get_sitemap(site, 'categories', 0))
+        response = ReplicaMiddleware(sitemap)(self.factory.get('/'))
+        self.assertIn(b'-primary/', response.content)
+        self.assertNotIn(b'-replica/', response.content)
+        category = Category.objects.get(name='Primary')
+        feed = cached(lambda site: get_feed(site, 'category', category.id,
+                                            'rss'))
+        response = ReplicaMiddleware(feed)(self.factory.get('/'))
+        self.assertIn(b'Primary Jobs Feed', response.content)
@@ -0,0 +1,123 @@
+import re
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from job_board.models.category import Category
+from job_board.models.company import Company
+from job_board.models.job import Job
+from job_board.page_cache import get_cache
+
+
+@override_settings(SITE_ID=1, SITEMAP_CHUNK_SIZE=10)
+class SitemapTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.user = User.objects.create_user('owner', 'owner@a.org',
+                                             'password')
+        self.company = Company.objects.create(name='Tramcar',
+                                              url='http://www.tramcar.org',
+                                              site_id=1, user=self.user)
+        self.idle_company = Company.objects.create(name='Idle',
+                                                   url='http://idle.org',
+                                                   site_id=1, user=self.user)
+        self.category = Category.objects.create(name='Software Development',
+                                                site_id=1)
+        self.active = self.create_job('Developer')
+        self.active.activate()
+        self.expired = self.create_job('Designer')
+        self.expired.activate()
+        self.expired.expire()
+        self.draft = self.create_job('Draft')
+
+    def create_job(self, title):
+        return Job.objects.create(title=title, description='Test description',
+                                  application_info='test',
+                                  category=self.category,
+                                  company=self.company, site_id=1,
+                                  user=self.user, remote=True,
+                                  email='dev@tramcar.org')
+
+    def locations(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/xml')
+        return re.findall(r'<loc>http://example\.com([^<]*)</loc>',
+                          response.content.decode('utf-8'))
+
+    def chunk_url(self, section, obj):
+        return reverse('sitemap_section', args=(section, obj.id // 10))
+
+    def test_index_lists_chunks(self):
+        locations = self.locations(reverse('sitemap_index'))
+        self.assertIn(reverse('sitemap_section', args=('pages', 0)),
+                      locations)
+        self.assertIn(self.chunk_url('jobs', self.active), locations)
+        self.assertIn(self.chunk_url('companies', self.company), locations)
+        self.assertIn(self.chunk_url('categories', self.category), locations)
+
+    def test_jobs_include_expired_but_not_drafts(self):
+        locations = self.locations(self.chunk_url('jobs', self.active))
+        self.assertIn(self.active.get_absolute_url(), locations)
+        self.assertIn(self.expired.get_absolute_url(), locations)
+        self.assertNotIn(self.draft.get_absolute_url(), locations)
+
+    def test_companies_without_jobs_are_not_listed(self):
+        locations = self.locations(self.chunk_url('companies', self.company))
+        self.assertIn(self.company.get_absolute_url(), locations)
+        self.assertNotIn(self.idle_company.get_absolute_url(), locations)
+
+    def test_pages(self):
+        locations = self.locations(reverse('sitemap_section',
+                                           args=('pages', 0)))
+        self.assertEqual(locations, [reverse('jobs_index'),
+                                     reverse('categories_index'),
+                                     reverse('companies_index')])
+        response = self.client.get(reverse('sitemap_section',
+                                           args=('pages', 1)))
+        self.assertEqual(response.status_code, 404)
+
+    def test_chunks_without_rows_are_not_found(self):
+        response = self.client.get(reverse('sitemap_section',
+                                           args=('jobs', 1000)))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/sitemap-unknown-0.xml')
+        self.assertEqual(response.status_code, 404)
+
+    def test_chunk_is_read_with_a_single_query(self):
+        url = self.chunk_url('jobs', self.active)
+
+        def count():
+            get_cache().clear()
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url)
+            return len(queries)
+        before = count()
+        for i in range(5):
+            self.create_job('Developer %s' % i).activate()
+        self.assertEqual(count(), before)
+
+    def test_cached_until_a_job_changes(self):
+        url = self.chunk_url('jobs', self.active)
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+        self.draft.activate()
+        self.assertIn(self.draft.get_absolute_url(), self.locations(url))
+
+    def test_company_rename_regenerates_job_urls(self):
+        url = self.chunk_url('jobs', self.active)
+        self.client.get(url)
+        self.company.name = 'Renamed'
+        self.company.save()
+        self.active.refresh_from_db()
+        self.assertIn(self.active.get_absolute_url(), self.locations(url))
+
+    def test_conditional_get(self):
+        url = reverse('sitemap_index')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
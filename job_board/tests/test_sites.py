@@ -0,0 +1,37 @@
+from django.contrib.sites.models import Site
+from django.test import RequestFactory, TestCase, override_settings
+
+from job_board import sites
+from job_board.models.cache_version import CacheVersion
+
+
+@override_settings(SITE_ID='', ALLOWED_HOSTS=['tramcar.org'])
+class SiteCacheTests(TestCase):
+    def setUp(self):
+        self.site = Site(domain='tramcar.org', name='Tramcar')
+        self.site.full_clean()
+        self.site.save()
+        self.request = RequestFactory().get('/', HTTP_HOST='tramcar.org')
+
+    def test_site_is_cached_with_site_config(self):
+        site = sites.get_current_site(self.request)
+        with self.assertNumQueries(0):
+            self.assertEqual(sites.get_current_site(self.request), site)
+            self.assertEqual(site.siteconfig.expire_after, 30)
+
+    def test_site_config_save_clears_cache(self):
+        site = sites.get_current_site(self.request)
+        site.siteconfig.expire_after = 60
+        site.siteconfig.save()
+        site = sites.get_current_site(self.request)
+        self.assertEqual(site.siteconfig.expire_after, 60)
+
+    def test_version_bump_from_other_process_clears_cache(self):
+        sites.get_current_site(self.request)
+        # Simulate another process saving the site config
+        CacheVersion.bump(sites.VERSION_NAME)
+        Site.objects.filter(id=self.site.id).update(name='Tramcar.org')
+
+        with override_settings(SITE_CACHE_TIMEOUT=0):
+            site = sites.get_current_site(self.request)
+        self.assertEqual(site.name, 'Tramcar.org')
@@ -1,13 +1,24 @@
+from datetime import timedelta
+from io import StringIO
+
 from django.contrib.auth.models import User
 from django.conf import settings
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date, parse_http_date
 
+from job_board import counters
 from job_board.models.category import Category
 from job_board.models.company import Company
 from job_board.models.country import Country
 from job_board.models.job import Job
 from job_board.models.user_token import UserToken
+from job_board.page_cache import get_cache
+from job_board.search import get_search_backend
 
 
 # NOTE: This seems counter-intuitive as we do not set a SITE_ID in settings.py,
@@ -306,6 +317,37 @@ class JobViewUnauthdTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, not_found)
 
+    def test_search_jobs_matches_stemmed_words(self):
+        search = {
+            'query': 'developers',
+        }
+        response = self.client.get(reverse('jobs_search'), search)
+
+        url = reverse('jobs_show_slug', args=(self.job.id, self.job.slug(),))
+        found = '<a href="%s">%s</a>' % (url, self.job.title)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, found)
+
+    def test_search_jobs_does_not_find_expired_job(self):
+        self.job.expire()
+        search = {
+            'query': 'Software Developer',
+        }
+        response = self.client.get(reverse('jobs_search'), search)
+
+        not_found = '<p>No jobs found.</p>'
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, not_found)
+
+    def test_search_jobs_ignores_query_syntax(self):
+        search = {
+            'query': '"Software" AND (NEAR',
+        }
+        response = self.client.get(reverse('jobs_search'), search)
+        self.assertEqual(response.status_code, 200)
+
 
 class JobViewAuthdTests(TestCase):
 
@@ -615,6 +657,516 @@ class JobViewAdminTests(TestCase):
         self.assertContains(response, activate)
 
 
+class JobAdminTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser('admin', 'admin@a.org',
+                                                  'password')
+        company = Company.objects.create(name='Tramcar',
+                                         url='http://www.tramcar.org',
+                                         site_id=1, user=self.user)
+        category = Category.objects.create(name='Software Development',
+                                           site_id=1)
+        self.job = Job.objects.create(title='Software Developer',
+                                      description='Test description',
+                                      application_info='test',
+                                      category=category, company=company,
+                                      site_id=1, user=self.user,
+                                      email='admin@tramcar.org')
+        self.client.force_login(self.user)
+
+    def run_action(self, action):
+        return self.client.post(reverse('admin:job_board_job_changelist'),
+                                {'action': action,
+                                 '_selected_action': [self.job.id]},
+                                follow=True)
+
+    def test_dates_are_read_only(self):
+        response = self.client.get(
+                       reverse('admin:job_board_job_change',
+                               args=(self.job.id,))
+                   )
+        self.assertNotIn('paid_at', response.context['adminform'].form.fields)
+        self.assertNotIn('expired_at',
+                         response.context['adminform'].form.fields)
+
+    def test_actions_change_status(self):
+        response = self.run_action('activate_jobs')
+        self.assertContains(response, '1 jobs activated')
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, Job.ACTIVE)
+        self.assertEqual(self.job.company.active_count, 1)
+
+        response = self.run_action('expire_jobs')
+        self.assertContains(response, '1 jobs expired')
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, Job.EXPIRED)
+        self.assertIsNotNone(self.job.expired_at)
+        self.assertEqual(self.job.company.active_count, 0)
+
+
+class JobListingQueryTests(TestCase):
+
+    def setUp(self):
+        password = 'password'
+        self.user = User(username='owner')
+        self.user.set_password(password)
+        self.user.full_clean()
+        self.user.save()
+        self.country = Country(name='Canada')
+        self.country.full_clean()
+        self.country.save()
+        self.company = Company(name='Tramcar', url='http://www.tramcar.org',
+                               site_id=1, user_id=self.user.id)
+        self.company.full_clean()
+        self.company.save()
+        self.category = Category(name='Software Development', site_id=1)
+        self.category.full_clean()
+        self.category.save()
+
+        self.client.post(
+          '/login/',
+          {'username': self.user.username, 'password': password}
+        )
+
+    def add_jobs(self, count):
+        for i in range(count):
+            job = Job(title='Software Developer %s' % i,
+                      description='Test description',
+                      application_info='test', category_id=self.category.id,
+                      company_id=self.company.id, site_id=1,
+                      user_id=self.user.id, country_id=self.country.id,
+                      city='Toronto', state='Ontario',
+                      email='admin@tramcar.org')
+            job.save()
+            job.activate()
+
+    def count_queries(self, url, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, data)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertConstantQueries(self, url, data=None):
+        self.add_jobs(1)
+        # The first request populates the sites framework's SITE_CACHE
+        self.count_queries(url, data)
+        one = self.count_queries(url, data)
+        self.add_jobs(5)
+        many = self.count_queries(url, data)
+        self.assertEqual(one, many)
+
+    def test_index_view(self):
+        self.assertConstantQueries(reverse('jobs_index'))
+
+    def test_mine_view(self):
+        self.assertConstantQueries(reverse('jobs_mine'))
+
+    def test_search_view(self):
+        self.assertConstantQueries(
+            reverse('jobs_search'), {'query': 'Software'}
+        )
+
+    def test_category_show_view(self):
+        self.assertConstantQueries(self.category.get_absolute_url())
+
+    def test_company_show_view(self):
+        self.assertConstantQueries(self.company.get_absolute_url())
+
+    def test_category_feed_view(self):
+        url = reverse(
+                  'categories_feed',
+                  args=(self.category.id, self.category.slug(),)
+              )
+        # Adding jobs drops the stored feed, so both counts include
+        # generating it, and a stored feed is served without queries
+        self.count_queries(url)
+        self.add_jobs(1)
+        one = self.count_queries(url)
+        self.add_jobs(5)
+        many = self.count_queries(url)
+        self.assertEqual(one, many)
+        self.assertEqual(self.count_queries(url), 0)
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        self.password = 'password'
+        self.user = User(username='owner')
+        self.user.set_password(self.password)
+        self.user.full_clean()
+        self.user.save()
+        self.company = Company(name='Tramcar', url='http://www.tramcar.org',
+                               site_id=1, user_id=self.user.id)
+        self.company.full_clean()
+        self.company.save()
+        self.category = Category(name='Software Development', site_id=1)
+        self.category.full_clean()
+        self.category.save()
+        self.job = self.add_job()
+
+    def add_job(self):
+        job = Job(title='Software Developer',
+                  description='Test description',
+                  application_info='test', category_id=self.category.id,
+                  company_id=self.company.id, site_id=1, user_id=self.user.id,
+                  city='Toronto', state='Ontario',
+                  email='admin@tramcar.org')
+        job.full_clean()
+        job.save()
+        job.activate()
+        return job
+
+    def assertNotModified(self, url, last_modified=True):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertEqual(response.has_header('Last-Modified'), last_modified)
+        response = self.client.get(
+                       url, HTTP_IF_NONE_MATCH=response['ETag']
+                   )
+        self.assertEqual(response.status_code, 304)
+
+    def test_index_view(self):
+        self.assertNotModified(reverse('jobs_index'))
+
+    def test_show_view(self):
+        self.assertNotModified(self.job.get_absolute_url())
+
+    def test_category_show_view(self):
+        self.assertNotModified(self.category.get_absolute_url())
+
+    def test_company_show_view(self):
+        self.assertNotModified(self.company.get_absolute_url())
+
+    def test_category_feed_view(self):
+        # Feeds are validated on their ETag only
+        self.assertNotModified(
+            reverse(
+                'categories_feed',
+                args=(self.category.id, self.category.slug(),)
+            ),
+            last_modified=False
+        )
+
+    def test_index_view_is_modified_by_expired_job(self):
+        response = self.client.get(reverse('jobs_index'))
+        self.job.expire()
+        response = self.client.get(
+                       reverse('jobs_index'),
+                       HTTP_IF_NONE_MATCH=response['ETag']
+                   )
+        self.assertEqual(response.status_code, 200)
+
+    def test_index_view_is_modified_by_deleted_job(self):
+        older = self.add_job()
+        url = self.job.get_absolute_url()
+        response = self.client.get(reverse('jobs_index'))
+        self.job.delete()
+        response2 = self.client.get(
+                        reverse('jobs_index'),
+                        HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+        self.assertEqual(response2.status_code, 200)
+        self.assertNotContains(response2, url)
+        self.assertContains(response2, older.get_absolute_url())
+        # Last-Modified does not go back to the remaining job
+        self.assertGreaterEqual(parse_http_date(response2['Last-Modified']),
+                                parse_http_date(response['Last-Modified']))
+
+    def test_category_show_view_is_modified_by_category_rename(self):
+        response = self.client.get(self.category.get_absolute_url())
+        self.category.name = 'Development'
+        self.category.save()
+        response = self.client.get(
+                       self.category.get_absolute_url(),
+                       HTTP_IF_NONE_MATCH=response['ETag']
+                   )
+        self.assertEqual(response.status_code, 200)
+
+    def test_company_show_view_is_modified_by_company_edit(self):
+        response = self.client.get(self.company.get_absolute_url())
+        self.company.name = 'Tramcar Inc.'
+        self.company.save()
+        response = self.client.get(
+                       self.company.get_absolute_url(),
+                       HTTP_IF_NONE_MATCH=response['ETag']
+                   )
+        self.assertEqual(response.status_code, 200)
+
+    def test_index_view_is_not_conditional_for_authenticated_users(self):
+        self.client.post(
+          '/login/',
+          {'username': self.user.username, 'password': self.password}
+        )
+        response = self.client.get(reverse('jobs_index'))
+        self.assertFalse(response.has_header('ETag'))
+
+
+class PageCacheTests(TestCase):
+
+    def setUp(self):
+        self.password = 'password'
+        self.user = User(username='owner')
+        self.user.set_password(self.password)
+        self.user.full_clean()
+        self.user.save()
+        self.company = Company(name='Tramcar', url='http://www.tramcar.org',
+                               site_id=1, user_id=self.user.id)
+        self.company.full_clean()
+        self.company.save()
+        self.category = Category(name='Software Development', site_id=1)
+        self.category.full_clean()
+        self.category.save()
+        self.job = Job(title='Software Developer',
+                       description='Test description',
+                       application_info='test',
+                       category_id=self.category.id,
+                       company_id=self.company.id, site_id=1,
+                       user_id=self.user.id, city='Toronto',
+                       state='Ontario', email='admin@tramcar.org')
+        self.job.full_clean()
+        self.job.save()
+        self.job.activate()
+
+    def rename_job_silently(self):
+        # update() skips the signals, so cached pages keep the old title
+        Job.objects.filter(pk=self.job.id).update(title='Renamed Developer')
+
+    def test_index_view_is_cached(self):
+        self.client.get(reverse('jobs_index'))
+        self.rename_job_silently()
+        response = self.client.get(reverse('jobs_index'))
+        self.assertContains(response, 'Software Developer')
+
+    def test_index_view_is_purged_by_expired_job(self):
+        self.client.get(reverse('jobs_index'))
+        self.job.expire()
+        response = self.client.get(reverse('jobs_index'))
+        self.assertNotContains(response, 'Software Developer')
+
+    def test_index_view_is_purged_by_expire_command(self):
+        self.client.get(reverse('jobs_index'))
+        Job.objects.filter(pk=self.job.id).update(
+            paid_at=self.job.paid_at - timedelta(days=365)
+        )
+        call_command('expire', stdout=StringIO())
+        response = self.client.get(reverse('jobs_index'))
+        self.assertNotContains(response, 'Software Developer')
+
+    def test_category_show_view_is_purged_by_recategorized_job(self):
+        category = Category(name='Operations', site_id=1)
+        category.full_clean()
+        category.save()
+        self.client.get(self.category.get_absolute_url())
+        self.job.category = category
+        self.job.save()
+        response = self.client.get(self.category.get_absolute_url())
+        self.assertNotContains(response, 'Software Developer')
+
+    def test_show_view_is_purged_by_company_edit(self):
+        self.client.get(self.job.get_absolute_url())
+        self.company.name = 'Tramcar Inc.'
+        self.company.save()
+        response = self.client.get(self.job.get_absolute_url())
+        self.assertContains(response, 'Tramcar Inc.')
+
+    def test_other_pages_stay_cached_when_job_is_edited(self):
+        category = Category(name='Operations', site_id=1)
+        category.full_clean()
+        category.save()
+        self.client.get(category.get_absolute_url())
+        with CaptureQueriesContext(connection) as cached:
+            self.client.get(category.get_absolute_url())
+        self.job.title = 'Senior Developer'
+        self.job.save()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(category.get_absolute_url())
+        self.assertEqual(len(queries), len(cached))
+
+    def test_contact_view_is_cached_with_fresh_csrf_token(self):
+        self.client.get(reverse('contact'))
+        response = self.client.get(reverse('contact'))
+        self.assertNotContains(response, '__csrf_token__')
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+    def test_index_view_is_not_cached_for_authenticated_users(self):
+        self.client.post(
+          '/login/',
+          {'username': self.user.username, 'password': self.password}
+        )
+        self.client.get(reverse('jobs_index'))
+        self.rename_job_silently()
+        response = self.client.get(reverse('jobs_index'))
+        self.assertContains(response, 'Renamed Developer')
+
+
+class KeysetPaginationViewTests(TestCase):
+
+    def setUp(self):
+        user = User(username='owner')
+        user.set_password('password')
+        user.full_clean()
+        user.save()
+        self.company = Company(name='Tramcar', url='http://www.tramcar.org',
+                               site_id=1, user_id=user.id)
+        self.company.full_clean()
+        self.company.save()
+        self.category = Category(name='Software Development', site_id=1)
+        self.category.full_clean()
+        self.category.save()
+        for i in range(30):
+            job = Job(title='Developer %02d' % i,
+                      description='Test description',
+                      application_info='test',
+                      category_id=self.category.id,
+                      company_id=self.company.id, site_id=1,
+                      user_id=user.id, city='Toronto', state='Ontario',
+                      email='dev%s@tramcar.org' % i)
+            job.full_clean()
+            job.save()
+            job.activate()
+
+    def assertPaginated(self, url, data=None):
+        data = dict(data or {})
+        response = self.client.get(url, data)
+        first = list(response.context['jobs'])
+        self.assertEqual(len(first), 25)
+        self.assertTrue(response.context['jobs'].has_next())
+
+        data['after'] = response.context['jobs'].next_token()
+        response = self.client.get(url, data)
+        second = list(response.context['jobs'])
+        self.assertEqual(len(second), 5)
+        self.assertFalse(response.context['jobs'].has_next())
+        self.assertEqual(set(first) & set(second), set())
+
+        del data['after']
+        data['before'] = response.context['jobs'].previous_token()
+        response = self.client.get(url, data)
+        self.assertEqual(list(response.context['jobs']), first)
+
+    def test_category_show_view(self):
+        self.assertPaginated(self.category.get_absolute_url())
+
+    def test_company_show_view(self):
+        self.assertPaginated(self.company.get_absolute_url())
+
+    def test_search_view(self):
+        self.assertPaginated(reverse('jobs_search'), {'query': 'developer'})
+
+    def test_pagination_links_use_tokens(self):
+        response = self.client.get(self.category.get_absolute_url())
+        self.assertContains(response, 'after=')
+        self.assertNotContains(response, 'page=')
+
+
+class FeedTests(TestCase):
+
+    def setUp(self):
+        user = User(username='owner')
+        user.set_password('password')
+        user.full_clean()
+        user.save()
+        self.company = Company(name='Tramcar', url='http://www.tramcar.org',
+                               site_id=1, user_id=user.id)
+        self.company.full_clean()
+        self.company.save()
+        self.category = Category(name='Software Development', site_id=1)
+        self.category.full_clean()
+        self.category.save()
+        self.job = Job(title='Software Developer',
+                       description='Test *description*',
+                       application_info='test',
+                       category_id=self.category.id,
+                       company_id=self.company.id, site_id=1,
+                       user_id=user.id, city='Toronto', state='Ontario',
+                       email='admin@tramcar.org')
+        self.job.full_clean()
+        self.job.save()
+        self.job.activate()
+        self.category_args = (self.category.id, self.category.slug())
+        self.company_args = (self.company.id, self.company.slug())
+
+    def test_site_feed(self):
+        response = self.client.get(reverse('jobs_feed'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith(
+            'application/rss+xml'
+        ))
+        self.assertContains(response, 'Software Developer @ Tramcar')
+        self.assertContains(response, '&lt;em&gt;description&lt;/em&gt;')
+
+    def test_atom_feeds(self):
+        for url in (reverse('jobs_feed_atom'),
+                    reverse('categories_feed_atom', args=self.category_args),
+                    reverse('companies_feed_atom', args=self.company_args)):
+            response = self.client.get(url)
+            self.assertTrue(response['Content-Type'].startswith(
+                'application/atom+xml'
+            ))
+            self.assertContains(response, 'Software Developer @ Tramcar')
+
+    def test_company_feed(self):
+        response = self.client.get(
+                       reverse('companies_feed', args=self.company_args)
+                   )
+        self.assertContains(response, 'Software Developer @ Tramcar')
+
+    def test_unknown_category_feed_is_not_found(self):
+        response = self.client.get(
+                       reverse('categories_feed', args=(0, 'unknown'))
+                   )
+        self.assertEqual(response.status_code, 404)
+
+    def test_feeds_are_regenerated_when_job_is_expired(self):
+        url = reverse('categories_feed', args=self.category_args)
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.expire()
+        # The feed was generated again when the expiry was committed
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertNotContains(response, 'Software Developer @ Tramcar')
+
+    def test_feeds_are_regenerated_when_company_is_renamed(self):
+        url = reverse('jobs_feed')
+        self.client.get(url)
+        self.company.name = 'Tramcar Inc.'
+        self.company.save()
+        response = self.client.get(url)
+        self.assertContains(response, 'Software Developer @ Tramcar Inc.')
+
+    def test_feed_is_not_modified(self):
+        url = reverse('categories_feed', args=self.category_args)
+        response = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_feed_is_modified_when_newest_job_expires(self):
+        older = Job.objects.create(title='Designer',
+                                   description='Test description',
+                                   application_info='test',
+                                   category=self.category,
+                                   company=self.company, site_id=1,
+                                   user_id=self.job.user_id,
+                                   email='admin@tramcar.org')
+        older.activate()
+        Job.objects.filter(id=older.id) \
+                   .update(updated_at=timezone.now() - timedelta(days=1))
+        url = reverse('categories_feed', args=self.category_args)
+        response = self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.expire()
+        # Neither validator a reader may hold matches any more
+        for headers in ({'HTTP_IF_NONE_MATCH': response['ETag']},
+                        {'HTTP_IF_MODIFIED_SINCE': http_date()}):
+            response2 = self.client.get(url, **headers)
+            self.assertEqual(response2.status_code, 200)
+            self.assertNotContains(response2, 'Software Developer @ Tramcar')
+            self.assertContains(response2, 'Designer @ Tramcar')
+
+
 class MiscViewTests(TestCase):
 
     def test_charge_card_get_view(self):
@@ -690,3 +1242,200 @@ class MiscAuthdViewTests(TestCase):
             response,
             '<span class="label label-success">Paid</span>'
         )
+
+
+# The most queries each view may run, as (anonymous, authenticated), with the
+# page cache empty.  The same budget holds whether the view renders 1 row or
+# 100, so a query per row (N+1) fails the test.  None means the view redirects
+# anonymous users to the login page.
+QUERY_BUDGETS = {
+    'jobs_index': (2, 3),
+    'jobs_search': (1, 3),
+    'jobs_mine': (None, 3),
+    'jobs_show_slug': (6, 7),
+    'jobs_new': (None, 6),
+    'jobs_edit': (None, 7),
+    'jobs_feed': (1, 1),
+    'categories_index': (1, 3),
+    'categories_show_slug': (3, 4),
+    'categories_feed': (2, 2),
+    'companies_index': (1, 3),
+    'companies_show_slug': (6, 6),
+    'companies_new': (None, 3),
+    'companies_edit': (None, 5),
+    'companies_feed': (2, 2),
+    'api_jobs': (1, 3),
+    'api_categories': (1, 3),
+    'api_companies': (1, 3),
+    'contact': (0, 2),
+    'register': (0, 2),
+}
+
+
+# The site cache version is checked at most every SITE_CACHE_TIMEOUT seconds,
+# which must not happen in between warming the cache and measuring
+@override_settings(SITE_CACHE_TIMEOUT=3600)
+class QueryBudgetTests(TestCase):
+
+    def setUp(self):
+        password = 'password'
+        self.user = User(username='owner')
+        self.user.set_password(password)
+        self.user.full_clean()
+        self.user.save()
+        self.company = Company(name='Tramcar', url='http://www.tramcar.org',
+                               site_id=1, user_id=self.user.id)
+        self.company.full_clean()
+        self.company.save()
+        self.category = Category(name='Software Development', site_id=1)
+        self.category.full_clean()
+        self.category.save()
+        self.job = Job(title='Software Developer',
+                       description='Test description',
+                       application_info='test', category_id=self.category.id,
+                       company_id=self.company.id, site_id=1,
+                       user_id=self.user.id, city='Toronto', state='Ontario',
+                       email='admin@tramcar.org')
+        self.job.save()
+        self.job.activate()
+        self.rows = 1
+
+        self.authenticated = Client()
+        self.authenticated.login(username=self.user.username,
+                                 password=password)
+
+    def add_rows(self, count):
+        # Every row adds a listed category and company, and a job to the
+        # listings of self.category and self.company.  Rows are bulk created
+        # so that budgets can be checked at realistic sizes.
+        categories = Category.objects.bulk_create(
+            Category(name='Category %s' % (self.rows + i), site_id=1)
+            for i in range(count)
+        )
+        companies = Company.objects.bulk_create(
+            Company(name='Company %s' % (self.rows + i),
+                    url='http://www.tramcar.org', site_id=1,
+                    user_id=self.user.id)
+            for i in range(count)
+        )
+        jobs = []
+        for category, company in zip(categories, companies):
+            for category_id, company_id in ((category.id, self.company.id),
+                                            (self.category.id, company.id)):
+                jobs.append(Job(title='Software Developer',
+                                description='Test description',
+                                application_info='test',
+                                category_id=category_id,
+                                company_id=company_id, site_id=1,
+                                user_id=self.user.id, email='a@tramcar.org',
+                                status=Job.ACTIVE, paid_at=timezone.now()))
+        backend = get_search_backend()
+        for job in Job.objects.bulk_create(jobs):
+            backend.update(job)
+        counters.jobs_changed([(j.category_id, j.company_id) for j in jobs],
+                              Job.DRAFT, Job.ACTIVE)
+        self.rows += count
+
+    def count_queries(self, client, url, data=None):
+        # Warm the per-process site cache, then measure with an empty page
+        # cache
+        client.get(url, data)
+        get_cache().clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, data)
+        self.assertEqual(response.status_code, 200, url)
+        return len(queries)
+
+    def assertQueryBudget(self, name, *args, **kwargs):
+        url = reverse(name, args=args)
+        data = kwargs.get('data')
+        clients = [(label, client, budget) for (label, client), budget in
+                   zip((('anonymous', self.client),
+                        ('authenticated', self.authenticated)),
+                       QUERY_BUDGETS[name])
+                   if budget is not None]
+        counts = {}
+        for rows in (1, 100):
+            self.add_rows(rows - self.rows)
+            for label, client, budget in clients:
+                counts.setdefault(label, []).append(
+                    self.count_queries(client, url, data)
+                )
+        for label, client, budget in clients:
+            one, many = counts[label]
+            self.assertLessEqual(
+                one, budget,
+                '%s (%s) ran %s queries, over its budget of %s' % (
+                    name, label, one, budget
+                )
+            )
+            self.assertEqual(
+                one, many,
+                '%s (%s) ran %s queries for 1 row and %s for 100' % (
+                    name, label, one, many
+                )
+            )
+
+    def test_index_view(self):
+        self.assertQueryBudget('jobs_index')
+
+    def test_search_view(self):
+        self.assertQueryBudget('jobs_search', data={'query': 'Software'})
+
+    def test_mine_view(self):
+        self.assertQueryBudget('jobs_mine')
+
+    def test_show_view(self):
+        self.assertQueryBudget('jobs_show_slug', self.job.id, self.job.slug())
+
+    def test_new_view(self):
+        self.assertQueryBudget('jobs_new')
+
+    def test_edit_view(self):
+        self.assertQueryBudget('jobs_edit', self.job.id)
+
+    def test_feed_view(self):
+        self.assertQueryBudget('jobs_feed')
+
+    def test_category_index_view(self):
+        self.assertQueryBudget('categories_index')
+
+    def test_category_show_view(self):
+        self.assertQueryBudget('categories_show_slug', self.category.id,
+                               self.category.slug())
+
+    def test_category_feed_view(self):
+        self.assertQueryBudget('categories_feed', self.category.id,
+                               self.category.slug())
+
+    def test_company_index_view(self):
+        self.assertQueryBudget('companies_index')
+
+    def test_company_show_view(self):
+        self.assertQueryBudget('companies_show_slug', self.company.id,
+                               self.company.slug())
+
+    def test_company_new_view(self):
+        self.assertQueryBudget('companies_new')
+
+    def test_company_edit_view(self):
+        self.assertQueryBudget('companies_edit', self.company.id)
+
+    def test_company_feed_view(self):
+        self.assertQueryBudget('companies_feed', self.company.id,
+                               self.company.slug())
+
+    def test_api_jobs_view(self):
+        self.assertQueryBudget('api_jobs')
+
+    def test_api_categories_view(self):
+        self.assertQueryBudget('api_categories')
+
+    def test_api_companies_view(self):
+        self.assertQueryBudget('api_companies')
+
+    def test_contact_view(self):
+        self.assertQueryBudget('contact')
+
+    def test_register_view(self):
+        self.assertQueryBudget('register')
@@ -5,11 +5,21 @@ import job_board.views.categories as categories
 import job_board.views.companies as companies
 import job_board.views.misc as misc
 import job_board.views.feeds as feeds
+import job_board.views.api as api
+import job_board.views.metrics as metrics
+import job_board.views.sitemaps as sitemaps
 
 urlpatterns = [
     re_path(r'^$', jobs.jobs_index, name='jobs_index'),
     re_path(r'^contact/$', misc.contact, name='contact'),
     re_path(r'^jobs/$', jobs.jobs_index, name='jobs_index'),
+    re_path(r'^jobs/rss$', feeds.jobs_feed, name='jobs_feed'),
+    re_path(
+        r'^jobs/atom$',
+        feeds.jobs_feed,
+        {'feed_type': 'atom'},
+        name='jobs_feed_atom'
+    ),
     re_path(r'^jobs/new/$', jobs.jobs_new, name='jobs_new'),
     re_path(r'^jobs/search/$', jobs.jobs_search, name='jobs_search'),
     re_path(r'^jobs/mine/$', jobs.jobs_mine, name='jobs_mine'),
@@ -51,9 +61,15 @@ urlpatterns = [
     ),
     re_path(
         r'^categories/(?P<category_id>[0-9]+)-(?P<slug>[-\w\d]+)/rss$',
-        feeds.CategoryFeed(),
+        feeds.categories_feed,
         name='categories_feed'
     ),
+    re_path(
+        r'^categories/(?P<category_id>[0-9]+)-(?P<slug>[-\w\d]+)/atom$',
+        feeds.categories_feed,
+        {'feed_type': 'atom'},
+        name='categories_feed_atom'
+    ),
     re_path(r'^charge_card$', misc.charge_card, name='charge_card'),
     re_path(r'^charge_token$', misc.charge_token, name='charge_token'),
     re_path(
@@ -72,11 +88,37 @@ urlpatterns = [
         companies.companies_show,
         name='companies_show_slug'
     ),
+    re_path(
+        r'^companies/(?P<company_id>[0-9]+)-(?P<slug>[-\w\d]+)/rss$',
+        feeds.companies_feed,
+        name='companies_feed'
+    ),
+    re_path(
+        r'^companies/(?P<company_id>[0-9]+)-(?P<slug>[-\w\d]+)/atom$',
+        feeds.companies_feed,
+        {'feed_type': 'atom'},
+        name='companies_feed_atom'
+    ),
     re_path(
         r'^companies/(?P<company_id>[0-9]+)/edit$',
         companies.companies_edit,
         name='companies_edit'
     ),
+    re_path(r'^api/v1/jobs/$', api.api_jobs, name='api_jobs'),
+    re_path(
+        r'^api/v1/categories/$',
+        api.api_categories,
+        name='api_categories'
+    ),
+    re_path(r'^api/v1/companies/$', api.api_companies, name='api_companies'),
+    re_path(r'^metrics$', metrics.metrics, name='metrics'),
+    re_path(r'^sitemap\.xml$', sitemaps.sitemap_index, name='sitemap_index'),
+    re_path(
+        r'^sitemap-(?P<section>pages|jobs|companies|categories)-'
+        r'(?P<chunk>[0-9]+)\.xml$',
+        sitemaps.sitemap_section,
+        name='sitemap_section'
+    ),
     re_path(r'^register$', misc.register, name='register'),
     re_path(r'^subscribe$', misc.subscribe, name='subscribe'),
 ]
@@ -0,0 +1,217 @@
+import hashlib
+import json
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag, urlencode
+from django.utils.text import slugify
+from django.views.decorators.http import require_safe
+
+from job_board.models.category import Category
+from job_board.models.company import Company
+from job_board.models.job import Job
+from job_board.page_cache import cache_public_page
+from job_board.pagination import KeysetPaginator
+from job_board.replicas import replica_reads
+from job_board.sites import get_current_site
+
+# NOTE: Each resource maps the field names clients may ask for (with
+#       ?fields=a,b) to the columns needed to produce them and a function
+#       building the value from a row returned by values().  Rows never
+#       become model instances, and only the columns of the requested fields
+#       are selected.
+
+DEFAULT_LIMIT = 25
+MAX_LIMIT = 100
+
+
+def column(name):
+    return ([name], lambda request, row: row[name])
+
+
+def link(url_name, *columns):
+    # Absolute URL of a page taking the row's id and slug
+    def build(request, row):
+        slug = slugify('-'.join(str(row[c]) for c in columns))
+        return request.build_absolute_uri(
+                   reverse(url_name, args=(row['id'], slug))
+               )
+    return (['id'] + list(columns), build)
+
+
+JOB_FIELDS = {
+    'id': column('id'),
+    'title': column('title'),
+    'company': column('company__name'),
+    'company_id': column('company_id'),
+    'category': column('category__name'),
+    'category_id': column('category_id'),
+    'country': column('country__name'),
+    'remote': column('remote'),
+    'location': column('location'),
+    'city': column('city'),
+    'state': column('state'),
+    'paid_at': column('paid_at'),
+    'description': column('description_html'),
+    'link': link('jobs_show_slug', 'title', 'company__name'),
+}
+
+CATEGORY_FIELDS = {
+    'id': column('id'),
+    'name': column('name'),
+    'active_jobs': column('active_count'),
+    'link': link('categories_show_slug', 'name'),
+}
+
+COMPANY_FIELDS = {
+    'id': column('id'),
+    'name': column('name'),
+    'website': column('url'),
+    'twitter': column('twitter'),
+    'country': column('country__name'),
+    'paid_jobs': column('paid_count'),
+    'active_jobs': column('active_count'),
+    'link': link('companies_show_slug', 'name'),
+}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def api_view(view):
+    # Public GET/HEAD endpoint answering conditional requests from the ETag
+    # of the (possibly cached) response
+    @require_safe
+    @replica_reads
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if response.has_header('ETag'):
+            response = get_conditional_response(
+                           request, etag=response['ETag'], response=response
+                       )
+        return response
+    return inner
+
+
+def integer(request, name):
+    value = request.GET.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise BadRequest('%s must be an integer' % name)
+
+
+def boolean(request, name):
+    value = request.GET.get(name)
+    if value is None:
+        return None
+    if value.lower() in ('1', 'true', 'yes'):
+        return True
+    if value.lower() in ('0', 'false', 'no'):
+        return False
+    raise BadRequest('%s must be true or false' % name)
+
+
+def selected_fields(request, fields):
+    names = request.GET.get('fields')
+    if not names:
+        return sorted(fields)
+    names = [n.strip() for n in names.split(',') if n.strip()]
+    unknown = sorted(set(names) - set(fields))
+    if unknown:
+        raise BadRequest('Unknown fields: %s' % ', '.join(unknown))
+    return names
+
+
+def page_url(request, param, token):
+    query = request.GET.copy()
+    query.pop('after', None)
+    query.pop('before', None)
+    query[param] = token
+    return request.build_absolute_uri('?' + urlencode(sorted(query.items())))
+
+
+def respond(request, queryset, fields):
+    names = selected_fields(request, fields)
+    limit = integer(request, 'limit') or DEFAULT_LIMIT
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    # The ordering columns are always selected so that cursors can be built
+    ordering = KeysetPaginator(queryset, limit).ordering
+    columns = set(f.lstrip('-') for f in ordering) - set(['pk'])
+    columns.add('id')
+    for name in names:
+        columns.update(fields[name][0])
+
+    queryset = queryset.values(*sorted(columns))
+    page = KeysetPaginator(queryset, limit).get_page(request)
+    data = {
+        'data': [dict((name, fields[name][1](request, row)) for name in names)
+                 for row in page],
+        'next': (page_url(request, 'after', page.next_token())
+                 if page.has_next() else None),
+        'previous': (page_url(request, 'before', page.previous_token())
+                     if page.has_previous() else None),
+    }
+    content = json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))
+    response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = quote_etag(
+                           hashlib.md5(content.encode('utf-8')).hexdigest()
+                       )
+    return response
+
+
+@api_view
+@cache_public_page('index')
+def api_jobs(request):
+    try:
+        jobs = Job.objects.filter(site_id=get_current_site(request).id) \
+                          .active() \
+                          .order_by('-paid_at')
+        filters = {
+            'category_id': integer(request, 'category'),
+            'company_id': integer(request, 'company'),
+            'country_id': integer(request, 'country'),
+            'remote': boolean(request, 'remote'),
+        }
+        jobs = jobs.filter(
+                   **dict((k, v) for k, v in filters.items() if v is not None)
+               )
+        return respond(request, jobs, JOB_FIELDS)
+    except BadRequest as e:
+        return error(str(e))
+
+
+@api_view
+@cache_public_page('index')
+def api_categories(request):
+    categories = Category.objects \
+                         .filter(site_id=get_current_site(request).id) \
+                         .with_active_jobs()
+    try:
+        return respond(request, categories, CATEGORY_FIELDS)
+    except BadRequest as e:
+        return error(str(e))
+
+
+@api_view
+@cache_public_page('index')
+def api_companies(request):
+    companies = Company.objects \
+                       .filter(site_id=get_current_site(request).id) \
+                       .with_paid_jobs()
+    try:
+        return respond(request, companies, COMPANY_FIELDS)
+    except BadRequest as e:
+        return error(str(e))
@@ -1,19 +1,23 @@
-from django.contrib.sites.shortcuts import get_current_site
 from django.http import HttpResponsePermanentRedirect
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
 
+from job_board.conditional import conditional_page
 from job_board.forms import SubscribeForm
 from job_board.models.category import Category
 from job_board.models.job import Job
+from job_board.page_cache import cache_public_page
+from job_board.pagination import paginate
+from job_board.replicas import replica_reads
+from job_board.sites import get_current_site
 
 
+@replica_reads
+@cache_public_page('index')
 def categories_index(request):
-    categories = Category.objects.filter(site_id=get_current_site(request).id)
-
-    for c in categories:
-        if len(c.active_jobs()) == 0:
-            categories = categories.exclude(id=c.id)
+    categories = Category.objects \
+                         .filter(site_id=get_current_site(request).id) \
+                         .with_active_jobs()
 
     meta_desc = 'Browse a list of all categories with active jobs'
     title = 'Categories'
@@ -23,6 +27,9 @@ def categories_index(request):
     return render(request, 'job_board/categories_index.html', context)
 
 
+@replica_reads
+@conditional_page('category:%(category_id)s')
+@cache_public_page('category:%(category_id)s')
 def categories_show(request, category_id, slug=None):
     category = get_object_or_404(
                    Category,
@@ -33,17 +40,19 @@ def categories_show(request, category_id, slug=None):
     if slug is None:
         return HttpResponsePermanentRedirect(category.get_absolute_url())
 
-    jobs = Job.objects.filter(site_id=get_current_site(request).id) \
-                      .filter(category_id=category_id) \
-                      .filter(paid_at__isnull=False) \
-                      .filter(expired_at__isnull=True) \
-                      .order_by('-paid_at')
+    jobs_list = Job.objects.listing() \
+                           .filter(site_id=get_current_site(request).id) \
+                           .filter(category_id=category_id) \
+                           .active() \
+                           .order_by('-paid_at')
+    jobs = paginate(request, jobs_list)
     form = SubscribeForm()
     meta_desc = 'Browse a list of all active %s jobs' % category.name
-    feed_url = reverse('categories_feed', args=(category.id, category.slug(),))
+    feed_args = (category.id, category.slug(),)
     title = '%s Jobs' % category.name
     context = {'meta_desc': meta_desc,
-               'link_rss': feed_url,
+               'link_rss': reverse('categories_feed', args=feed_args),
+               'link_atom': reverse('categories_feed_atom', args=feed_args),
                'title': title,
                'form': form,
                'jobs': jobs}
@@ -1,37 +1,31 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.contrib.sites.shortcuts import get_current_site
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.http import (HttpResponseRedirect, HttpResponsePermanentRedirect,
                          JsonResponse)
 from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
 
+from job_board.conditional import conditional_page
 from job_board.forms import CompanyForm
 from job_board.models.company import Company
 from job_board.models.job import Job
+from job_board.models.job_archive import JobArchive
+from job_board.page_cache import cache_public_page
+from job_board.pagination import paginate
+from job_board.replicas import replica_reads
+from job_board.sites import get_current_site
 
 
+@replica_reads
+@cache_public_page('index')
 def companies_index(request):
     companies_list = Company.objects \
-                            .filter(site_id=get_current_site(request).id)
-
-    for c in companies_list:
-        if len(c.paid_jobs()) == 0:
-            companies_list = companies_list.exclude(id=c.id)
-
-    paginator = Paginator(companies_list, 25)
-    page = request.GET.get('page')
+                            .filter(site_id=get_current_site(request).id) \
+                            .with_paid_jobs()
+    companies = paginate(request, companies_list)
     meta_desc = 'Browse an extensive list of companies with active and ' \
                 'expired jobs'
     title = 'Companies'
-    try:
-        companies = paginator.page(page)
-    except PageNotAnInteger:
-        # If page is not an integer, deliver first page.
-        companies = paginator.page(1)
-    except EmptyPage:
-        # If page is out of range (e.g. 9999), deliver last page of results.
-        companies = paginator.page(paginator.num_pages)
     context = {'meta_desc': meta_desc, 'title': title, 'companies': companies}
     return render(request, 'job_board/companies_index.html', context)
 
@@ -80,6 +74,9 @@ def companies_new(request):
     return render(request, 'job_board/companies_new.html', context)
 
 
+@replica_reads
+@conditional_page('company:%(company_id)s')
+@cache_public_page('company:%(company_id)s')
 def companies_show(request, company_id, slug=None):
     company = get_object_or_404(
                   Company,
@@ -93,14 +90,22 @@ def companies_show(request, company_id, slug=None):
     # We don't use get_list_or_404 here as we redirect to this view after
     # adding a new company and at that point it won't have any jobs assigned
     # to it.
-    jobs = Job.objects.filter(site_id=get_current_site(request).id) \
-                      .filter(company=company) \
-                      .filter(paid_at__isnull=False) \
-                      .order_by('-paid_at')
+    jobs_list = Job.objects.listing() \
+                           .filter(site_id=get_current_site(request).id) \
+                           .filter(company=company) \
+                           .paid() \
+                           .order_by('-paid_at')
+    archived_list = JobArchive.objects.listing() \
+                                      .filter(company=company) \
+                                      .order_by('-paid_at')
+    jobs = paginate(request, [jobs_list, archived_list])
     title = company.name
     meta_desc = 'Browse a list of all active and expired %s jobs' % \
                 company.name
+    feed_args = (company.id, company.slug(),)
     context = {'meta_desc': meta_desc,
+               'link_rss': reverse('companies_feed', args=feed_args),
+               'link_atom': reverse('companies_feed_atom', args=feed_args),
                'title': title,
                'company': company,
                'jobs': jobs}
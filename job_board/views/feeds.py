@@ -1,34 +1,49 @@
-from django.contrib.sites.shortcuts import get_current_site
-from django.contrib.syndication.views import Feed
-from job_board.models.category import Category
-from job_board.models.job import Job
-
-from utils.misc import convert_markdown
-
-
-class CategoryFeed(Feed):
-    def title(self, obj):
-        return '%s - %s Jobs Feed' % (obj.site.name, obj.name)
-
-    def link(self, obj):
-        return obj.get_absolute_url()
-
-    def description(self, obj):
-        return 'The latest %s jobs on %s' % (obj.name, obj.site.name)
-
-    def get_object(self, request, category_id, slug=None):
-        return Category.objects.get(
-                   pk=category_id, site_id=get_current_site(request).id
-               )
-
-    def items(self, obj):
-        return Job.objects.filter(category_id=obj) \
-                          .filter(paid_at__isnull=False) \
-                          .filter(expired_at__isnull=True) \
-                          .order_by('-paid_at')[:30]
-
-    def item_title(self, item):
-        return '%s @ %s' % (item.title, item.company.name)
-
-    def item_description(self, item):
-        return convert_markdown(item.description)
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from job_board.feeds import FEED_TYPES, get_feed
+from job_board.replicas import replica_reads
+from job_board.sites import get_current_site
+
+
+def serve_feed(request, kind, obj_id, feed_type):
+    # NOTE: Feeds are validated on their ETag only.  The newest updated_at of
+    #       the listed jobs goes back in time when the newest job expires, so
+    #       a Last-Modified based on it would answer 304 to readers holding
+    #       the expired job.
+    try:
+        content, etag = get_feed(
+                                           get_current_site(request),
+                                           kind,
+                                           obj_id,
+                                           feed_type
+                                       )
+    except ObjectDoesNotExist:
+        raise Http404('No such feed')
+
+    etag = quote_etag(etag)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(
+                       content,
+                       content_type=FEED_TYPES[feed_type].content_type
+                   )
+    response['ETag'] = etag
+    return response
+
+
+@replica_reads
+def jobs_feed(request, feed_type='rss'):
+    return serve_feed(request, 'site', None, feed_type)
+
+
+@replica_reads
+def categories_feed(request, category_id, slug=None, feed_type='rss'):
+    return serve_feed(request, 'category', int(category_id), feed_type)
+
+
+@replica_reads
+def companies_feed(request, company_id, slug=None, feed_type='rss'):
+    return serve_feed(request, 'company', int(company_id), feed_type)
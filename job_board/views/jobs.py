@@ -1,16 +1,15 @@
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.contrib.sites.shortcuts import get_current_site
 from django.contrib import messages
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Q
+from django.db import transaction
 from django.http import (Http404, HttpResponseRedirect,
                          HttpResponsePermanentRedirect)
 from django.shortcuts import get_object_or_404, render
 from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.http import urlencode
 
-from utils.misc import convert_markdown, send_mail_with_helper
-
+from job_board.conditional import conditional_page
 from job_board.forms import (CompanyForm,
                              JobForm,
                              JobRemoteForm,
@@ -19,17 +18,29 @@ from job_board.forms import (CompanyForm,
 from job_board.models.category import Category
 from job_board.models.company import Company
 from job_board.models.job import Job
-
-
+from job_board.models.job_archive import JobArchive
+from job_board.outbox import enqueue_mail
+from job_board.page_cache import cache_public_page
+from job_board.pagination import paginate
+from job_board.replicas import replica_reads
+from job_board.search import get_search_backend
+from job_board.sites import get_current_site
+
+
+@replica_reads
+@conditional_page('index')
+@cache_public_page('index')
 def jobs_index(request):
     meta_desc = 'Browse a list of the most recently posted jobs'
     title = 'Latest Jobs'
     form = SubscribeForm()
-    jobs = Job.objects.filter(site_id=get_current_site(request).id) \
-                      .filter(paid_at__isnull=False) \
-                      .filter(expired_at__isnull=True) \
+    jobs = Job.objects.listing() \
+                      .filter(site_id=get_current_site(request).id) \
+                      .active() \
                       .order_by('-paid_at')[:10]
     context = {'meta_desc': meta_desc,
+               'link_rss': reverse('jobs_feed'),
+               'link_atom': reverse('jobs_feed_atom'),
                'title': title,
                'form': form,
                'jobs': jobs}
@@ -37,21 +48,14 @@ def jobs_index(request):
 
 
 @login_required(login_url='/login/')
+@replica_reads
 def jobs_mine(request):
-    jobs_list = Job.objects.filter(site_id=get_current_site(request).id) \
+    jobs_list = Job.objects.listing() \
+                           .filter(site_id=get_current_site(request).id) \
                            .filter(user_id=request.user.id) \
                            .order_by('-created_at')
-    paginator = Paginator(jobs_list, 25)
-    page = request.GET.get('page')
+    jobs = paginate(request, jobs_list)
     title = 'My Jobs'
-    try:
-        jobs = paginator.page(page)
-    except PageNotAnInteger:
-        # If page is not an integer, deliver first page.
-        jobs = paginator.page(1)
-    except EmptyPage:
-        # If page is out of range (e.g. 9999), deliver last page of results.
-        jobs = paginator.page(paginator.num_pages)
     context = {'jobs': jobs, 'title': title}
     return render(request, 'job_board/jobs_mine.html', context)
 
@@ -76,17 +80,18 @@ def jobs_new(request):
                 job.remote = True
             job.site_id = site.id
             job.user_id = request.user.id
-            job.save()
-            context = {'job': job, 'protocol': site.siteconfig.protocol}
-            send_mail_with_helper(
-                '[%s] New job posting' % site.name.upper(),
-                render_to_string(
-                    'job_board/emails/new_job_notification.txt',
-                    context
-                ),
-                site.siteconfig.admin_email,
-                [site.siteconfig.admin_email]
-            )
+            with transaction.atomic():
+                job.save()
+                context = {'job': job, 'protocol': site.siteconfig.protocol}
+                enqueue_mail(
+                    '[%s] New job posting' % site.name.upper(),
+                    render_to_string(
+                        'job_board/emails/new_job_notification.txt',
+                        context
+                    ),
+                    site.siteconfig.admin_email,
+                    [site.siteconfig.admin_email]
+                )
 
             if site.siteconfig.price == 0:
                 msg += ', however it does require verification ' \
@@ -120,10 +125,15 @@ def jobs_new(request):
     return render(request, 'job_board/jobs_new.html', context)
 
 
+@replica_reads
+@conditional_page('job:%(job_id)s')
+@cache_public_page('job:%(job_id)s')
 def jobs_show(request, job_id, slug=None):
-    job = get_object_or_404(
-              Job, pk=job_id, site_id=get_current_site(request).id
-          )
+    site_id = get_current_site(request).id
+    try:
+        job = Job.objects.get(pk=job_id, site_id=site_id)
+    except Job.DoesNotExist:
+        job = get_object_or_404(JobArchive, pk=job_id, site_id=site_id)
 
     if slug is None:
         return HttpResponsePermanentRedirect(job.get_absolute_url())
@@ -132,16 +142,14 @@ def jobs_show(request, job_id, slug=None):
     # If the browsing user does not own the job, and the job has yet to be paid
     # for, then 404
     if (job.user.id != request.user.id and not request.user.is_staff and
-            job.paid_at is None):
+            job.status == Job.DRAFT):
         raise Http404("No Job matches the given query.")
     # If someone views an unpaid job (job owner or admin), display the job's
     # created_at date instead of paid_at
-    if job.paid_at is None:
+    if job.status == Job.DRAFT:
         post_date = job.created_at
     else:
         post_date = job.paid_at
-    job.description_md = convert_markdown(job.description)
-    job.application_info_md = convert_markdown(job.application_info)
     job.remote = "Yes" if job.remote else "No"
     if job.remote == "Yes":
         meta_desc = '%s is hiring a remote %s. Apply today!' % \
@@ -158,6 +166,7 @@ def jobs_show(request, job_id, slug=None):
             tokens = job.user.usertoken.tokens
 
     context = {'job': job,
+               'archived': isinstance(job, JobArchive),
                'post_date': post_date,
                'meta_desc': meta_desc,
                'title': title,
@@ -169,24 +178,25 @@ def jobs_show(request, job_id, slug=None):
     return render(request, 'job_board/jobs_show.html', context)
 
 
+@replica_reads
+@cache_public_page('index')
 def jobs_search(request):
     form = SearchForm(request.GET)
     if form.is_valid():
         cd = form.cleaned_data
-        jobs = Job.objects.filter(site_id=get_current_site(request).id) \
-                          .filter(paid_at__isnull=False) \
-                          .filter(expired_at__isnull=True) \
-                          .filter(
-                              Q(title__icontains=cd['query']) |
-                              Q(description__icontains=cd['query'])
-                          ).order_by('-paid_at')
+        jobs_list = Job.objects.listing() \
+                               .filter(site_id=get_current_site(request).id) \
+                               .active()
+        jobs_list = get_search_backend().search(jobs_list, cd['query'])
+        jobs = paginate(request, jobs_list)
 
         meta_desc = 'Search Results'
         title = 'Search Results'
         context = {'meta_desc': meta_desc,
                    'title': title,
                    'form': form,
-                   'jobs': jobs}
+                   'jobs': jobs,
+                   'pagination_query': urlencode({'query': cd['query']})}
 
         return render(request, 'job_board/jobs_index.html', context)
 
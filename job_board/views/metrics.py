@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+
+from job_board.metrics import collect, render_metric_text
+
+
+def metrics(request):
+    # Only for staff, or for scrapers connecting from METRICS_ALLOWED_IPS
+    allowed_ips = getattr(settings, 'METRICS_ALLOWED_IPS', ())
+    if not ((request.user.is_active and request.user.is_staff) or
+            request.META.get('REMOTE_ADDR') in allowed_ips):
+        raise PermissionDenied
+    return HttpResponse(
+               render_metric_text(collect()),
+               content_type='text/plain; version=0.0.4; charset=utf-8'
+           )
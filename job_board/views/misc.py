@@ -1,25 +1,21 @@
-import requests.exceptions
-import stripe
-
-from mailchimp3 import MailChimp
-
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.contrib.sites.shortcuts import get_current_site
 from django.http import HttpResponseRedirect
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
 
 from job_board.forms import ContactForm, CssUserCreationForm, SubscribeForm
+from job_board.integrations import payments
 from job_board.models.job import Job
-from utils.misc import send_mail_with_helper
+from job_board.outbox import enqueue, enqueue_mail
+from job_board.page_cache import cache_public_page
+from job_board.sites import get_current_site
 
 
 @login_required(login_url='/login/')
 def charge_card(request):
     if request.method == 'POST':
         site = get_current_site(request)
-        stripe.api_key = site.siteconfig.stripe_secret_key
         job = get_object_or_404(
                   Job,
                   pk=request.POST['job_id'],
@@ -33,20 +29,18 @@ def charge_card(request):
             desc = '%s Job Posting (%s://%s/jobs/%s)' % (
                        site.name, site.siteconfig.protocol, site.domain, job.id
                    )
-            charge = stripe.Charge.create(
-                source=token,
-                amount=site.siteconfig.price_in_cents(),
-                currency='usd',
-                description=desc,
-                receipt_email=request.user.email
+            charge = payments.charge(
+                site.siteconfig.stripe_secret_key,
+                token,
+                site.siteconfig.price_in_cents(),
+                desc,
+                request.user.email
             )
         # NOTE: With checkout.js, it seems that all the error handling is
         #       handled on the front-end, so perhaps we do not need to worry
         #       about handling this exception.
-        except stripe.error.CardError as e:
-            body = e.json_body
-            err = body['error']
-            messages.error(request, err['message'])
+        except payments.CardError as e:
+            messages.error(request, str(e))
             return HttpResponseRedirect(job.get_absolute_url())
         else:
             if charge['paid']:
@@ -93,6 +87,7 @@ def charge_token(request):
         return HttpResponseRedirect(job.get_absolute_url())
 
 
+@cache_public_page()
 def contact(request):
     meta_desc = "Questions? Comments? Good or bad, we'd love to hear from you!"
     title = 'Contact Us'
@@ -104,7 +99,7 @@ def contact(request):
             cd = form.cleaned_data
             # re-tag subject to make it more identifiable
             cd['subject'] = "[%s] %s" % (site.name.upper(), cd['subject'])
-            send_mail_with_helper(
+            enqueue_mail(
                 cd['subject'],
                 cd['message'],
                 cd['email'],
@@ -125,6 +120,7 @@ def contact(request):
     return render(request, "job_board/contact.html", context)
 
 
+@cache_public_page()
 def register(request):
     if request.method == 'POST':
         form = CssUserCreationForm(request.POST)
@@ -155,43 +151,17 @@ def subscribe(request):
         form = SubscribeForm(request.POST)
         if form.is_valid():
             cd = form.cleaned_data
-            client = MailChimp(
-                         site.siteconfig.mailchimp_username,
-                         site.siteconfig.mailchimp_api_key
-                     )
-
-            try:
-                client.lists.members.get(
-                    site.siteconfig.mailchimp_list_id,
-                    cd['email']
-                )
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 404:
-                    client.lists.members.create(
-                        site.siteconfig.mailchimp_list_id,
-                        {
-                            'email_address': cd['email'],
-                            'status': 'pending',
-                            'merge_fields': {
-                                'FNAME': cd['fname']
-                            },
-                        }
-                    )
-                    messages.success(
-                        request,
-                        'Thanks, you have been subscribed to our list!'
-                    )
-                else:
-                    messages.error(
-                        request,
-                        'Something went wrong, please try again'
-                    )
-            else:
-                messages.warning(
-                    request,
-                    'Looks like this address is already subscribed to '
-                    'our list!'
-                )
+            enqueue(
+                'mailchimp_subscribe',
+                site_id=site.id,
+                email=cd['email'],
+                fname=cd['fname']
+            )
+            messages.success(
+                request,
+                'Thanks, please check your inbox to confirm your '
+                'subscription to our list!'
+            )
         else:
             messages.warning(
                 request,
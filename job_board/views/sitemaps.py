@@ -0,0 +1,31 @@
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from job_board.replicas import replica_reads
+from job_board.sitemaps import SECTIONS, get_sitemap
+from job_board.sites import get_current_site
+
+
+def serve_sitemap(request, section=None, chunk=None):
+    content, etag = get_sitemap(get_current_site(request), section, chunk)
+    if content is None:
+        raise Http404('No such sitemap')
+    etag = quote_etag(etag)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(content, content_type='application/xml')
+    response['ETag'] = etag
+    return response
+
+
+@replica_reads
+def sitemap_index(request):
+    return serve_sitemap(request)
+
+
+@replica_reads
+def sitemap_section(request, section, chunk):
+    if section not in SECTIONS or (section == 'pages' and chunk != '0'):
+        raise Http404('No such sitemap')
+    return serve_sitemap(request, section, int(chunk))
@@ -47,7 +47,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'job_board.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'job_board.replicas.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,9 +60,11 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'tramcar.urls'
 
+# NOTE: The job_board backend is Django's own, timing template rendering for
+#       job_board.metrics
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'job_board.metrics.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -89,6 +93,10 @@ DATABASES = {
     }
 }
 
+# NOTE: Add a "replica" database to DATABASES to send the queries of the
+#       read-only public views to a read replica, see job_board.replicas
+DATABASE_ROUTERS = ['job_board.replicas.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/1.9/ref/settings/#auth-password-validators
@@ -130,4 +138,11 @@ STATIC_URL = '/static/'
 #       hostname in the request
 #SITE_ID = 1
 
+# NOTE: Set METRICS_DIR to a directory writable by every worker process to
+#       serve request metrics aggregated across processes on /metrics, and
+#       list the addresses of Prometheus servers in METRICS_ALLOWED_IPS.  Staff
+#       users can always view the metrics.
+# METRICS_DIR = '/var/run/tramcar/metrics'
+# METRICS_ALLOWED_IPS = ['127.0.0.1']
+
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
@@ -1,6 +1,6 @@
 import bleach
 from bleach_whitelist import markdown_tags, markdown_attrs
-from django.core.mail import send_mail
+from django.core.mail import send_mail, send_mass_mail
 from django.conf import settings
 import markdown
 
@@ -9,12 +9,18 @@ def convert_markdown(text):
     return bleach.clean(markdown.markdown(text), markdown_tags, markdown_attrs)
 
 
-def send_mail_with_helper(subject, message, from_email, recipient_list):
+def send_mail_with_helper(subject, message, from_email, recipient_list,
+                          fail_silently=True):
     if not settings.DEBUG:
         send_mail(
             subject,
             message,
             from_email,
             recipient_list,
-            fail_silently=True,
+            fail_silently=fail_silently,
         )
+
+
+def send_mass_mail_with_helper(datatuple, fail_silently=True):
+    if not settings.DEBUG:
+        send_mass_mail(datatuple, fail_silently=fail_silently)